@@ -0,0 +1,52 @@
+"""
+gunicorn 설정 (SERVING_PROFILE=production)
+
+    gunicorn -c config/gunicorn.conf.py config.wsgi:application
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c config/gunicorn.conf.py config.asgi:application
+
+값은 환경 변수로 바꿀 수 있습니다. (GUNICORN_BIND, GUNICORN_WORKERS, GUNICORN_THREADS, GUNICORN_WORKER_CLASS,
+GUNICORN_MAX_REQUESTS, GUNICORN_TIMEOUT)
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# gthread: 워커(프로세스)마다 스레드 풀로 요청 처리. 검색은 Redis/ES/MySQL 응답 대기가 대부분이라
+# 프로세스를 늘리는 것보다 스레드로 대기 시간을 겹치는 편이 메모리 대비 처리량이 높음
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# settings.SERVING_THREADS와 같은 환경 변수 (Redis/ES 연결 풀 크기가 이 값 기준)
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# 앱을 마스터에서 한 번 import한 뒤 fork (워커 기동이 빠르고 코드 페이지를 공유)
+# DB/Redis/ES 연결은 첫 요청에서 워커별로 열리므로 fork 전에 공유되는 소켓은 없음
+preload_app = True
+
+# 메모리 누수 대비 주기적 워커 교체, 지터로 워커들이 동시에 재시작하지 않게 분산
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # 마스터에서 열린 DB 연결이 있다면 워커가 물려받지 않도록 정리
+    from django.db import connections
+    connections.close_all()
+
+
+def worker_exit(server, worker):
+    # 워커 교체(max_requests)/종료 시 랭킹 버퍼에 남은 증가분 반영
+    from products.ranking import flush_ranking_buffer
+    try:
+        flushed = flush_ranking_buffer()
+        if flushed:
+            server.log.info(f"랭킹 버퍼 반영 후 워커 종료: {flushed}회 (pid: {worker.pid})")
+    except Exception as e:
+        server.log.warning(f"워커 종료 시 랭킹 버퍼 반영 실패: {str(e)}")
@@ -30,6 +30,17 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 
+# 서빙 프로필 (SERVING_PROFILE)
+# - 'development': runserver, 요청마다 새 DB 연결, Redis/ES 클라이언트 기본값 (로컬 개발용)
+# - 'production': gunicorn(config/gunicorn.conf.py) + 영구 DB 연결(health check), 상한 있는 Redis 연결 풀과
+#   소켓 타임아웃, ES 연결 풀 크기/타임아웃/재시도 설정
+SERVING_PROFILE = os.environ.get('SERVING_PROFILE', 'development')
+PRODUCTION_SERVING = SERVING_PROFILE == 'production'
+
+# 워커당 요청 처리 스레드 수 (gunicorn gthread, 연결 풀 크기의 기준)
+SERVING_THREADS = int(os.environ.get('GUNICORN_THREADS', 8))
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -92,6 +103,19 @@ DATABASES = {
     }
 }
 
+if PRODUCTION_SERVING:
+    DATABASES['default'].update({
+        # 요청마다 연결/인증하지 않고 스레드별 연결을 60초 재사용, 재사용 전 ping으로 끊긴 연결 교체
+        # (ASGI 서버는 요청마다 스레드가 달라 재사용되지 않으므로 DB_CONN_MAX_AGE=0으로 끔)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    })
+    DATABASES['default']['OPTIONS'].update({
+        'connect_timeout': 3,
+        'read_timeout': 10,
+        'write_timeout': 10,
+    })
+
 # Redis 캐시 설정 (django-redis 라이브러리 사용)
 CACHES = {
     "default": {
@@ -99,10 +123,24 @@ CACHES = {
         "LOCATION": "redis://redis:6379/1", # 1번 DB 사용 (0번은 보통 시스템용)
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # 검색 결과 캐시 엔트리는 SEARCH_CACHE_CODEC으로 직렬화, 그 외 값은 pickle
+            "SERIALIZER": "products.cache_codec.SearchCacheSerializer",
         }
     }
 }
 
+if PRODUCTION_SERVING:
+    CACHES['default']['OPTIONS'].update({
+        # 연결 수 상한: 요청 스레드 + 백그라운드 스레드(L1 무효화 구독, 랭킹 버퍼 반영, 캐시 갱신 2개)
+        # 풀이 비면 새 연결을 만들지 않고 최대 timeout초 대기
+        'CONNECTION_POOL_CLASS': 'redis.BlockingConnectionPool',
+        'CONNECTION_POOL_KWARGS': {'max_connections': SERVING_THREADS + 4, 'timeout': 1},
+        'SOCKET_CONNECT_TIMEOUT': 1,
+        # 랭킹 반영/7일 랭킹 ZUNIONSTORE/outbox/상품 조각 저장 등 백그라운드 작업도 쓰는 기본 클라이언트
+        # (검색 요청의 캐시 조회는 아래 'search' 별칭의 짧은 소켓 타임아웃 사용)
+        'SOCKET_TIMEOUT': 5,
+    })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -204,6 +242,142 @@ ELASTICSEARCH_DSL = {
     },
 }
 
+if PRODUCTION_SERVING:
+    ELASTICSEARCH_DSL['default'].update({
+        'maxsize': SERVING_THREADS,      # 워커당 urllib3 연결 풀 (요청 스레드 수만큼)
+        'timeout': 5,                    # 요청 타임아웃 (초, 색인 _bulk는 index_sync.BULK_REQUEST_TIMEOUT)
+        'max_retries': 2,                # 연결 실패/502/503/504만 다른 연결로 재시도
+        'retry_on_timeout': False,       # 느린 ES에 같은 요청을 다시 보내 부하를 키우지 않음
+    })
+
+# 검색 결과 생성 방식
+# - 'database': ES에서 ID만 받고 MySQL에서 상세 정보 조회 (기본값)
+# - 'document': ES _source로 바로 응답 생성 (MySQL 조회 없음, 인덱스가 최신이어야 함)
+SEARCH_RESULT_SOURCE = os.environ.get('SEARCH_RESULT_SOURCE', 'database')
+
+# 검색어 랭킹 write-behind 버퍼
+# 워커별로 증가분을 모아두었다가 주기적으로 ZINCRBY 일괄 반영 (요청 경로에서 Redis 쓰기 제거)
+SEARCH_RANKING_BUFFER = {
+    'ENABLED': os.environ.get('SEARCH_RANKING_BUFFER', 'true').lower() == 'true',
+    'FLUSH_INTERVAL': 1.0,   # 반영 주기 (초)
+    'MAX_KEYWORDS': 500,     # 검색어 종류가 이만큼 쌓이면 즉시 반영
+}
+
+# ES 색인 동기화 (products/index_sync.py)
+# - 'outbox': 변경된 상품 ID를 Redis Set에 모으고 sync_search_index 명령이 일괄 색인
+# - 'immediate': 커밋 직후 같은 프로세스에서 바로 bulk 색인 (테스트, 로컬 개발용)
+SEARCH_INDEX_SYNC = {
+    'MODE': os.environ.get('SEARCH_INDEX_SYNC', 'outbox'),
+    'BATCH_SIZE': 500,       # _bulk 요청당 상품 수
+    'FLUSH_INTERVAL': 1.0,   # outbox 확인 주기 (초)
+}
+
+# 워커별 in-process L1 캐시 (Redis 캐시 앞단)
+# - 검색 결과: 랭킹 점수가 MIN_SCORE 이상인 인기 검색어만, 최대 TTL초 (카탈로그 버전 변경 시 pub/sub으로 무효화)
+# - 랭킹 목록: RANKING_TTL초 동안 같은 결과 재사용
+SEARCH_LOCAL_CACHE = {
+    'ENABLED': os.environ.get('SEARCH_LOCAL_CACHE', 'true').lower() == 'true',
+    'MAX_ENTRIES': 1000,
+    'TTL': 5,
+    'RANKING_TTL': 1,
+    'MIN_SCORE': 10,
+}
+
+# 누적 랭킹 저장 방식
+# - 'exact': 검색어별 Sorted Set (모든 검색어를 영구 보관)
+# - 'sketch': Count-Min Sketch + Top-K (고정 메모리, 과대 추정 상한 e/WIDTH * 전체 검색 수, 확률 1 - e^-DEPTH)
+SEARCH_RANKING_BACKEND = os.environ.get('SEARCH_RANKING_BACKEND', 'exact')
+SEARCH_RANKING_SKETCH = {
+    'WIDTH': 2048,   # epsilon = e / 2048 ≈ 0.13%
+    'DEPTH': 4,      # delta = e^-4 ≈ 1.8%
+    'TOP_K': 100,    # 보관할 상위 후보 수
+}
+
+# 검색 패싯 집계 (첫 페이지 응답의 facets)
+SEARCH_FACETS = {
+    'BRAND_SIZE': 20,         # 상품 수 상위 브랜드 개수
+    'PRICE_INTERVAL': 10000,  # 가격 히스토그램 간격 (원)
+}
+
+# 검색어 자동완성 (/api/products/items/suggest/)
+# 인기 검색어(랭킹 상위 RANKING_POOL개, RANKING_TTL초마다 갱신) 중 접두어가 맞는 것을 먼저,
+# 나머지는 ES completion suggester(상품명/브랜드명/성분명)로 채움
+# 접두어 CACHE_PREFIX_LENGTH자 이하 결과는 워커 메모리에 CACHE_TTL초 보관
+SEARCH_SUGGEST = {
+    'SIZE': 10,
+    'MAX_LENGTH': 50,
+    'CACHE_PREFIX_LENGTH': 2,
+    'CACHE_TTL': 30,
+    'CACHE_ENTRIES': 2000,
+    'RANKING_POOL': 1000,
+    'RANKING_TTL': 10,
+}
+
+# 검색 단계별 지연 시간 계측 (워커별 히스토그램 -> GET /metrics, 응답 Server-Timing 헤더)
+SEARCH_METRICS = {
+    'ENABLED': os.environ.get('SEARCH_METRICS', 'true').lower() == 'true',
+    'SERVER_TIMING': os.environ.get('SEARCH_SERVER_TIMING', 'true').lower() == 'true',
+}
+
+# 비동기 검색 (/api/products/items/search-async/, uvicorn 워커에서 실행)
+# 클라이언트는 워커(이벤트 루프)마다 하나씩, 아래 상한은 워커 단위
+SEARCH_ASYNC = {
+    'REDIS_MAX_CONNECTIONS': 50,     # redis.asyncio 연결 풀 크기
+    'CONNECTION_POOL_KWARGS': {},    # redis.asyncio ConnectionPool 추가 인자
+    'ES_MAXSIZE': 25,                # AsyncElasticsearch(aiohttp) 연결 수
+    'ES_TIMEOUT': 10,                # ES 요청 타임아웃 (초)
+    'DB_CONCURRENCY': 16,            # 동시에 스레드로 넘기는 MySQL 조회/직렬화 수 (= DB 연결 수 상한)
+}
+
+# 검색 결과 캐시 엔트리 직렬화 (products.cache_codec)
+# - FORMAT: json(orjson으로 렌더링한 응답 본문을 저장, 캐시 히트 시 그대로 전송) | msgpack | pickle(기존 방식)
+# - COMPRESSION: zlib | zstd(zstandard 패키지) | lz4(lz4 패키지) | 빈 값(압축 안 함), 본문이 COMPRESS_MIN_BYTES 이상일 때만
+# 형식/압축은 엔트리마다 기록되므로 설정을 바꿔도 기존 엔트리는 그대로 읽힘
+SEARCH_CACHE_CODEC = {
+    'FORMAT': os.environ.get('SEARCH_CACHE_FORMAT', 'json'),
+    'COMPRESSION': os.environ.get('SEARCH_CACHE_COMPRESSION', 'zlib') or None,
+    'COMPRESS_MIN_BYTES': 1024,
+}
+
+# 검색 결과 상품 조각 캐시 (products.fragments, SEARCH_RESULT_SOURCE = 'database'일 때)
+# 검색 캐시에는 정렬된 상품 ID 목록만 저장하고, 상품별 ProductSerializer 출력은
+# product:{id}:v{updated_at} 키에 TTL초 동안 저장 (MGET으로 조회, 없는 상품만 MySQL에서 한 번에 조회)
+# 상품이 바뀌면 그 상품의 키만 바뀜 (브랜드/성분 변경은 해당 상품의 updated_at을 갱신)
+SEARCH_FRAGMENT_CACHE = {
+    'ENABLED': os.environ.get('SEARCH_FRAGMENT_CACHE', 'true').lower() == 'true',
+    'TTL': 24 * 60 * 60,
+}
+
+# 검색 장애 대응 (의존 서비스 차단기 + 요청 마감 시간)
+# - 차단기: FAILURE_WINDOW초 안에 실패(연결 실패/타임아웃/5xx)가 FAILURE_THRESHOLD번이면 OPEN_SECONDS 동안 호출하지 않음
+#   ES 차단기 상태는 Redis에 두어 워커가 함께 사용, Redis 차단기는 워커별
+#   ES 차단 중에는 이전 카탈로그 버전의 캐시(STALE_VERSIONS개까지) -> MySQL 상품명 검색 순으로 대체 응답
+# - 마감 시간: 요청마다 DEADLINE_MS 예산, 단계별 상한은 예산 * STAGE_BUDGET 비율 (남은 예산을 넘지 않음)
+SEARCH_RESILIENCE = {
+    'BREAKER_ENABLED': os.environ.get('SEARCH_CIRCUIT_BREAKER', 'true').lower() == 'true',
+    'FAILURE_THRESHOLD': 5,
+    'FAILURE_WINDOW': 10,
+    'OPEN_SECONDS': 5,
+    'DEADLINE_MS': int(os.environ.get('SEARCH_DEADLINE_MS', 1500)),
+    'STAGE_BUDGET': {
+        'es': 0.6,      # ES 요청 타임아웃 (request_timeout)
+        'cache': 0.2,   # Redis 조회 (비동기 검색은 명령별 타임아웃, 운영 프로필은 'search' 별칭 소켓 타임아웃)
+        'db': 0.4,      # MySQL 조회 (SELECT마다 MAX_EXECUTION_TIME 힌트)
+    },
+    'STALE_VERSIONS': 3,
+}
+
+# 검색 요청의 캐시 조회 전용 별칭 (products.search_cache.search_redis: 캐시 조회 스크립트, 상품 조각 MGET)
+CACHES['search'] = {**CACHES['default'], 'OPTIONS': {**CACHES['default']['OPTIONS']}}
+if PRODUCTION_SERVING:
+    # redis-py 동기 클라이언트는 명령별 타임아웃이 없으므로 조회 전용 연결만 소켓 타임아웃을 캐시 단계 예산에 맞춤
+    # django-redis는 LOCATION(URL)별로 연결 풀을 공유하므로 URL에도 타임아웃을 넣어 기본 클라이언트와 풀을 분리
+    _search_socket_timeout = round(
+        SEARCH_RESILIENCE['DEADLINE_MS'] / 1000 * SEARCH_RESILIENCE['STAGE_BUDGET']['cache'], 3
+    )
+    CACHES['search']['LOCATION'] += f"?socket_timeout={_search_socket_timeout}"
+    CACHES['search']['OPTIONS']['SOCKET_TIMEOUT'] = _search_socket_timeout
+
 # REST Framework 페이지네이션 설정
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -219,3 +393,11 @@ if 'test' in sys.argv:
         'CHARSET': 'utf8mb4',
         'COLLATION': 'utf8mb4_unicode_ci',
     }
+    # 테스트에서는 랭킹을 즉시 반영 (버퍼 동작은 별도 테스트에서 확인)
+    SEARCH_RANKING_BUFFER['ENABLED'] = False
+    # 테스트마다 Redis 캐시를 비우므로 L1 캐시는 끔 (L1 동작은 별도 테스트에서 확인)
+    SEARCH_LOCAL_CACHE['ENABLED'] = False
+    # 테스트에서는 저장 직후 바로 색인 (outbox 워커 없이 결과 확인)
+    SEARCH_INDEX_SYNC['MODE'] = 'immediate'
+    # 테스트 간 실패 수가 누적되지 않도록 차단기는 끔 (차단기 동작은 별도 테스트에서 확인)
+    SEARCH_RESILIENCE['BREAKER_ENABLED'] = False
@@ -4,6 +4,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from products.metrics import metrics_view
+
 # 1. Swagger 문서 정보 설정
 schema_view = get_schema_view(
     openapi.Info(
@@ -21,6 +23,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/products/', include('products.urls')),
+    path('metrics', metrics_view, name='metrics'),
 
     # 2. Swagger URL 연결
     path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
@@ -12,7 +12,7 @@ class IngredientAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['id', 'name', 'brand', 'price']
-    list_filter = ['brand'] # 브랜드별 필터링 기능
+    list_display = ['id', 'name', 'brand', 'price', 'max_ewg_score', 'has_hazardous_ingredient']
+    list_filter = ['brand', 'has_hazardous_ingredient'] # 브랜드별/유해 성분 포함 여부 필터링 기능
     search_fields = ['name']
     filter_horizontal = ['ingredients'] # N:M 관계를 예쁘게 선택하는 UI 제공
\ No newline at end of file
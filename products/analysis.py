@@ -0,0 +1,97 @@
+from elasticsearch_dsl import Q, analyzer, token_filter, tokenizer
+
+# 한국어 형태소 분석 (analysis-nori 플러그인 필요, elasticsearch/Dockerfile)
+# mixed: 복합어 원형과 분해 결과를 모두 색인 ("수분크림" -> 수분크림, 수분, 크림)
+korean_tokenizer = tokenizer('korean_tokenizer', 'nori_tokenizer', decompound_mode='mixed')
+# 검색어는 분해 결과만 사용 (복합어와 분해 결과가 겹치면 동의어 그래프/구문 검색이 어긋남)
+korean_search_tokenizer = tokenizer('korean_search_tokenizer', 'nori_tokenizer', decompound_mode='discard')
+
+# 화장품 동의어 (검색 시에만 적용하므로 바꿔도 재색인 없이 인덱스 close/open 또는 재생성으로 반영)
+COSMETICS_SYNONYMS = [
+    '스킨, 토너, toner',
+    '로션, 에멀전, 에멀젼, emulsion, lotion',
+    '크림, cream',
+    '세럼, serum',
+    '앰플, ampoule',
+    '에센스, essence',
+    '선크림, 썬크림, 자외선차단제, sunscreen',
+    '클렌저, 클렌징, cleanser, cleansing',
+    '보습, 수분, moisture',
+    '미백, 브라이트닝, brightening',
+    '녹차, 그린티, green tea',
+    '시카, 병풀, cica, centella',
+]
+cosmetics_synonym = token_filter('cosmetics_synonym', 'synonym_graph', synonyms=COSMETICS_SYNONYMS, lenient=True)
+
+# 품사 필터: 조사/어미 등 검색에 의미 없는 형태소 제거 (nori 기본 stoptags)
+korean_pos_filter = token_filter('korean_pos_filter', 'nori_part_of_speech')
+
+# 색인 시 정규화: 전각/반각 통일(cjk_width) + 소문자 + 한자 -> 한글 읽기
+# (검색어는 normalize_query의 NFKC + casefold와 같은 결과가 되도록 색인 쪽에서 미리 정규화)
+_normalize_filters = ['cjk_width', 'lowercase', 'nori_readingform']
+
+korean_index_analyzer = analyzer(
+    'korean_index',
+    tokenizer=korean_tokenizer,
+    filter=_normalize_filters + [korean_pos_filter],
+)
+korean_search_analyzer = analyzer(
+    'korean_search',
+    tokenizer=korean_search_tokenizer,
+    filter=_normalize_filters + [korean_pos_filter, cosmetics_synonym],
+)
+
+# 부분 일치용 2~3글자 ngram (형태소 사전에 없는 신조어/브랜드명 보완)
+ngram_tokenizer = tokenizer('name_ngram_tokenizer', 'ngram', min_gram=2, max_gram=3,
+                            token_chars=['letter', 'digit'])
+ngram_analyzer = analyzer('name_ngram', tokenizer=ngram_tokenizer, filter=['cjk_width', 'lowercase'])
+
+# 상품명/브랜드명 검색 필드 (가중치: 상품명 > 브랜드명)
+TEXT_FIELDS = ['name^3', 'brand.name^2']
+
+# 오타 허용 검색 결과의 커서 끝에 붙이는 표시 (다음 페이지도 같은 쿼리로 조회)
+FUZZY_CURSOR_MARK = '~fuzzy'
+
+# ngram 부분 일치는 검색어 ngram의 이 비율 이상이 맞아야 함 (짧은 ngram 우연 일치 방지)
+NGRAM_MINIMUM_SHOULD_MATCH = '75%'
+
+
+def build_search_query(search_query: str) -> Q:
+    """
+    정확/구문 일치 우선 검색 쿼리 (fuzzy 없음)
+
+    - 구문 일치(phrase)에 가장 큰 가중치
+    - 형태소 단위 전체 일치(operator=and)
+    - ngram 부분 일치는 낮은 가중치로 재현율만 보완
+    - 성분명은 nested 필드이므로 nested 쿼리로 검색
+
+    Args:
+        search_query: 정규화된 검색어
+
+    Returns:
+        bool should 쿼리 (하나 이상 일치)
+    """
+    return Q('bool', should=[
+        Q('multi_match', query=search_query, type='phrase', fields=TEXT_FIELDS, boost=4),
+        Q('multi_match', query=search_query, operator='and', fields=TEXT_FIELDS, boost=2),
+        Q('match', **{'name.ngram': {'query': search_query, 'minimum_should_match': NGRAM_MINIMUM_SHOULD_MATCH,
+                                     'boost': 0.5}}),
+        Q('nested', path='ingredients', score_mode='max', query=Q('bool', should=[
+            Q('match_phrase', **{'ingredients.name': {'query': search_query, 'boost': 2}}),
+            Q('match', **{'ingredients.name': {'query': search_query, 'operator': 'and'}}),
+        ])),
+    ], minimum_should_match=1)
+
+
+def build_fuzzy_query(search_query: str) -> Q:
+    """
+    오타 허용 검색 쿼리 (정확 검색 결과가 없을 때만 사용)
+
+    첫 글자는 맞아야 하도록 prefix_length=1, 후보 확장 수를 제한해 fuzzy 비용을 줄임
+    """
+    fuzzy = {'fuzziness': 'AUTO', 'prefix_length': 1, 'max_expansions': 20}
+    return Q('bool', should=[
+        Q('multi_match', query=search_query, fields=TEXT_FIELDS, **fuzzy),
+        Q('nested', path='ingredients', score_mode='max',
+          query=Q('match', **{'ingredients.name': {'query': search_query, **fuzzy}})),
+    ], minimum_should_match=1)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self) -> None:
+        # 상품 데이터 변경 시 검색 캐시 무효화 (카탈로그 버전 증가)
+        from . import signals  # noqa: F401
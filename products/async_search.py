@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import weakref
+from typing import Any
+
+import redis.asyncio as aioredis
+from django.conf import settings
+
+try:
+    # elasticsearch[async] (aiohttp) 설치 시에만 사용 가능
+    from elasticsearch import AsyncElasticsearch
+except ImportError:
+    AsyncElasticsearch = None
+
+logger = logging.getLogger(__name__)
+
+# 이벤트 루프별 클라이언트 (aiohttp 세션과 redis.asyncio 연결은 만든 루프에서만 사용할 수 있음)
+# uvicorn 워커는 루프가 하나라 프로세스당 하나씩 생성됨
+_es_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+_redis_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+_db_slots: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+
+
+def get_async_es() -> Any:
+    """
+    현재 이벤트 루프의 AsyncElasticsearch 클라이언트 (ELASTICSEARCH_DSL 'default' 호스트)
+
+    Raises:
+        RuntimeError: elasticsearch[async] (aiohttp) 미설치
+    """
+    loop = asyncio.get_running_loop()
+    client = _es_clients.get(loop)
+    if client is None:
+        if AsyncElasticsearch is None:
+            raise RuntimeError('비동기 검색에는 elasticsearch[async] (aiohttp) 패키지가 필요합니다.')
+        config = settings.SEARCH_ASYNC
+        client = AsyncElasticsearch(
+            hosts=settings.ELASTICSEARCH_DSL['default']['hosts'],
+            maxsize=config['ES_MAXSIZE'],
+            timeout=config['ES_TIMEOUT'],
+        )
+        _es_clients[loop] = client
+    return client
+
+
+def get_async_redis() -> Any:
+    """
+    현재 이벤트 루프의 redis.asyncio 클라이언트 (CACHES 'default'와 같은 Redis, 연결 수 상한이 있는 풀)
+    """
+    loop = asyncio.get_running_loop()
+    client = _redis_clients.get(loop)
+    if client is None:
+        config = settings.SEARCH_ASYNC
+        pool = aioredis.ConnectionPool.from_url(
+            settings.CACHES['default']['LOCATION'],
+            max_connections=config['REDIS_MAX_CONNECTIONS'],
+            **config['CONNECTION_POOL_KWARGS'],
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        _redis_clients[loop] = client
+    return client
+
+
+def db_slots() -> asyncio.Semaphore:
+    """
+    ORM 조회를 스레드로 넘길 때 동시 실행 수 제한 (DB_CONCURRENCY)
+
+    요청마다 스레드(= MySQL 연결)가 생기므로, 코루틴이 많아도 DB 연결 수는 이 값을 넘지 않음
+    """
+    loop = asyncio.get_running_loop()
+    slots = _db_slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(settings.SEARCH_ASYNC['DB_CONCURRENCY'])
+        _db_slots[loop] = slots
+    return slots
+
+
+async def execute_async(search: Any) -> Any:
+    """
+    elasticsearch_dsl Search를 비동기 클라이언트로 실행 (Search.execute()와 같은 요청/응답 객체)
+
+    Args:
+        search: ProductViewSet._build_search가 만든 Search
+
+    Returns:
+        elasticsearch_dsl Response (hits, aggregations, meta.sort 사용 가능)
+    """
+    raw = await get_async_es().search(index=search._index, body=search.to_dict(), **search._params)
+    return search._response_class(search, raw)
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .analysis import build_fuzzy_query, build_search_query
+from .async_search import db_slots, execute_async, get_async_redis
+from .cache_codec import response_body
+from .exceptions import CircuitOpenError, SearchError
+from .filters import SearchFilters, parse_facets
+from .fragments import compose_entry, is_id_page_entry
+from .local_cache import get_search_l1, search_l2
+from .metrics import instrument_async_search
+from .pagination import PageRequest, SearchPagination
+from .ranking import get_ranking_buffer, increments_in_lookup
+from .refresh import refresh_in_background
+from .resilience import get_breaker, request_deadline, stage_timeout
+from .search_cache import (
+    SearchCacheLookup, alookup_search_cache, build_search_cache_key, needs_refresh, normalize_query
+)
+from .singleflight import async_search_flight
+from .timing import stage
+from .views import ProductViewSet
+
+logger = logging.getLogger(__name__)
+
+
+def _json(data: Any, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """DRF Response와 같은 JSON 렌더링 (동기 검색과 응답 본문이 같도록)"""
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+def _cached_json(entry: Dict[str, Any]) -> HttpResponse:
+    """캐시 엔트리 응답 (렌더링된 본문이 있으면 그대로 전송)"""
+    body = response_body(entry)
+    if body is not None:
+        return HttpResponse(body, content_type='application/json')
+    return _json(entry['data'])
+
+
+@instrument_async_search
+async def search_async(request: HttpRequest) -> HttpResponse:
+    """
+    상품 검색 API (비동기, ASGI 전용)
+
+    GET /api/products/items/search-async/ - 쿼리 파라미터/응답/에러 코드는 동기 검색(search)과 같음
+
+    동기 검색은 요청 스레드가 Redis -> ES -> MySQL 응답을 차례로 기다리지만,
+    이 뷰는 이벤트 루프에서 I/O를 기다리므로 ES가 느려져도 워커가 다른 요청을 계속 처리합니다.
+
+    - 캐시 조회: redis.asyncio (연결 풀), 랭킹 증가와 asyncio.gather로 동시에 실행
+    - ES 검색: AsyncElasticsearch (같은 쿼리/필터/정렬/패싯, 결과 없으면 오타 허용 검색)
+    - MySQL 조회 + 직렬화 + 캐시 저장: 스레드로 넘김 (동시 실행 수는 DB_CONCURRENCY로 제한)
+
+    Note:
+        uvicorn(ASGI)에서 실행해야 효과가 있습니다. WSGI 서버에서는 요청마다 이벤트 루프를 새로 만듭니다.
+        캐시 미스 병합은 워커(이벤트 루프) 안에서만 합니다. (워커 간 Redis 락은 동기 검색만 사용)
+    """
+    drf_request = Request(request)
+    view = ProductViewSet(request=drf_request, format_kwarg=None, action='search')
+    with request_deadline():
+        try:
+            # [Step 0] 입력값 검증 (동기 검색과 같은 규칙)
+            with stage('validation'):
+                try:
+                    query, paginator, page_request, filters = view._parse_search_request(drf_request)
+                except SearchError as e:
+                    return _json(e.to_dict(), e.status_code)
+
+            search_query = normalize_query(query)
+            cache_params = {**page_request.cache_params(), **filters.cache_params()}
+
+            # 워커 메모리(L1) 캐시
+            local_key = build_search_cache_key(search_query, cache_params)
+            if settings.SEARCH_LOCAL_CACHE['ENABLED']:
+                with stage('cache'):
+                    entry = get_search_l1().get(local_key)
+                if entry is not None:
+                    logger.info(f"L1 캐시 히트: {query}")
+                    await _add_ranking(view, query)
+                    return _cached_json(entry)
+
+            # [Step 1] Redis 캐시 조회 + 랭킹 증가
+            # 조회 스크립트가 랭킹까지 올리면 왕복 한 번, 아니면 조회와 랭킹 증가를 동시에 실행
+            inline_ranking = increments_in_lookup()
+            if inline_ranking:
+                lookup = await _lookup(search_query, cache_params, query, increment=True)
+                if lookup is None:
+                    await _add_ranking(view, query)
+            else:
+                lookup, _ = await asyncio.gather(
+                    _lookup(search_query, cache_params, query, increment=False),
+                    _add_ranking(view, query),
+                )
+            if lookup is not None:
+                search_l2.record(hit=bool(lookup.payload))
+
+            if lookup is not None and lookup.payload:
+                logger.info(f"캐시 히트: {query}")
+                entry = lookup.payload
+                if is_id_page_entry(entry):
+                    # 상품 조각 MGET + 없는 조각의 MySQL 조회는 스레드에서
+                    try:
+                        async with db_slots():
+                            entry = await sync_to_async(compose_entry)(entry)
+                    except SearchError as e:
+                        return _json(e.to_dict(), e.status_code)
+                if needs_refresh(entry, lookup.ranking_score):
+                    # 갱신은 기존 백그라운드 스레드(동기 ES 클라이언트)에서 실행
+                    def compute() -> Dict[str, Any]:
+                        return view._compute_search(query, search_query, paginator, page_request, filters,
+                                                    lookup, local_key)
+
+                    if await sync_to_async(refresh_in_background, thread_sensitive=False)(lookup.cache_key, compute):
+                        logger.info(f"백그라운드 캐시 갱신 예약: {query}")
+                else:
+                    view._remember_locally(local_key, lookup, entry)
+                return _cached_json(entry)
+
+            # [Step 2~4] 캐시 미스: 같은 키의 동시 요청은 하나만 ES/MySQL 조회
+            flight_key = lookup.cache_key if lookup is not None else local_key
+            try:
+                data = await async_search_flight.do(
+                    flight_key,
+                    lambda: _compute_search(view, query, search_query, paginator, page_request, filters,
+                                            lookup, local_key)
+                )
+            except CircuitOpenError as e:
+                # ES 차단 중: 이전 버전 캐시 또는 MySQL 대체 검색 (동기 검색과 같은 대체 응답)
+                async with db_slots():
+                    data = await sync_to_async(view._degraded_search)(
+                        query, search_query, paginator, page_request, filters, lookup, cache_params
+                    )
+                if data is None:
+                    return _json(e.to_dict(), e.status_code)
+            except SearchError as e:
+                return _json(e.to_dict(), e.status_code)
+
+            return _json(data)
+
+        except Exception as e:
+            logger.exception(f"비동기 검색 API 예상치 못한 오류: {str(e)}")
+            return _json(
+                {
+                    'error': '예상치 못한 오류가 발생했습니다.',
+                    'detail': str(e)
+                },
+                status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+async def _lookup(search_query: str, cache_params: Dict[str, Any], keyword: str,
+                  increment: bool) -> Optional[SearchCacheLookup]:
+    """redis.asyncio로 캐시 조회 (실패하거나 Redis 차단 중이면 None: 캐시 미스로 계속 진행, 결과 캐싱 생략)"""
+    redis_breaker = get_breaker('redis')
+    if not redis_breaker.allow():
+        return None
+    try:
+        with redis_breaker.calling(), stage('cache'):
+            # 캐시 단계 예산 안에서만 기다림 (초과하면 캐시 미스로 계속 진행)
+            return await asyncio.wait_for(
+                alookup_search_cache(get_async_redis(), search_query, cache_params,
+                                     keyword=keyword, increment=increment),
+                timeout=stage_timeout('cache'),
+            )
+    except Exception as e:
+        logger.warning(f"캐시 조회 실패: {str(e)}")
+        return None
+
+
+async def _add_ranking(view: ProductViewSet, keyword: str) -> None:
+    """랭킹 증가 (버퍼는 메모리 적재라 바로, Redis에 쓰는 경우는 스레드에서 실행)"""
+    if settings.SEARCH_RANKING_BUFFER['ENABLED']:
+        with stage('ranking'):
+            get_ranking_buffer().add(keyword)
+        return
+    await sync_to_async(view._add_ranking, thread_sensitive=False)(keyword)
+
+
+async def _compute_search(view: ProductViewSet, query: str, search_query: str, paginator: SearchPagination,
+                          page_request: PageRequest, filters: SearchFilters,
+                          lookup: Optional[SearchCacheLookup], local_key: str) -> Dict[str, Any]:
+    """
+    캐시 미스: 비동기 ES 검색 후 MySQL 조회/직렬화/캐시 저장은 스레드에서 실행
+
+    Raises:
+        CircuitOpenError: ES 차단기가 열려 호출하지 않음
+        SearchError: Elasticsearch 또는 DB 조회 실패
+    """
+    started = time.monotonic()
+    logger.info(f"캐시 미스, Elasticsearch 검색 시작 (비동기): {query}")
+    include_facets, search_after, fuzzy = view._search_plan(page_request)
+    # 워커 간 차단 상태 공유는 동기 Redis 호출이라 확인/기록 모두 스레드에서 (이벤트 루프를 막지 않음)
+    breaker = get_breaker('elasticsearch')
+    if not await breaker.aallow():
+        logger.warning(f"Elasticsearch 차단 중, 검색 생략: {query}")
+        raise CircuitOpenError('Elasticsearch')
+
+    try:
+        async with breaker.acalling():
+            with stage('es'):
+                if not fuzzy:
+                    response = await execute_async(view._build_search(
+                        build_search_query(search_query), filters, page_request, search_after, include_facets
+                    ))
+                    fuzzy = view._needs_fuzzy(query, response, page_request, search_after)
+                if fuzzy:
+                    response = await execute_async(view._build_search(
+                        build_fuzzy_query(search_query), filters, page_request, search_after, include_facets
+                    ))
+        facets = parse_facets(response.aggregations) if include_facets else None
+    except Exception as e:
+        raise view._es_error(e)
+
+    def finish() -> Dict[str, Any]:
+        data = view._build_page(query, response, fuzzy, facets, paginator, page_request)
+        view._store_search_result(query, lookup, local_key, data, time.monotonic() - started)
+        return data
+
+    # thread_sensitive: Django ASGI 핸들러가 요청마다 스레드를 따로 주고, 요청 종료 시 DB 연결을 정리함
+    async with db_slots():
+        return await sync_to_async(finish)()
@@ -0,0 +1,241 @@
+import logging
+import struct
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django_redis.serializers.pickle import PickleSerializer
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .metrics import observe_codec
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# 검색 캐시 엔트리 프레임: MAGIC + 헤더(형식, 압축, computed_at, delta, soft_expires_at) + 본문
+# 형식/압축은 프레임에 기록되므로 설정을 바꿔도 이전 엔트리를 그대로 읽을 수 있음
+# (pickle은 0x80으로 시작하므로 MAGIC과 겹치지 않음, 프레임이 아니면 기존 pickle로 읽음)
+MAGIC = b'PPC1'
+_HEADER = struct.Struct('>BBddd')
+
+FORMATS = {'json': 1, 'msgpack': 2}
+COMPRESSIONS = {None: 0, 'zlib': 1, 'zstd': 2, 'lz4': 3}
+
+# 압축 수준 (응답 경로에서 실행되므로 압축률보다 속도 우선)
+ZLIB_LEVEL = 1
+ZSTD_LEVEL = 3
+
+_ENTRY_KEYS = frozenset(('data', 'computed_at', 'delta', 'soft_expires_at'))
+
+_drf_default = JSONEncoder().default
+
+# DRF JSONRenderer는 U+2028/U+2029를 항상 이스케이프 (JSON을 JavaScript 부분집합으로)
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class CachedEntry(dict):
+    """
+    디코딩한 검색 캐시 엔트리
+
+    json 형식은 응답 본문(body, 렌더링된 JSON bytes)만 갖고 있다가
+    data를 처음 읽을 때 파싱합니다. (캐시 히트 응답은 body를 그대로 전송)
+    """
+
+    def __missing__(self, key: str) -> Any:
+        if key == 'data' and 'body' in self:
+            data = orjson.loads(self['body'])
+            self['data'] = data
+            return data
+        raise KeyError(key)
+
+
+def is_search_entry(value: Any) -> bool:
+    """make_cache_entry가 만든 검색 캐시 엔트리인지 (그 외 캐시 값은 pickle)"""
+    return isinstance(value, dict) and _ENTRY_KEYS.issubset(value.keys())
+
+
+def render_json(data: Any) -> bytes:
+    """
+    DRF JSONRenderer와 같은 내용의 JSON (orjson, 압축 표기 + UTF-8 그대로)
+
+    Decimal/datetime/UUID 등은 DRF 인코더 규칙으로 변환하고, U+2028/U+2029는 DRF처럼 이스케이프
+    """
+    body = orjson.dumps(data, default=_drf_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in body:
+            body = body.replace(raw, escaped)
+    return body
+
+
+def response_body(entry: Dict[str, Any]) -> Optional[bytes]:
+    """캐시 엔트리의 렌더링된 응답 본문 (json 형식만, 없으면 None -> data를 렌더링)"""
+    return entry.get('body')
+
+
+class PrerenderedResponse(Response):
+    """
+    렌더링된 JSON 본문을 가진 DRF Response (캐시 히트 응답)
+
+    JSON 렌더러가 선택되면 본문을 다시 렌더링하지 않고 그대로 전송하고,
+    그 외(Browsable API 등)에는 미스 응답처럼 data를 렌더링합니다. data는 처음 읽을 때 파싱
+    """
+
+    def __init__(self, body: bytes, **kwargs: Any) -> None:
+        self.rendered_body = body
+        super().__init__(**kwargs)
+
+    @property
+    def data(self) -> Any:
+        if self._data is None:
+            self._data = orjson.loads(self.rendered_body)
+        return self._data
+
+    @data.setter
+    def data(self, value: Any) -> None:
+        self._data = value
+
+    @property
+    def rendered_content(self) -> bytes:
+        renderer = getattr(self, 'accepted_renderer', None)
+        if renderer is None or renderer.format != 'json':
+            return super().rendered_content
+        content_type = self.content_type
+        if content_type is None:
+            content_type = renderer.media_type
+            if renderer.charset is not None:
+                content_type = f"{content_type}; charset={renderer.charset}"
+        self['Content-Type'] = content_type
+        return self.rendered_body
+
+
+def encode_entry(entry: Dict[str, Any], format_name: str, compression: Optional[str],
+                 min_bytes: int) -> Tuple[bytes, int]:
+    """
+    검색 캐시 엔트리를 프레임으로 인코딩
+
+    Args:
+        entry: make_cache_entry 결과 (body가 있으면 다시 렌더링하지 않음)
+        format_name: 'json' | 'msgpack'
+        compression: None | 'zlib' | 'zstd' | 'lz4'
+        min_bytes: 본문이 이 크기 이상일 때만 압축
+
+    Returns:
+        (프레임 bytes, 압축 전 본문 크기)
+    """
+    if format_name == 'json':
+        body = entry.get('body') or render_json(entry['data'])
+    elif format_name == 'msgpack':
+        if msgpack is None:
+            raise ImproperlyConfigured('msgpack 형식에는 msgpack 패키지가 필요합니다.')
+        body = msgpack.packb(entry['data'], default=_drf_default)
+    else:
+        raise ImproperlyConfigured(f'지원하지 않는 캐시 형식: {format_name}')
+
+    raw_size = len(body)
+    if compression is None or raw_size < min_bytes:
+        compression = None
+    else:
+        body = _compress(compression, body)
+    header = _HEADER.pack(FORMATS[format_name], COMPRESSIONS[compression],
+                          entry['computed_at'], entry['delta'], entry['soft_expires_at'])
+    return MAGIC + header + body, raw_size
+
+
+def decode_entry(frame: bytes) -> CachedEntry:
+    """
+    프레임을 캐시 엔트리로 디코딩 (json은 본문 파싱 없이 body로 보관)
+
+    Raises:
+        ValueError: 알 수 없는 형식/압축
+    """
+    format_id, compression_id, computed_at, delta, soft_expires_at = _HEADER.unpack_from(frame, len(MAGIC))
+    body = frame[len(MAGIC) + _HEADER.size:]
+    if compression_id:
+        body = _decompress(compression_id, body)
+
+    entry = CachedEntry(computed_at=computed_at, delta=delta, soft_expires_at=soft_expires_at)
+    if format_id == FORMATS['json']:
+        entry['body'] = body
+    elif format_id == FORMATS['msgpack']:
+        if msgpack is None:
+            raise ImproperlyConfigured('msgpack 형식 엔트리를 읽으려면 msgpack 패키지가 필요합니다.')
+        entry['data'] = msgpack.unpackb(body)
+    else:
+        raise ValueError(f'알 수 없는 캐시 형식: {format_id}')
+    return entry
+
+
+def _compress(name: str, body: bytes) -> bytes:
+    if name == 'zlib':
+        return zlib.compress(body, ZLIB_LEVEL)
+    if name == 'zstd':
+        if zstandard is None:
+            raise ImproperlyConfigured('zstd 압축에는 zstandard 패키지가 필요합니다.')
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if name == 'lz4':
+        if lz4_frame is None:
+            raise ImproperlyConfigured('lz4 압축에는 lz4 패키지가 필요합니다.')
+        return lz4_frame.compress(body)
+    raise ImproperlyConfigured(f'지원하지 않는 압축 방식: {name}')
+
+
+def _decompress(compression_id: int, body: bytes) -> bytes:
+    if compression_id == COMPRESSIONS['zlib']:
+        return zlib.decompress(body)
+    if compression_id == COMPRESSIONS['zstd']:
+        if zstandard is None:
+            raise ImproperlyConfigured('zstd 압축 엔트리를 읽으려면 zstandard 패키지가 필요합니다.')
+        return zstandard.ZstdDecompressor().decompress(body)
+    if compression_id == COMPRESSIONS['lz4']:
+        if lz4_frame is None:
+            raise ImproperlyConfigured('lz4 압축 엔트리를 읽으려면 lz4 패키지가 필요합니다.')
+        return lz4_frame.decompress(body)
+    raise ValueError(f'알 수 없는 압축 방식: {compression_id}')
+
+
+class SearchCacheSerializer(PickleSerializer):
+    """
+    django-redis SERIALIZER: 검색 캐시 엔트리만 SEARCH_CACHE_CODEC으로, 나머지 값은 기존처럼 pickle
+
+    pickle은 ReturnDict/OrderedDict 구조와 상품마다 반복되는 브랜드/성분 dict를 그대로 저장해서
+    Redis 메모리를 많이 쓰고, 히트마다 unpickle + JSON 렌더링이 필요했습니다.
+    json 형식은 렌더링된 응답 본문을 저장하므로 히트 시 그대로 전송합니다.
+    """
+
+    def dumps(self, value: Any) -> bytes:
+        config = settings.SEARCH_CACHE_CODEC
+        if not is_search_entry(value) or config['FORMAT'] == 'pickle':
+            return super().dumps(value)
+
+        started = time.perf_counter()
+        frame, raw_size = encode_entry(value, config['FORMAT'], config['COMPRESSION'] or None,
+                                       config['COMPRESS_MIN_BYTES'])
+        observe_codec('encode', time.perf_counter() - started, raw_size, len(frame))
+        return frame
+
+    def loads(self, value: bytes) -> Any:
+        if not value.startswith(MAGIC):
+            return super().loads(value)
+
+        started = time.perf_counter()
+        entry = decode_entry(value)
+        observe_codec('decode', time.perf_counter() - started)
+        return entry
@@ -1,20 +1,40 @@
+from typing import Dict, List
+
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
+from .analysis import korean_index_analyzer, korean_search_analyzer, ngram_analyzer
 from .models import Product, Brand, Ingredient
 
+
+# 한국어 형태소(nori) + 동의어(검색 시) 분석 텍스트 필드
+def korean_text_field(**kwargs) -> fields.TextField:
+    return fields.TextField(analyzer=korean_index_analyzer, search_analyzer=korean_search_analyzer, **kwargs)
+
+
 @registry.register_document
 class ProductDocument(Document):
     # 1. 관계 데이터 처리 (Join 성능 해결)
     # ES는 NoSQL이라 데이터를 '평면화(Flatten)'해서 저장해야 성능이 좋습니다.
+    # ProductSerializer가 내보내는 필드를 모두 담아두면 검색 결과를 MySQL 없이
+    # _source만으로 만들 수 있습니다. (SEARCH_RESULT_SOURCE = 'document')
+    # 검색 대상 텍스트는 nori 형태소 분석 ("수분크림" == "수분 크림"), 상품명은 부분 일치용 ngram 서브필드 추가
+    name = korean_text_field(fields={'ngram': fields.TextField(analyzer=ngram_analyzer)})
+
     brand = fields.ObjectField(properties={
-        'name': fields.TextField(),
+        'id': fields.IntegerField(),
+        'name': korean_text_field(fields={'raw': fields.KeywordField()}),  # raw: 패싯 집계용
+        'website_url': fields.KeywordField(index=False),  # 응답용 (검색 X)
     })
 
     ingredients = fields.NestedField(properties={
-        'name': fields.TextField(),
+        'id': fields.IntegerField(),
+        'name': korean_text_field(),
         'ewg_score': fields.IntegerField(),
     })
 
+    # 자동완성 (completion suggester): 상품명, 브랜드명, 성분명을 입력으로 색인
+    suggest = fields.CompletionField()
+
     class Index:
         # ES에 저장될 인덱스 이름 (RDB의 Table Name과 비슷)
         name = 'products'
@@ -28,13 +48,23 @@ class ProductDocument(Document):
 
         # ES에 저장할 필드들 (검색에 쓰일 것들 위주로)
         fields = [
-            'name',      # 상품명
             'price',     # 가격 (필터링용)
             'image_url', # 결과 보여주기용
             'id',
+            'created_at', # 결과 보여주기용 (ProductSerializer와 동일한 응답)
+            # 성분 안전도 집계 (nested 쿼리 없이 숫자 필드로 필터/정렬)
+            'max_ewg_score',
+            'avg_ewg_score',
+            'ingredient_count',
+            'has_hazardous_ingredient',
         ]
 
         # 2. 데이터 동기화 옵션
-        # DB가 변하면 ES도 자동으로 변하게 할 것인가? (False면 수동 업데이트)
-        # 개발 편의를 위해 True로 두겠지만, 대용량 실무에선 Celery로 뺍니다.
-        ignore_signals = False
\ No newline at end of file
+        # 저장할 때마다 동기 색인하지 않고, signals.py가 변경된 상품 ID를 outbox(Redis Set)에 모아
+        # sync_search_index 명령이 _bulk로 일괄 색인합니다. (products/index_sync.py)
+        ignore_signals = True
+
+    def prepare_suggest(self, instance: Product) -> Dict[str, List[str]]:
+        """자동완성 입력 (중복 제거, 성분은 iter_product_chunks의 prefetch 결과 사용)"""
+        names = [instance.name, instance.brand.name] + [ingredient.name for ingredient in instance.ingredients.all()]
+        return {'input': list(dict.fromkeys(name for name in names if name))}
@@ -0,0 +1,38 @@
+from typing import Any, Dict, Optional
+
+from rest_framework import status
+
+
+class SearchError(Exception):
+    """
+    검색 처리 중 발생한 오류 (HTTP 응답으로 변환)
+
+    single-flight로 병합된 요청들이 같은 오류 응답을 받을 수 있도록
+    Response 대신 예외로 전달합니다.
+    """
+
+    def __init__(self, error: str, detail: Optional[str] = None,
+                 status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR) -> None:
+        super().__init__(error)
+        self.error = error
+        self.detail = detail
+        self.status_code = status_code
+
+    def to_dict(self) -> Dict[str, Any]:
+        """에러 응답 본문"""
+        data = {'error': self.error}
+        if self.detail is not None:
+            data['detail'] = self.detail
+        return data
+
+
+class CircuitOpenError(SearchError):
+    """차단기가 열려 의존 서비스를 호출하지 않음 (대체 응답 대상, 대체 응답이 없으면 503)"""
+
+    def __init__(self, service: str) -> None:
+        super().__init__(
+            f'{service} 서비스에 연결할 수 없습니다.',
+            '검색 기능을 일시적으로 사용할 수 없습니다.',
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.service = service
@@ -0,0 +1,202 @@
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import models
+from elasticsearch_dsl import A, Q
+
+# 한 번에 지정할 수 있는 브랜드/제외 성분 수 (terms 필터 크기 제한)
+MAX_FILTER_IDS = 20
+
+EWG_SCORE_RANGE = (1, 10)
+
+# sort 파라미터 값 (relevance: ES 점수순, safety: 최대 EWG 등급 -> 평균 EWG 등급 오름차순 후 점수순)
+SORT_OPTIONS = ('relevance', 'safety')
+
+
+class InvalidFilterError(ValueError):
+    """잘못된 필터 파라미터 (400 응답용)"""
+
+
+class SearchFilters(NamedTuple):
+    """검증이 끝난 검색 필터/정렬 (필터는 ES filter context로 실행: 점수 계산 없음, 노드 캐시 대상)"""
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    brands: Tuple[int, ...] = ()                # 브랜드 ID (OR)
+    max_ewg: Optional[int] = None               # 모든 성분의 EWG 등급이 이 값 이하
+    exclude_ingredients: Tuple[int, ...] = ()   # 하나라도 포함하면 제외할 성분 ID
+    sort: str = 'relevance'
+
+    def cache_params(self) -> Dict[str, Any]:
+        """캐시 키에 포함할 필터 파라미터 (ID는 정렬된 값이라 순서가 달라도 같은 키)"""
+        return {
+            'min_price': self.min_price,
+            'max_price': self.max_price,
+            'brand': ','.join(map(str, self.brands)),
+            'max_ewg': self.max_ewg,
+            'exclude_ingredient': ','.join(map(str, self.exclude_ingredients)),
+            'sort': None if self.sort == 'relevance' else self.sort,
+        }
+
+    def sort_fields(self) -> List[Any]:
+        """점수보다 앞에 둘 정렬 필드 (안전도 정렬은 비정규화된 숫자 필드만 사용, 성분 정보가 없는 상품은 뒤로)"""
+        if self.sort != 'safety':
+            return []
+        return [
+            {'max_ewg_score': {'order': 'asc', 'missing': '_last'}},
+            {'avg_ewg_score': {'order': 'asc', 'missing': '_last'}},
+        ]
+
+    def to_query(self) -> Optional[Q]:
+        """
+        bool 필터 쿼리 생성
+
+        Returns:
+            filter/must_not만 있는 bool 쿼리 (필터가 없으면 None)
+        """
+        filters, excludes = [], []
+        if self.min_price is not None or self.max_price is not None:
+            price = {}
+            if self.min_price is not None:
+                price['gte'] = self.min_price
+            if self.max_price is not None:
+                price['lte'] = self.max_price
+            filters.append(Q('range', price=price))
+        if self.brands:
+            filters.append(Q('terms', **{'brand.id': list(self.brands)}))
+        if self.max_ewg is not None:
+            # 상품별 최대 EWG 등급(비정규화 필드)으로 판단, 성분이 없는 상품(값 없음)은 통과
+            excludes.append(Q('range', max_ewg_score={'gt': self.max_ewg}))
+        if self.exclude_ingredients:
+            excludes.append(Q('nested', path='ingredients',
+                              query=Q('terms', **{'ingredients.id': list(self.exclude_ingredients)})))
+
+        if not filters and not excludes:
+            return None
+        return Q('bool', filter=filters, must_not=excludes)
+
+    def apply_to_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
+        """
+        같은 필터/정렬을 ORM 쿼리로 적용 (ES 장애 시 MySQL 대체 검색용)
+
+        Args:
+            queryset: Product 쿼리셋
+
+        Returns:
+            필터와 정렬(안전도 정렬이 아니면 최신순)이 적용된 쿼리셋
+        """
+        if self.min_price is not None:
+            queryset = queryset.filter(price__gte=self.min_price)
+        if self.max_price is not None:
+            queryset = queryset.filter(price__lte=self.max_price)
+        if self.brands:
+            queryset = queryset.filter(brand_id__in=self.brands)
+        if self.max_ewg is not None:
+            queryset = queryset.exclude(max_ewg_score__gt=self.max_ewg)
+        if self.exclude_ingredients:
+            queryset = queryset.exclude(ingredients__id__in=self.exclude_ingredients)
+
+        if self.sort == 'safety':
+            return queryset.order_by(
+                models.F('max_ewg_score').asc(nulls_last=True),
+                models.F('avg_ewg_score').asc(nulls_last=True),
+                '-id',
+            )
+        return queryset.order_by('-id')
+
+
+def _parse_int(params: Mapping[str, str], name: str, minimum: int = 0,
+               maximum: Optional[int] = None) -> Optional[int]:
+    raw = params.get(name, '').strip()
+    if not raw:
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise InvalidFilterError(f'{name}은(는) 숫자여야 합니다.')
+    if value < minimum or (maximum is not None and value > maximum):
+        bound = f'{minimum}~{maximum}' if maximum is not None else f'{minimum} 이상'
+        raise InvalidFilterError(f'{name}은(는) {bound}이어야 합니다.')
+    return value
+
+
+def _parse_ids(params: Mapping[str, str], name: str) -> Tuple[int, ...]:
+    raw = params.get(name, '').strip()
+    if not raw:
+        return ()
+    try:
+        ids = {int(value) for value in raw.split(',') if value.strip()}
+    except ValueError:
+        raise InvalidFilterError(f'{name}은(는) 쉼표로 구분한 ID여야 합니다.')
+    if any(pk < 1 for pk in ids):
+        raise InvalidFilterError(f'{name}은(는) 쉼표로 구분한 ID여야 합니다.')
+    if len(ids) > MAX_FILTER_IDS:
+        raise InvalidFilterError(f'{name}은(는) 최대 {MAX_FILTER_IDS}개까지 지정할 수 있습니다.')
+    return tuple(sorted(ids))
+
+
+def parse_search_filters(params: Mapping[str, str]) -> SearchFilters:
+    """
+    검색 필터 쿼리 파라미터 검증
+
+    Args:
+        params: request.query_params (min_price, max_price, brand, max_ewg, exclude_ingredient, sort)
+
+    Returns:
+        SearchFilters
+
+    Raises:
+        InvalidFilterError: 숫자가 아니거나 범위를 벗어난 값, min_price > max_price, 알 수 없는 정렬
+    """
+    sort = params.get('sort', '').strip() or 'relevance'
+    if sort not in SORT_OPTIONS:
+        raise InvalidFilterError(f"sort는 {', '.join(SORT_OPTIONS)} 중 하나여야 합니다.")
+    filters = SearchFilters(
+        min_price=_parse_int(params, 'min_price'),
+        max_price=_parse_int(params, 'max_price'),
+        brands=_parse_ids(params, 'brand'),
+        max_ewg=_parse_int(params, 'max_ewg', *EWG_SCORE_RANGE),
+        exclude_ingredients=_parse_ids(params, 'exclude_ingredient'),
+        sort=sort,
+    )
+    if filters.min_price is not None and filters.max_price is not None and filters.min_price > filters.max_price:
+        raise InvalidFilterError('min_price는 max_price 이하여야 합니다.')
+    return filters
+
+
+def add_facet_aggregations(search: Any) -> None:
+    """
+    검색 요청에 패싯 집계 추가 (hit 조회와 같은 ES 요청에서 계산)
+
+    - brands: 브랜드 ID별 상품 수 (+ 표시용 브랜드명)
+    - price: PRICE_INTERVAL 간격 가격 히스토그램
+    - ewg: 최대 EWG 등급별 상품 수 (비정규화 필드 max_ewg_score)
+    """
+    config = settings.SEARCH_FACETS
+    brands = A('terms', field='brand.id', size=config['BRAND_SIZE'])
+    brands.bucket('name', 'terms', field='brand.name.raw', size=1)
+    search.aggs.bucket('brands', brands)
+    search.aggs.bucket('price', 'histogram', field='price', interval=config['PRICE_INTERVAL'], min_doc_count=1)
+    search.aggs.bucket('ewg', 'terms', field='max_ewg_score', size=EWG_SCORE_RANGE[1])
+
+
+def parse_facets(aggregations: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    ES 집계 결과를 응답용 패싯으로 변환
+
+    Returns:
+        {'brands': [{id, name, count}], 'price': [{from, to, count}], 'ewg': [{score, count}]}
+    """
+    interval = settings.SEARCH_FACETS['PRICE_INTERVAL']
+    brands = []
+    for bucket in aggregations.brands.buckets:
+        names = list(bucket.name.buckets)
+        brands.append({'id': bucket.key, 'name': names[0].key if names else None, 'count': bucket.doc_count})
+    price = [
+        {'from': int(bucket.key), 'to': int(bucket.key) + interval, 'count': bucket.doc_count}
+        for bucket in aggregations.price.buckets
+    ]
+    ewg = sorted(
+        ({'score': int(bucket.key), 'count': bucket.doc_count} for bucket in aggregations.ewg.buckets),
+        key=lambda item: item['score'],
+    )
+    return {'brands': brands, 'price': price, 'ewg': ewg}
@@ -0,0 +1,261 @@
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from .cache_codec import CachedEntry, render_json
+from .exceptions import SearchError
+from .models import Product
+from .resilience import budget_exhausted, db_stage_timeout, get_breaker
+from .search_cache import search_redis
+from .serializers import ProductSerializer
+from .timing import stage
+
+logger = logging.getLogger(__name__)
+
+# 상품 조각 캐시 키: ProductSerializer 출력(렌더링된 JSON)을 상품별로 저장
+# 버전은 updated_at(마이크로초)이라 상품이 바뀌면 새 키를 쓰고, 이전 조각은 TTL로 만료
+FRAGMENT_KEY = "product:{id}:v{version}"
+
+# 검색 캐시에 저장하는 ID 목록 페이지의 결과 자리 ([상품 ID, ...], 조각 버전은 히트마다 MySQL에서 확인)
+RESULT_IDS = 'result_ids'
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_EMPTY_RESULTS = b'"results":[]'
+
+
+class PageResults(list):
+    """
+    검색 결과 페이지의 상품 목록 (ProductSerializer 출력 + 상품별 조각 버전)
+
+    검색 캐시에는 목록 대신 상품 ID만 저장합니다.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]], versions: List[List[int]]) -> None:
+        super().__init__(items)
+        self.versions = versions
+
+
+def fragments_enabled() -> bool:
+    """검색 캐시에 ID 목록 페이지를 저장하는지 (ES _source로 응답하면 페이지 전체를 저장)"""
+    return settings.SEARCH_FRAGMENT_CACHE['ENABLED'] and settings.SEARCH_RESULT_SOURCE != 'document'
+
+
+def fragment_version(updated_at: datetime) -> int:
+    """조각 버전 (updated_at의 마이크로초 단위 epoch, float 반올림 없이 정수로 계산)"""
+    return (updated_at - _EPOCH) // timedelta(microseconds=1)
+
+
+def fragment_key(product_id: int, version: int) -> str:
+    """상품 조각 캐시 키 (예: "product:42:v1700000000000000")"""
+    return FRAGMENT_KEY.format(id=product_id, version=version)
+
+
+def is_id_page(data: Any) -> bool:
+    """검색 캐시의 응답 데이터가 ID 목록 페이지인지 (조각 조합 필요)"""
+    return isinstance(data, dict) and RESULT_IDS in data
+
+
+def is_id_page_entry(entry: Dict[str, Any]) -> bool:
+    """
+    검색 캐시 엔트리가 ID 목록 페이지인지
+
+    json 형식 엔트리는 본문을 파싱하지 않고 키 이름으로 확인
+    (문자열 값 안의 따옴표는 이스케이프되므로 키로만 나타남)
+    """
+    if 'data' in entry:
+        return is_id_page(entry['data'])
+    body = entry.get('body')
+    return body is not None and b'"' + RESULT_IDS.encode() + b'":' in body
+
+
+def page_skeleton(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    검색 캐시에 저장할 ID 목록 페이지 (results 자리에 result_ids, 나머지 키와 순서는 그대로)
+
+    Returns:
+        ID 목록 페이지 (results가 PageResults가 아니면 None -> 페이지 전체를 저장)
+    """
+    results = data.get('results')
+    if not isinstance(results, PageResults):
+        return None
+    return {
+        (RESULT_IDS if name == 'results' else name): (
+            [pk for pk, _ in results.versions] if name == 'results' else value
+        )
+        for name, value in data.items()
+    }
+
+
+def load_page_results(product_ids: Sequence[int]) -> PageResults:
+    """
+    캐시 미스: ES가 돌려준 상품 ID 순서대로 결과 목록 생성
+
+    1. MySQL에서 ID별 updated_at만 조회 (기본 키 조회, 조인 없음)
+    2. 조각을 MGET 한 번으로 조회
+    3. 없는 조각만 MySQL 한 번(+ 성분 prefetch)으로 조회해 직렬화하고 조각으로 저장
+
+    Raises:
+        SearchError: DB 조회 실패
+    """
+    # ES 문서 ID는 문자열
+    versions = _current_versions([int(pk) for pk in product_ids])
+    fragments = _fetch(versions)
+    hydrated = _hydrate([pk for pk, version in versions if (pk, version) not in fragments])
+
+    items, page_versions = [], []
+    with stage('serialize'):
+        for pk, version in versions:
+            if (pk, version) in fragments:
+                items.append(orjson.loads(fragments[(pk, version)]))
+            elif pk in hydrated:
+                # 두 조회 사이에 바뀐 상품은 새 버전으로
+                version, item, _ = hydrated[pk]
+                items.append(item)
+            else:
+                # 두 조회 사이에 삭제된 상품
+                continue
+            page_versions.append([pk, version])
+    return PageResults(items, page_versions)
+
+
+def compose_body(data: Dict[str, Any]) -> bytes:
+    """
+    ID 목록 페이지를 응답 본문으로 조합 (DRF 응답과 같은 bytes)
+
+    상품별 현재 조각 버전(updated_at)을 기본 키 조회 한 번으로 확인하고, 조각은 MGET 한 번으로 가져오며,
+    만료/축출되었거나 상품 수정으로 버전이 바뀐 조각만 MySQL 한 번으로 다시 만들어 저장합니다.
+    (상품 하나를 수정해도 그 상품의 조각만 바뀌고 ID 목록은 그대로 사용)
+    목록 조각 사이의 본문(count/next/previous/facets)은 ID 목록 페이지를 렌더링한 그대로 사용
+
+    Raises:
+        SearchError: DB 조회 실패
+    """
+    # 이전 형식 엔트리([[상품 ID, 조각 버전], ...])는 ID만 사용
+    versions = _current_versions([item[0] if isinstance(item, list) else item for item in data[RESULT_IDS]])
+    fragments = _fetch(versions)
+    hydrated = _hydrate([pk for pk, version in versions if (pk, version) not in fragments])
+
+    parts = []
+    for pk, version in versions:
+        if (pk, version) in fragments:
+            parts.append(fragments[(pk, version)])
+        elif pk in hydrated:
+            parts.append(hydrated[pk][2])
+
+    skeleton = render_json({
+        ('results' if name == RESULT_IDS else name): ([] if name == RESULT_IDS else value)
+        for name, value in data.items()
+    })
+    head, tail = skeleton.split(_EMPTY_RESULTS, 1)
+    return b''.join((head, b'"results":[', b','.join(parts), b']', tail))
+
+
+def compose_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    검색 캐시 엔트리 응답 준비 (ID 목록 페이지면 조각을 조합한 본문을 가진 엔트리, 아니면 그대로)
+
+    조합한 엔트리는 L1 캐시에도 그대로 보관 (L1 히트는 Redis 조회 없음)
+
+    Raises:
+        SearchError: DB 조회 실패
+    """
+    if not is_id_page_entry(entry):
+        return entry
+    return CachedEntry(
+        body=compose_body(entry['data']),
+        computed_at=entry['computed_at'],
+        delta=entry['delta'],
+        soft_expires_at=entry['soft_expires_at'],
+    )
+
+
+def expand_page(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """ID 목록 페이지면 조각을 채운 응답 데이터로 (single-flight 대기, 이전 버전 대체 응답용)"""
+    if not is_id_page(data):
+        return data
+    return orjson.loads(compose_body(data))
+
+
+def _current_versions(product_ids: List[int]) -> List[List[int]]:
+    """
+    상품 ID 순서대로 현재 조각 버전 (updated_at만 기본 키로 조회, 조인 없음, 삭제된 상품은 빠짐)
+
+    Raises:
+        SearchError: DB 조회 실패
+    """
+    try:
+        with stage('db'), db_stage_timeout():
+            updated = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'updated_at'))
+    except Exception as e:
+        logger.error(f"데이터베이스 조회 오류: {str(e)}")
+        raise SearchError('데이터를 조회할 수 없습니다.', str(e))
+    return [[pk, fragment_version(updated[pk])] for pk in product_ids if pk in updated]
+
+
+def _fetch(versions: Sequence[Sequence[int]]) -> Dict[Tuple[int, int], bytes]:
+    """조각 MGET (Redis 차단 중이거나 실패하면 빈 결과 -> 전부 MySQL에서 조회)"""
+    if not versions:
+        return {}
+    redis_breaker = get_breaker('redis')
+    if not redis_breaker.allow():
+        return {}
+    try:
+        with redis_breaker.calling(), stage('cache'):
+            values = search_redis().mget(
+                [fragment_key(pk, version) for pk, version in versions]
+            )
+    except Exception as e:
+        logger.warning(f"상품 조각 조회 실패: {str(e)}")
+        return {}
+    return {(pk, version): value for (pk, version), value in zip(versions, values) if value is not None}
+
+
+def _hydrate(product_ids: List[int]) -> Dict[int, Tuple[int, Dict[str, Any], bytes]]:
+    """
+    조각이 없는 상품만 한 번에 조회/직렬화하고 조각으로 저장
+
+    Returns:
+        {상품 ID: (조각 버전, ProductSerializer 출력, 렌더링된 조각)} (삭제된 상품은 빠짐)
+
+    Raises:
+        SearchError: DB 조회 실패
+    """
+    if not product_ids:
+        return {}
+    try:
+        with stage('db'), db_stage_timeout():
+            products = list(
+                Product.objects.filter(id__in=product_ids).select_related('brand').prefetch_related('ingredients')
+            )
+    except Exception as e:
+        logger.error(f"데이터베이스 조회 오류: {str(e)}")
+        raise SearchError('데이터를 조회할 수 없습니다.', str(e))
+
+    with stage('serialize'):
+        hydrated = {}
+        for product, item in zip(products, ProductSerializer(products, many=True).data):
+            hydrated[product.pk] = (fragment_version(product.updated_at), item, render_json(item))
+    _store(hydrated)
+    return hydrated
+
+
+def _store(hydrated: Dict[int, Tuple[int, Dict[str, Any], bytes]]) -> None:
+    """조각 저장 (파이프라인 한 번, 실패는 로그만 남김)"""
+    # 마감 시간이 지났으면 저장 생략 (다음 요청이 다시 만듦)
+    redis_breaker = get_breaker('redis')
+    if not hydrated or budget_exhausted() or not redis_breaker.allow():
+        return
+    ttl = settings.SEARCH_FRAGMENT_CACHE['TTL']
+    try:
+        with redis_breaker.calling(), stage('cache'):
+            pipe = get_redis_connection("default").pipeline(transaction=False)
+            for pk, (version, _, body) in hydrated.items():
+                pipe.set(fragment_key(pk, version), body, ex=ttl)
+            pipe.execute()
+        logger.debug(f"상품 조각 저장: {len(hydrated)}건")
+    except Exception as e:
+        logger.warning(f"상품 조각 저장 실패 (계속 진행): {str(e)}")
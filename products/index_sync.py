@@ -0,0 +1,365 @@
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+
+from .documents import ProductDocument
+from .fragments import fragments_enabled
+from .models import Brand, Ingredient, Product
+from .safety import recompute_safety
+from .search_cache import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+# 색인이 필요한 상품 ID (Redis Set, outbox)
+DIRTY_KEY = "search:index:dirty"
+# 검색 결과에 영향이 없는 필드만 바뀐 상품 ID (색인 후 카탈로그 버전을 올리지 않음)
+CONTENT_DIRTY_KEY = "search:index:dirty:content"
+# 브랜드/성분 변경을 소속 상품에 반영할 작업 ("{brand|ingredient}:{ID}:{안전도 재계산}:{버전 증가}")
+FANOUT_KEY = "search:index:fanout"
+
+# 증분 색인 워터마크 (마지막으로 반영한 updated_at 기준 시각, ISO 8601)
+WATERMARK_KEY = "search:index:watermark"
+# 워터마크보다 이만큼 앞에서부터 다시 조회 (늦게 커밋된 트랜잭션의 updated_at 보정)
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# _bulk 요청 타임아웃 (초) - 검색용으로 짧게 잡은 ES 클라이언트 타임아웃(운영 프로필)과 별개
+BULK_REQUEST_TIMEOUT = 60
+
+
+def enqueue_products(product_ids: Iterable[int], bump_version: bool = True) -> None:
+    """
+    상품 ID를 재색인 대상으로 등록 (트랜잭션 커밋 이후 반영, 롤백되면 버림)
+
+    Args:
+        product_ids: 상품 ID 목록
+        bump_version: False면 검색 결과(매칭/필터/정렬/패싯)에 영향이 없는 변경
+            (검색 캐시의 ID 목록은 그대로 두고, 바뀐 상품의 조각만 updated_at 버전으로 새로 만듦)
+    """
+    ids = sorted({pk for pk in product_ids if pk is not None})
+    if ids:
+        transaction.on_commit(partial(mark_dirty, ids, bump_version))
+
+
+def mark_dirty(product_ids: List[int], bump_version: bool = True) -> None:
+    """
+    재색인 대상 기록
+
+    - outbox 모드: Redis Set에 ID만 추가 (sync_search_index 명령이 일괄 색인)
+    - immediate 모드: 바로 bulk 색인 (테스트, 로컬 개발용)
+
+    Note:
+        ELASTICSEARCH_DSL_AUTOSYNC = False면 색인하지 않고 캐시 무효화(카탈로그 버전)만 수행
+        Redis 장애 시 즉시 색인으로 대체 (변경이 유실되지 않도록)
+        검색 캐시가 페이지 전체를 저장하는 설정(fragments_enabled() False)이면 항상 버전을 올림
+    """
+    bump_version = bump_version or not fragments_enabled()
+    if not getattr(settings, 'ELASTICSEARCH_DSL_AUTOSYNC', True):
+        if bump_version:
+            bump_catalog_version()
+        return
+
+    if settings.SEARCH_INDEX_SYNC['MODE'] == 'immediate':
+        sync_products(product_ids, bump_version=bump_version)
+        return
+
+    try:
+        get_redis_connection("default").sadd(DIRTY_KEY if bump_version else CONTENT_DIRTY_KEY, *product_ids)
+        logger.debug(f"재색인 대상 등록: {len(product_ids)}개")
+    except Exception as e:
+        logger.warning(f"재색인 대상 등록 실패, 즉시 색인: {str(e)}")
+        sync_products(product_ids, bump_version=bump_version)
+
+
+def enqueue_fanout(kind: str, pk: int, recompute: bool = False, bump_version: bool = True) -> None:
+    """
+    브랜드/성분 변경을 소속 상품에 반영하는 작업 등록 (트랜잭션 커밋 이후, 롤백되면 버림)
+
+    소속 상품이 수십만 개일 수 있으므로 저장 요청에서는 작업만 등록하고,
+    outbox 모드에서는 sync_search_index가 배치 단위로 처리합니다. (그 외 모드는 커밋 직후 배치 처리)
+
+    Args:
+        kind: 'brand' | 'ingredient'
+        pk: 브랜드/성분 ID
+        recompute: 상품 안전도 집계도 다시 계산 (성분 EWG 등급 변경)
+        bump_version: enqueue_products와 같음
+    """
+    transaction.on_commit(partial(mark_fanout, kind, pk, recompute, bump_version))
+
+
+def mark_fanout(kind: str, pk: int, recompute: bool = False, bump_version: bool = True) -> None:
+    """
+    소속 상품 반영 작업 기록 (outbox 모드는 Redis Set, 그 외 모드/Redis 장애 시 바로 처리)
+    """
+    if getattr(settings, 'ELASTICSEARCH_DSL_AUTOSYNC', True) and settings.SEARCH_INDEX_SYNC['MODE'] == 'outbox':
+        try:
+            get_redis_connection("default").sadd(FANOUT_KEY, f"{kind}:{pk}:{int(recompute)}:{int(bump_version)}")
+            return
+        except Exception as e:
+            logger.warning(f"소속 상품 반영 작업 등록 실패, 바로 처리: {str(e)}")
+    fan_out(kind, pk, recompute, bump_version)
+
+
+def fan_out(kind: str, pk: int, recompute: bool = False, bump_version: bool = True,
+            batch_size: Optional[int] = None) -> int:
+    """
+    브랜드/성분의 소속 상품을 id keyset 배치로 나눠 반영
+
+    배치마다 updated_at 갱신(상품 조각 캐시 키가 바뀌도록, 증분 색인 워터마크용) 또는 안전도 재계산 후
+    재색인 대상으로 등록 (한 번에 갱신하는 행 수는 batch_size 이하)
+
+    Returns:
+        반영한 상품 수
+    """
+    batch_size = batch_size or settings.SEARCH_INDEX_SYNC['BATCH_SIZE']
+    if kind == 'brand':
+        queryset = Product.objects.filter(brand_id=pk)
+    else:
+        queryset = Product.objects.filter(ingredients=pk)
+
+    total = 0
+    for ids in iter_product_id_chunks(batch_size, queryset):
+        if recompute:
+            recompute_safety(ids, batch_size=batch_size, touch=True)
+        else:
+            Product.objects.filter(id__in=ids).update(updated_at=timezone.now())
+        mark_dirty(ids, bump_version)
+        total += len(ids)
+    logger.info(f"소속 상품 반영: {kind} {pk}, {total}개")
+    return total
+
+
+def run_fanouts() -> int:
+    """
+    등록된 소속 상품 반영 작업을 모두 처리 (sync_search_index에서 호출)
+
+    Returns:
+        처리한 작업 수
+
+    Note:
+        처리 실패 시 꺼낸 작업을 다시 넣고 예외를 전달
+    """
+    con = get_redis_connection("default")
+    done = 0
+    while True:
+        job = con.spop(FANOUT_KEY)
+        if job is None:
+            return done
+        kind, pk, recompute, bump_version = job.decode('utf-8').split(':')
+        try:
+            fan_out(kind, int(pk), recompute == '1', bump_version == '1')
+        except Exception:
+            con.sadd(FANOUT_KEY, job)
+            raise
+        done += 1
+
+
+def sync_products(product_ids: List[int], bump_version: bool = True) -> int:
+    """
+    상품 문서를 ES에 bulk 반영 (존재하면 index, 삭제됐으면 delete)
+
+    색인이 끝난 뒤 카탈로그 버전을 올려, 캐시가 이전 색인 결과로 다시 채워지지 않게 합니다.
+
+    Args:
+        product_ids: 상품 ID 목록
+        bump_version: False면 카탈로그 버전은 호출한 쪽에서 한 번에 올림 (여러 배치 처리 시)
+
+    Returns:
+        반영한 문서 수
+    """
+    if not product_ids:
+        return 0
+
+    products = list(
+        Product.objects.filter(id__in=product_ids)
+        .select_related('brand')
+        .prefetch_related('ingredients')
+    )
+    found = {product.id for product in products}
+    deleted = [Product(id=pk) for pk in product_ids if int(pk) not in found]
+
+    document = ProductDocument()
+    if products:
+        document.update(products, request_timeout=BULK_REQUEST_TIMEOUT)
+    if deleted:
+        # 이미 ES에 없는 문서(404)는 무시
+        document.update(deleted, action='delete', raise_on_error=False, request_timeout=BULK_REQUEST_TIMEOUT)
+
+    if bump_version:
+        bump_catalog_version()
+    logger.info(f"ES 동기화 완료: 색인 {len(products)}개, 삭제 {len(deleted)}개")
+    return len(products) + len(deleted)
+
+
+def drain_dirty_products(batch_size: int) -> int:
+    """
+    outbox에서 최대 batch_size개를 꺼내 색인
+
+    Args:
+        batch_size: 한 번에 처리할 상품 수 (_bulk 요청 크기)
+
+    Returns:
+        처리한 상품 수 (0이면 outbox가 비어 있음)
+
+    Note:
+        색인 실패 시 꺼낸 ID를 다시 outbox에 넣고 예외를 전달
+        카탈로그 버전은 DIRTY_KEY에서 꺼낸 상품이 있을 때만 올림 (CONTENT_DIRTY_KEY는 조각 버전으로 반영)
+    """
+    run_fanouts()
+    con = get_redis_connection("default")
+    ids = [int(pk) for pk in con.spop(DIRTY_KEY, batch_size) or []]
+    content_ids = []
+    if len(ids) < batch_size:
+        content_ids = [int(pk) for pk in con.spop(CONTENT_DIRTY_KEY, batch_size - len(ids)) or []]
+    if not ids and not content_ids:
+        return 0
+    try:
+        return sync_products(sorted(set(ids + content_ids)), bump_version=bool(ids))
+    except Exception:
+        if ids:
+            con.sadd(DIRTY_KEY, *ids)
+        if content_ids:
+            con.sadd(CONTENT_DIRTY_KEY, *content_ids)
+        raise
+
+
+def pending_count() -> int:
+    """outbox에 남은 재색인 대상 수"""
+    con = get_redis_connection("default")
+    return con.scard(DIRTY_KEY) + con.scard(CONTENT_DIRTY_KEY) + con.scard(FANOUT_KEY)
+
+
+def iter_product_chunks(chunk_size: int, queryset: Optional[QuerySet] = None) -> Iterator[List[Product]]:
+    """
+    상품을 id 기준 keyset 페이지네이션으로 나눠 조회 (OFFSET 없이 일정한 속도)
+
+    Args:
+        chunk_size: 한 번에 조회할 상품 수
+        queryset: 대상 상품 (기본값: 전체)
+
+    Yields:
+        brand, ingredients가 미리 로드된 상품 목록
+    """
+    queryset = Product.objects.all() if queryset is None else queryset
+    queryset = queryset.select_related('brand').prefetch_related('ingredients').order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def iter_product_id_chunks(chunk_size: int, queryset: Optional[QuerySet] = None) -> Iterator[List[int]]:
+    """
+    상품 ID만 id 기준 keyset 페이지네이션으로 나눠 조회 (iter_product_chunks와 같은 방식, 상세 로드 없음)
+
+    Args:
+        chunk_size: 한 번에 조회할 상품 수
+        queryset: 대상 상품 (기본값: 전체)
+    """
+    queryset = Product.objects.all() if queryset is None else queryset
+    queryset = queryset.order_by('id').values_list('id', flat=True)
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def product_actions(products: Iterable[Product], index_name: str) -> Iterator[Dict[str, Any]]:
+    """
+    지정한 인덱스로 보내는 bulk index 액션 생성
+
+    Args:
+        products: 상품 목록
+        index_name: 대상 인덱스 (alias가 아닌 실제 인덱스 이름 가능)
+    """
+    document = ProductDocument()
+    for product in products:
+        yield {
+            '_op_type': 'index',
+            '_index': index_name,
+            '_id': document.generate_id(product),
+            '_source': document.prepare(product),
+        }
+
+
+def get_watermark() -> Optional[datetime]:
+    """저장된 증분 색인 워터마크 (없으면 None)"""
+    value = get_redis_connection("default").get(WATERMARK_KEY)
+    return parse_datetime(value.decode('utf-8')) if value is not None else None
+
+
+def set_watermark(value: datetime) -> None:
+    """증분 색인 워터마크 저장"""
+    get_redis_connection("default").set(WATERMARK_KEY, value.isoformat())
+
+
+def changed_product_ids(since: datetime) -> Set[int]:
+    """
+    since 이후 색인 문서 내용이 바뀌었을 수 있는 상품 ID
+
+    - 상품 자체의 updated_at (성분 연결 변경도 signals.py가 updated_at을 갱신)
+    - updated_at이 바뀐 브랜드의 상품
+    - updated_at이 바뀐 성분을 가진 상품
+
+    Note:
+        세 조건을 OR 조인 한 번으로 묻지 않고 인덱스(updated_at, brand_id, ingredient_id)를 타는
+        쿼리 세 개로 나눠 조회
+    """
+    ids = set(Product.objects.filter(updated_at__gt=since).values_list('id', flat=True))
+
+    brand_ids = Brand.objects.filter(updated_at__gt=since).values_list('id', flat=True)
+    ids.update(Product.objects.filter(brand_id__in=brand_ids).values_list('id', flat=True))
+
+    ingredient_ids = Ingredient.objects.filter(updated_at__gt=since).values_list('id', flat=True)
+    through = Product.ingredients.through
+    ids.update(through.objects.filter(ingredient_id__in=ingredient_ids).values_list('product_id', flat=True))
+    return ids
+
+
+def sync_changed_products(batch_size: int, since: Optional[datetime] = None) -> int:
+    """
+    워터마크 이후 변경된 상품만 색인 (증분 색인)
+
+    Args:
+        batch_size: _bulk 요청당 상품 수
+        since: 기준 시각 (None이면 저장된 워터마크 - WATERMARK_OVERLAP)
+
+    Returns:
+        반영한 상품 수
+
+    Raises:
+        ValueError: 저장된 워터마크도 since도 없을 때 (전체 재색인 필요)
+
+    Note:
+        삭제된 상품은 updated_at으로 알 수 없으므로 outbox(signals.py)로 반영
+        모든 배치가 성공했을 때만 워터마크를 조회 시작 시각으로 옮김
+    """
+    started_at = timezone.now()
+    if since is None:
+        watermark = get_watermark()
+        if watermark is None:
+            raise ValueError('증분 색인 워터마크가 없습니다. 전체 재색인을 먼저 실행해주세요.')
+        since = watermark - WATERMARK_OVERLAP
+
+    ids = sorted(changed_product_ids(since))
+    for start in range(0, len(ids), batch_size):
+        sync_products(ids[start:start + batch_size], bump_version=False)
+    if ids:
+        bump_catalog_version()
+
+    set_watermark(started_at)
+    logger.info(f"증분 색인 완료: {len(ids)}개 (기준 {since.isoformat()})")
+    return len(ids)
@@ -0,0 +1,286 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+# 카탈로그 버전이 오를 때 새 버전을 발행하는 채널 (워커별 L1 캐시 무효화)
+INVALIDATION_CHANNEL = "search:invalidate"
+
+# 구독이 끊겼을 때 재연결 대기 시간 (초)
+RESUBSCRIBE_INTERVAL = 1.0
+
+# 알림 대기 한 번의 최대 시간 (초)
+LISTEN_TIMEOUT = 5.0
+
+
+class LocalCache:
+    """
+    워커(프로세스) 메모리 L1 캐시 (LRU + TTL)
+
+    Redis(L2) 앞에 두어 인기 검색어의 캐시 히트를 네트워크 왕복/역직렬화 없이 처리합니다.
+    max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 버리고,
+    invalidate(version)가 오면 비운 뒤 그보다 이전 버전으로 계산된 값은 받지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 5.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: str, now: Optional[float] = None) -> Any:
+        """
+        캐시 조회 (없거나 만료면 None)
+
+        Args:
+            key: 캐시 키
+            now: 현재 시각 (테스트용)
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return item[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, version: Optional[int] = None,
+            now: Optional[float] = None) -> bool:
+        """
+        캐시 저장
+
+        Args:
+            key: 캐시 키
+            value: 저장할 값 (호출한 쪽과 공유되므로 수정하지 않는 값만 저장)
+            ttl: 유효 시간 (초, 기본값 self.ttl보다 길게는 저장하지 않음)
+            version: 값을 계산한 카탈로그 버전 (무효화 이전 버전이면 저장하지 않음)
+            now: 현재 시각 (테스트용)
+
+        Returns:
+            저장 여부
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return False
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if version is not None and version < self.version:
+                return False
+            self._entries[key] = (now + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return True
+
+    def invalidate(self, version: Optional[int] = None) -> None:
+        """
+        전체 비우기 (version이 주어지면 그 이전 버전 값은 이후에도 저장 거부)
+
+        이미 반영한 버전 이하의 알림(늦게 도착한 알림, 자기가 발행한 알림의 pub/sub 반향)은 무시
+        (남은 값은 모두 그 버전 이후에 계산된 값)
+        """
+        with self._lock:
+            if version is not None:
+                if version <= self.version:
+                    return
+                self.version = version
+            self._entries.clear()
+            self._invalidations += 1
+
+    def clear(self) -> None:
+        """항목과 카운터 초기화 (테스트용)"""
+        with self._lock:
+            self._entries.clear()
+            self.version = 0
+            self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 카운터"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 4) if total else 0.0,
+                'entries': len(self._entries),
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
+
+
+class TierCounter:
+    """L1 밖의 캐시 계층(Redis 등) 히트/미스 카운터"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits = self._misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+_search_l1: Optional[LocalCache] = None
+_ranking_l1: Optional[LocalCache] = None
+_suggest_l1: Optional[LocalCache] = None
+_caches_lock = threading.Lock()
+_listener: Optional[threading.Thread] = None
+_listener_pid: Optional[int] = None
+
+# 검색 결과 Redis(L2) 캐시 히트/미스
+search_l2 = TierCounter()
+
+
+def get_search_l1() -> LocalCache:
+    """설정(SEARCH_LOCAL_CACHE)으로 만든 검색 결과 L1 캐시 (카탈로그 버전 변경 시 무효화)"""
+    global _search_l1
+    if _search_l1 is None:
+        with _caches_lock:
+            if _search_l1 is None:
+                config = settings.SEARCH_LOCAL_CACHE
+                _search_l1 = LocalCache(max_entries=config['MAX_ENTRIES'], ttl=config['TTL'])
+    _ensure_listener()
+    return _search_l1
+
+
+def get_ranking_l1() -> LocalCache:
+    """설정(SEARCH_LOCAL_CACHE)으로 만든 랭킹 목록 L1 캐시 (짧은 TTL로만 만료)"""
+    global _ranking_l1
+    if _ranking_l1 is None:
+        with _caches_lock:
+            if _ranking_l1 is None:
+                config = settings.SEARCH_LOCAL_CACHE
+                # 키는 누적 + 윈도우 종류뿐이므로 작게 유지
+                _ranking_l1 = LocalCache(max_entries=16, ttl=config['RANKING_TTL'])
+    return _ranking_l1
+
+
+def get_suggest_l1() -> LocalCache:
+    """설정(SEARCH_SUGGEST)으로 만든 자동완성 L1 캐시 (짧은 접두어 결과 + 인기 검색어 후보, 카탈로그 버전 변경 시 무효화)"""
+    global _suggest_l1
+    if _suggest_l1 is None:
+        with _caches_lock:
+            if _suggest_l1 is None:
+                config = settings.SEARCH_SUGGEST
+                _suggest_l1 = LocalCache(max_entries=config['CACHE_ENTRIES'], ttl=config['CACHE_TTL'])
+    _ensure_listener()
+    return _suggest_l1
+
+
+def invalidate_local_caches(version: Optional[int] = None) -> None:
+    """이 프로세스의 검색 결과/자동완성 L1 캐시 무효화"""
+    if _search_l1 is not None:
+        _search_l1.invalidate(version)
+    if _suggest_l1 is not None:
+        _suggest_l1.invalidate(version)
+
+
+def publish_invalidation(con: Any, version: int) -> None:
+    """
+    다른 워커에 카탈로그 버전 변경 알림 (Redis pub/sub)
+
+    Args:
+        con: Redis 연결
+        version: 새 카탈로그 버전
+    """
+    invalidate_local_caches(version)
+    con.publish(INVALIDATION_CHANNEL, version)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    계층별 캐시 히트/미스 (워커 단위)
+
+    통계 조회가 L1을 만들거나 무효화 구독 스레드를 시작하지 않도록 이미 만들어진 L1만 읽음
+    (L1을 쓰지 않거나 아직 조회 전이면 빈 카운터)
+    """
+    return {
+        'pid': os.getpid(),
+        'search': {
+            'l1': _l1_stats(_search_l1),
+            'l2': search_l2.stats(),
+        },
+        'ranking': {
+            'l1': _l1_stats(_ranking_l1),
+        },
+        'suggest': {
+            'l1': _l1_stats(_suggest_l1),
+        },
+    }
+
+
+def _l1_stats(local: Optional[LocalCache]) -> Dict[str, Any]:
+    if local is None:
+        return {'hits': 0, 'misses': 0, 'hit_ratio': 0.0, 'entries': 0, 'evictions': 0, 'invalidations': 0}
+    return local.stats()
+
+
+def _ensure_listener() -> None:
+    # fork 이후에는 스레드가 복제되지 않으므로 프로세스별로 구독 스레드 시작
+    global _listener, _listener_pid
+    pid = os.getpid()
+    if _listener is not None and _listener_pid == pid:
+        return
+    with _caches_lock:
+        if _listener is not None and _listener_pid == pid:
+            return
+        _listener_pid = pid
+        _listener = threading.Thread(target=_listen, name='local-cache-invalidation', daemon=True)
+        _listener.start()
+
+
+def _listen() -> None:
+    reconnect = False
+    while True:
+        try:
+            pubsub = get_redis_connection("default").pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            if reconnect:
+                # 끊긴 동안 놓친 알림이 있을 수 있으므로 한 번 비움
+                invalidate_local_caches()
+            while True:
+                # listen()은 소켓 타임아웃(운영 프로필 SOCKET_TIMEOUT)에 걸리면 예외로 끊기므로 대기 시간을 직접 지정
+                message = pubsub.get_message(timeout=LISTEN_TIMEOUT)
+                if message is not None and message.get('type') == 'message':
+                    version = int(message['data'])
+                    invalidate_local_caches(version)
+                    logger.debug(f"L1 캐시 무효화: v{version}")
+        except Exception as e:
+            logger.warning(f"L1 캐시 무효화 구독 실패, 재시도: {str(e)}")
+            invalidate_local_caches()
+        reconnect = True
+        time.sleep(RESUBSCRIBE_INTERVAL)
@@ -0,0 +1,102 @@
+import json
+import pickle
+import time
+from typing import Any, Dict, List, Optional
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.cache_codec import (
+    decode_entry, encode_entry, lz4_frame, msgpack, zstandard
+)
+from products.models import Product
+from products.search_cache import make_cache_entry
+from products.serializers import ProductSerializer
+
+from .benchmark_search import summarize
+
+
+class Command(BaseCommand):
+    help = '실제 상품으로 만든 검색 결과 페이지를 캐시 형식/압축별로 인코딩해 크기와 인코딩/디코딩 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=50, help='측정할 결과 페이지 수')
+        parser.add_argument('--page-size', type=int, default=20, help='페이지당 상품 수')
+        parser.add_argument('--min-bytes', type=int, default=1024, help='압축 최소 크기 (SEARCH_CACHE_CODEC COMPRESS_MIN_BYTES)')
+        parser.add_argument('--output', help='결과 JSON 저장 경로')
+
+    def handle(self, *args, **options):
+        entries = self._build_entries(options['pages'], options['page_size'])
+        if not entries:
+            raise CommandError('상품 데이터가 없습니다. seed_data를 먼저 실행해주세요.')
+
+        results = {'pickle': self._measure_pickle(entries)}
+        formats = ['json'] + (['msgpack'] if msgpack is not None else [])
+        compressions = [None, 'zlib'] + (['zstd'] if zstandard is not None else []) + \
+            (['lz4'] if lz4_frame is not None else [])
+        for format_name in formats:
+            for compression in compressions:
+                name = f"{format_name}+{compression}" if compression else format_name
+                results[name] = self._measure(entries, format_name, compression, options['min_bytes'])
+
+        self._print(results, len(entries))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump({'pages': len(entries), 'page_size': options['page_size'], 'results': results},
+                          f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"결과 저장: {options['output']}"))
+
+    def _build_entries(self, pages: int, page_size: int) -> List[Dict[str, Any]]:
+        """검색 응답과 같은 형식(count/next/previous/results)의 캐시 엔트리"""
+        products = list(
+            Product.objects.select_related('brand').prefetch_related('ingredients').order_by('id')[:pages * page_size]
+        )
+        entries = []
+        for start in range(0, len(products), page_size):
+            results = ProductSerializer(products[start:start + page_size], many=True).data
+            data = {'count': len(products), 'next': None, 'previous': None, 'results': results}
+            entries.append(make_cache_entry(data, soft_ttl=3600, delta=0.05))
+        return entries
+
+    def _measure_pickle(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """기존 방식: django-redis 기본 PickleSerializer (히트마다 unpickle 후 JSON 렌더링 필요)"""
+        sizes, encode_ms, decode_ms = [], [], []
+        for entry in entries:
+            started = time.perf_counter()
+            blob = pickle.dumps(entry, pickle.DEFAULT_PROTOCOL)
+            encode_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            pickle.loads(blob)
+            decode_ms.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(blob))
+        return self._summary(sizes, encode_ms, decode_ms)
+
+    def _measure(self, entries: List[Dict[str, Any]], format_name: str, compression: Optional[str],
+                 min_bytes: int) -> Dict[str, Any]:
+        sizes, encode_ms, decode_ms = [], [], []
+        for entry in entries:
+            started = time.perf_counter()
+            frame, _ = encode_entry(entry, format_name, compression, min_bytes)
+            encode_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            decode_entry(frame)
+            decode_ms.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(frame))
+        return self._summary(sizes, encode_ms, decode_ms)
+
+    @staticmethod
+    def _summary(sizes: List[int], encode_ms: List[float], decode_ms: List[float]) -> Dict[str, Any]:
+        return {
+            'bytes': {'mean': round(sum(sizes) / len(sizes)), 'total': sum(sizes)},
+            'encode_ms': summarize(encode_ms),
+            'decode_ms': summarize(decode_ms),
+        }
+
+    def _print(self, results: Dict[str, Dict[str, Any]], pages: int) -> None:
+        write = self.stdout.write
+        write(f"페이지 {pages}개 기준")
+        write(f"{'형식':<14}{'평균 크기':>12}{'pickle 대비':>12}{'encode p50':>12}{'decode p50':>12}  (ms)")
+        base = results['pickle']['bytes']['mean']
+        for name, result in results.items():
+            size = result['bytes']['mean']
+            write(f"{name:<14}{size:>12}{size / base * 100:>11.1f}%"
+                  f"{result['encode_ms']['p50']:>12.3f}{result['decode_ms']['p50']:>12.3f}")
@@ -0,0 +1,140 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from typing import Any, Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from .benchmark_search import Command as SearchBenchmark, build_vocabulary, summarize
+
+DEFAULT_TARGETS = [
+    'wsgi=http://localhost:8000/api/products/items/search/',
+    'asgi=http://localhost:8001/api/products/items/search-async/',
+]
+
+
+class Command(BaseCommand):
+    help = '실행 중인 서버(WSGI/ASGI)에 같은 동시성으로 검색 부하를 보내 처리량과 p50/p95/p99를 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', dest='targets',
+                            help='이름=검색 URL (여러 번 지정, 기본: wsgi :8000 search / asgi :8001 search-async)')
+        parser.add_argument('--concurrency', type=int, default=32, help='동시 요청 수 (모든 대상에 같은 값)')
+        parser.add_argument('--requests', type=int, default=2000, help='대상별 측정 요청 수')
+        parser.add_argument('--warmup', type=int, default=100, help='대상별 측정 전 워밍업 요청 수')
+        parser.add_argument('--vocabulary', type=int, default=200, help='검색어 후보 수')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf 지수')
+        parser.add_argument('--seed', type=int, default=42, help='난수 시드 (대상마다 같은 요청 순서)')
+        parser.add_argument('--timeout', type=float, default=10.0, help='요청 타임아웃 (초)')
+        parser.add_argument('--output', help='결과 JSON 저장 경로')
+
+    def handle(self, *args, **options):
+        targets = [self._parse_target(value) for value in options['targets'] or DEFAULT_TARGETS]
+        rng = random.Random(options['seed'])
+        vocabulary = build_vocabulary(options['vocabulary'], rng)
+        if not vocabulary:
+            raise CommandError('검색어를 만들 데이터가 없습니다. seed_data를 먼저 실행해주세요.')
+        weights = list(accumulate(1 / rank ** options['skew'] for rank in range(1, len(vocabulary) + 1)))
+        workload = rng.choices(vocabulary, cum_weights=weights, k=options['warmup'] + options['requests'])
+
+        results = {}
+        for name, url in targets:
+            self.stdout.write(f"{name}: {url} (동시성 {options['concurrency']})")
+            self._run(url, workload[:options['warmup']], options)
+            results[name] = self._run(url, workload[options['warmup']:], options)
+
+        report = {
+            'meta': {
+                'commit': SearchBenchmark._git_commit(),
+                'timestamp': timezone.now().isoformat(),
+                'options': {key: options[key] for key in (
+                    'concurrency', 'requests', 'warmup', 'vocabulary', 'skew', 'seed'
+                )},
+                'targets': dict(targets),
+            },
+            'results': results,
+        }
+        self._print(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"결과 저장: {options['output']}"))
+
+    @staticmethod
+    def _parse_target(value: str) -> Tuple[str, str]:
+        name, sep, url = value.partition('=')
+        if not sep or not name or not url:
+            raise CommandError(f'--target은 이름=URL 형식이어야 합니다: {value}')
+        return name, url
+
+    def _run(self, url: str, keywords: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        keywords를 동시성 N개의 클라이언트 스레드로 모두 요청
+
+        Returns:
+            {'throughput': 초당 성공 요청 수, 'errors', 'latency': 성공 요청 지연 요약(ms)}
+        """
+        queue = iter(keywords)
+        queue_lock = threading.Lock()
+        latencies: List[float] = []
+        errors = [0]
+        record_lock = threading.Lock()
+
+        def client() -> None:
+            while True:
+                with queue_lock:
+                    keyword = next(queue, None)
+                if keyword is None:
+                    return
+                ok, elapsed = self._request(url, keyword, options['timeout'])
+                with record_lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for _ in range(options['concurrency']):
+                executor.submit(client)
+        duration = time.perf_counter() - started
+        return {
+            'throughput': round(len(latencies) / duration, 1) if duration else 0.0,
+            'errors': errors[0],
+            'latency': summarize(latencies),
+        }
+
+    @staticmethod
+    def _request(url: str, keyword: str, timeout: float) -> Tuple[bool, float]:
+        """검색 요청 한 건 (200이면 성공, 연결 실패/타임아웃/그 외 상태 코드는 오류)"""
+        full_url = f"{url}?{urllib.parse.urlencode({'q': keyword})}"
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(full_url, timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return ok, (time.perf_counter() - started) * 1000
+
+    def _print(self, results: Dict[str, Dict[str, Any]]) -> None:
+        write = self.stdout.write
+        write(f"{'대상':<10}{'req/s':>10}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+        for name, result in results.items():
+            latency = result['latency']
+            write(f"{name:<10}{result['throughput']:>10.1f}{result['errors']:>8}"
+                  f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}")
+
+        names = list(results)
+        base = results[names[0]]['throughput']
+        for name in names[1:]:
+            if base:
+                change = (results[name]['throughput'] - base) / base * 100
+                write(f"{name} 처리량: {names[0]} 대비 {change:+.1f}%")
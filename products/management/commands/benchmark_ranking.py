@@ -0,0 +1,169 @@
+import json
+import random
+import string
+import time
+from collections import Counter
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+
+from products.sketch import HeavyHitters, describe_error_bound, redis_sketch_add
+
+# 벤치마크용 임시 Redis 키 (실제 랭킹 키와 분리)
+BENCH_EXACT_KEY = "bench:search_ranking"
+BENCH_SKETCH_KEY = "bench:search_ranking:cms"
+BENCH_TOP_KEY = "bench:search_ranking:topk"
+
+
+class Command(BaseCommand):
+    help = '정확 랭킹(ZSET)과 근사 랭킹(Count-Min Sketch + Top-K)의 메모리/정확도를 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=200000, help='생성할 검색 로그 수')
+        parser.add_argument('--vocabulary', type=int, default=50000, help='인기 검색어 후보 수 (Zipf 분포)')
+        parser.add_argument('--tail-ratio', type=float, default=0.2,
+                            help='한 번만 등장하는 오타/무작위 검색어 비율')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf 지수 (클수록 상위 집중)')
+        parser.add_argument('--width', type=int, default=2048, help='Sketch 폭')
+        parser.add_argument('--depth', type=int, default=4, help='Sketch 깊이')
+        parser.add_argument('--top-k', type=int, default=100, help='Top-K 후보 수')
+        parser.add_argument('--limit', type=int, default=10, help='정확도 비교할 상위 N개 (ranking API 기준 10)')
+        parser.add_argument('--seed', type=int, default=42, help='난수 시드 (같은 시드면 같은 로그)')
+        parser.add_argument('--redis', action='store_true',
+                            help='Redis에 실제로 적재해 MEMORY USAGE로 측정 (bench:* 키 사용 후 삭제)')
+        parser.add_argument('--output', help='결과 JSON 저장 경로')
+
+    def handle(self, *args, **options):
+        log = self._generate_log(options)
+        self.stdout.write(f"검색 로그 생성 완료: {len(log)}건")
+
+        # 1. 정확 집계 (현재 search_ranking ZSET과 같은 결과)
+        started = time.perf_counter()
+        exact = Counter(log)
+        exact_seconds = time.perf_counter() - started
+
+        # 2. 근사 집계
+        started = time.perf_counter()
+        approx = HeavyHitters(options['width'], options['depth'], options['top_k'])
+        for keyword in log:
+            approx.add(keyword)
+        sketch_seconds = time.perf_counter() - started
+
+        limit = options['limit']
+        result = {
+            'queries': len(log),
+            'distinct_keywords': len(exact),
+            'config': {
+                'width': options['width'],
+                'depth': options['depth'],
+                'top_k': options['top_k'],
+                'skew': options['skew'],
+                'seed': options['seed'],
+            },
+            'error_bound': describe_error_bound(options['width'], options['depth'], total=len(log)),
+            'accuracy': self._accuracy(exact, approx, limit),
+            'memory': self._memory_in_process(exact, approx),
+            'seconds': {'exact': round(exact_seconds, 4), 'sketch': round(sketch_seconds, 4)},
+        }
+        if options['redis']:
+            result['redis_memory'] = self._memory_in_redis(exact, options)
+
+        self._report(result, limit)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"결과 저장: {options['output']}"))
+
+    def _generate_log(self, options):
+        """Zipf 분포 인기 검색어 + 한 번만 나오는 긴 꼬리(오타, 무작위 문자열) 검색 로그"""
+        rng = random.Random(options['seed'])
+        vocabulary = [f"keyword-{rank}" for rank in range(1, options['vocabulary'] + 1)]
+        weights = accumulate(1 / rank ** options['skew'] for rank in range(1, len(vocabulary) + 1))
+
+        tail = int(options['queries'] * options['tail_ratio'])
+        log = rng.choices(vocabulary, cum_weights=list(weights), k=options['queries'] - tail)
+        alphabet = string.ascii_lowercase + string.digits
+        for index in range(tail):
+            length = rng.randint(5, 100)
+            log.append(f"{index}-" + ''.join(rng.choices(alphabet, k=length)))
+        rng.shuffle(log)
+        return log
+
+    def _accuracy(self, exact, approx, limit):
+        """상위 N개 재현율과 과대 추정 오차 (실제 빈도 대비)"""
+        true_top = [keyword for keyword, _ in exact.most_common(limit)]
+        approx_top = [keyword for keyword, _ in approx.top(limit)]
+        bound = approx.sketch.error_bound()
+
+        errors = [approx.sketch.estimate(keyword) - count for keyword, count in exact.items()]
+        return {
+            'recall_at_limit': len(set(true_top) & set(approx_top)) / max(len(true_top), 1),
+            'exact_order_match': true_top == approx_top,
+            'max_overestimate': max(errors, default=0),
+            'mean_overestimate': sum(errors) / max(len(errors), 1),
+            'within_bound_ratio': sum(1 for error in errors if error <= bound) / max(len(errors), 1),
+            'underestimates': sum(1 for error in errors if error < 0),
+        }
+
+    def _memory_in_process(self, exact, approx):
+        """
+        자료구조 크기 추정 (바이트)
+
+        정확 랭킹은 검색어 문자열 + 점수(8바이트)를 모두 보관하고,
+        근사 랭킹은 카운터(8바이트) + Top-K 검색어만 보관한다고 가정
+        """
+        exact_bytes = sum(len(keyword.encode('utf-8')) + 8 for keyword in exact)
+        top_bytes = sum(len(keyword.encode('utf-8')) + 8 for keyword, _ in approx.top(approx.k))
+        return {
+            'exact_bytes': exact_bytes,
+            'sketch_bytes': approx.sketch.counters * 8 + top_bytes,
+        }
+
+    def _memory_in_redis(self, exact, options):
+        """bench:* 키에 실제로 적재한 뒤 MEMORY USAGE 측정"""
+        con = get_redis_connection("default")
+        keys = [BENCH_EXACT_KEY, BENCH_SKETCH_KEY, BENCH_TOP_KEY]
+        con.delete(*keys)
+        try:
+            items = list(exact.items())
+            for start in range(0, len(items), 1000):
+                pipe = con.pipeline(transaction=False)
+                for keyword, count in items[start:start + 1000]:
+                    pipe.zincrby(BENCH_EXACT_KEY, count, keyword)
+                    redis_sketch_add(pipe, keyword, count, options['width'], options['depth'], options['top_k'],
+                                     sketch_key=BENCH_SKETCH_KEY, top_key=BENCH_TOP_KEY)
+                pipe.execute()
+
+            try:
+                return {
+                    'exact_bytes': con.memory_usage(BENCH_EXACT_KEY),
+                    'sketch_bytes': con.memory_usage(BENCH_SKETCH_KEY) + con.memory_usage(BENCH_TOP_KEY),
+                    'exact_cardinality': con.zcard(BENCH_EXACT_KEY),
+                    'top_k_cardinality': con.zcard(BENCH_TOP_KEY),
+                }
+            except Exception as e:
+                self.stderr.write(f"MEMORY USAGE를 지원하지 않는 Redis입니다: {str(e)}")
+                return None
+        finally:
+            con.delete(*keys)
+
+    def _report(self, result, limit):
+        accuracy = result['accuracy']
+        bound = result['error_bound']
+        memory = result.get('redis_memory') or result['memory']
+        write = self.stdout.write
+
+        write(f"서로 다른 검색어: {result['distinct_keywords']}개")
+        write(f"메모리: 정확 {memory['exact_bytes']:,} bytes / 근사 {memory['sketch_bytes']:,} bytes")
+        write(f"상위 {limit}개 재현율: {accuracy['recall_at_limit']:.2%} "
+              f"(순서 일치: {accuracy['exact_order_match']})")
+        write(f"과대 추정: 최대 {accuracy['max_overestimate']}, 평균 {accuracy['mean_overestimate']:.2f} "
+              f"(상한 epsilon*N = {bound['max_overestimate']:.1f}, "
+              f"상한 이내 {accuracy['within_bound_ratio']:.2%}, 보장 확률 {1 - bound['delta']:.2%})")
+        if accuracy['underestimates']:
+            # Count-Min Sketch는 과소 추정이 없어야 함
+            self.stderr.write(f"과소 추정 발생: {accuracy['underestimates']}건")
+        write(self.style.SUCCESS(
+            f"집계 시간: 정확 {result['seconds']['exact']}초 / 근사 {result['seconds']['sketch']}초"
+        ))
@@ -0,0 +1,289 @@
+import json
+import math
+import random
+import subprocess
+import time
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional
+from unittest import mock
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django_redis import get_redis_connection
+from elasticsearch.serializer import JSONSerializer
+
+from products.documents import ProductDocument
+from products.index_sync import iter_product_chunks
+from products.local_cache import INVALIDATION_CHANNEL, invalidate_local_caches
+from products.models import Brand, Ingredient, Product
+from products.ranking import flush_ranking_buffer
+from products.refresh import wait_for_refreshes
+from products.timing import STAGES, collect_stages
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """최근접 순위(nearest-rank) 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """지연 시간 목록(ms) 요약"""
+    summary = {'count': len(values), 'mean': round(sum(values) / len(values), 3) if values else 0.0}
+    for pct in PERCENTILES:
+        summary[f'p{pct}'] = round(percentile(values, pct), 3)
+    return summary
+
+
+def build_vocabulary(size: int, rng: random.Random) -> List[str]:
+    """상품명 단어 + 브랜드명 + 성분명으로 검색어 후보 생성 (순서 고정 후 섞음)"""
+    words = set()
+    for name in Product.objects.order_by('id').values_list('name', flat=True)[:size * 5]:
+        words.update(word for word in name.split() if len(word) > 1 and not word.isdigit())
+    words.update(Brand.objects.values_list('name', flat=True)[:size])
+    words.update(Ingredient.objects.values_list('name', flat=True)[:size])
+    vocabulary = sorted(word[:100] for word in words)
+    rng.shuffle(vocabulary)
+    return vocabulary[:size]
+
+
+class StubSearch:
+    """
+    Elasticsearch 대용 (--stub-es)
+
+    ES 없이 캐시/MySQL/직렬화 단계만 측정할 때 사용합니다.
+    검색어와 무관하게 시드 기반으로 고른 상품 ID를 hit로 돌려줍니다.
+    source()가 호출되면(SEARCH_RESULT_SOURCE = 'document') 색인 문서와 같은 _source를 담은 hit을 돌려줍니다.
+    """
+
+    def __init__(self, product_ids: List[int], seed: int) -> None:
+        self._product_ids = product_ids
+        self._rng = random.Random(seed)
+        self._size = 20
+        self._offset = 0
+        self._with_source = False
+        self._sources: Dict[int, Dict[str, Any]] = {}
+        self.aggs = mock.MagicMock()
+
+    def __call__(self) -> 'StubSearch':
+        return self
+
+    def query(self, *args, **kwargs) -> 'StubSearch':
+        return self
+
+    def sort(self, *args, **kwargs) -> 'StubSearch':
+        return self
+
+    def filter(self, *args, **kwargs) -> 'StubSearch':
+        return self
+
+    def params(self, **kwargs) -> 'StubSearch':
+        return self
+
+    def source(self, *args, **kwargs) -> 'StubSearch':
+        self._with_source = True
+        return self
+
+    def extra(self, size: Optional[int] = None, **kwargs) -> 'StubSearch':
+        if size is not None:
+            self._size = size
+        return self
+
+    def __getitem__(self, window: slice) -> 'StubSearch':
+        self._offset, self._size = window.start or 0, window.stop - (window.start or 0)
+        return self
+
+    def execute(self) -> Any:
+        count = min(self._size, len(self._product_ids))
+        ids = self._rng.sample(self._product_ids, count)
+        if self._with_source:
+            hits = self._document_hits(ids)
+        else:
+            hits = [mock.Mock(meta=mock.Mock(id=pk, sort=[1.0, pk])) for pk in ids]
+        response = mock.MagicMock()
+        response.__iter__.side_effect = lambda: iter(hits)
+        response.hits.total.value = len(self._product_ids)
+        return response
+
+    def _document_hits(self, ids: List[int]) -> List[ProductDocument]:
+        """색인 -> 조회를 거친 것과 같은 hit (처음 나온 상품만 MySQL에서 읽어 _source를 만들고 재사용)"""
+        missing = [pk for pk in ids if pk not in self._sources]
+        if missing:
+            document, serializer = ProductDocument(), JSONSerializer()
+            for chunk in iter_product_chunks(len(missing), Product.objects.filter(id__in=missing)):
+                for product in chunk:
+                    self._sources[product.id] = serializer.loads(serializer.dumps(document.prepare(product)))
+        return [
+            ProductDocument.from_es({'_index': 'products', '_id': str(pk), '_source': self._sources[pk],
+                                     'sort': [1.0, pk]})
+            for pk in ids if pk in self._sources
+        ]
+
+
+class Command(BaseCommand):
+    help = 'Zipf 분포 검색 부하를 재생하고 단계별(검증/캐시/ES/DB/직렬화/랭킹) p50/p95/p99를 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='측정할 검색 요청 수')
+        parser.add_argument('--warmup', type=int, default=100, help='측정 전 워밍업 요청 수')
+        parser.add_argument('--vocabulary', type=int, default=200, help='검색어 후보 수 (상품/브랜드/성분 이름에서 추출)')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf 지수')
+        parser.add_argument('--page-ratio', type=float, default=0.1, help='2페이지 이후를 요청하는 비율')
+        parser.add_argument('--seed', type=int, default=42, help='난수 시드')
+        parser.add_argument('--cold', action='store_true', help='벤치마크용 Redis DB를 비우고 빈 캐시에서 시작')
+        parser.add_argument('--redis-db', type=int, default=15,
+                            help='벤치마크 전용 Redis DB 번호 (캐시/랭킹/카탈로그 버전을 운영 DB와 분리)')
+        parser.add_argument('--stub-es', action='store_true', help='ES 대신 시드 기반 대용 검색 사용 (ES 없이 측정)')
+        parser.add_argument('--host', default='localhost', help='요청 Host 헤더 (ALLOWED_HOSTS에 포함된 값)')
+        parser.add_argument('--output', help='결과 JSON 저장 경로')
+        parser.add_argument('--compare', help='이전 결과 JSON과 p95 비교')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = build_vocabulary(options['vocabulary'], rng)
+        if not vocabulary:
+            raise CommandError('검색어를 만들 데이터가 없습니다. seed_data를 먼저 실행해주세요.')
+
+        weights = list(accumulate(1 / rank ** options['skew'] for rank in range(1, len(vocabulary) + 1)))
+        total_requests = options['warmup'] + options['requests']
+        workload = []
+        for keyword in rng.choices(vocabulary, cum_weights=weights, k=total_requests):
+            page = rng.randint(2, 5) if rng.random() < options['page_ratio'] else 1
+            workload.append((keyword, page))
+
+        with self._isolated_redis(options['redis_db']):
+            if options['cold']:
+                get_redis_connection("default").flushdb()
+
+            patcher = None
+            if options['stub_es']:
+                product_ids = list(Product.objects.values_list('id', flat=True))
+                patcher = mock.patch('products.views.ProductDocument.search', StubSearch(product_ids, options['seed']))
+                patcher.start()
+            try:
+                samples = self._replay(workload, options['warmup'], options['host'])
+            finally:
+                if patcher is not None:
+                    patcher.stop()
+
+        result = self._report(samples, options)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"결과 저장: {options['output']}"))
+        if options['compare']:
+            self._compare(result, options['compare'])
+
+    @contextmanager
+    def _isolated_redis(self, db: int) -> Iterator[None]:
+        """
+        벤치마크 전용 Redis DB에서 실행 (운영 검색 캐시/랭킹 ZSET/카탈로그 버전을 건드리지 않음)
+
+        pub/sub 채널은 DB와 무관하게 공유되므로 L1 무효화 알림도 별도 채널로 보내고,
+        끝나기 전에 랭킹 버퍼와 백그라운드 캐시 갱신을 벤치마크 DB에 마저 반영합니다.
+
+        Raises:
+            CommandError: db가 운영 캐시 DB와 같을 때
+        """
+        location = urlsplit(settings.CACHES['default']['LOCATION'])
+        if (location.path.strip('/') or '0') == str(db):
+            raise CommandError(f"--redis-db {db}는 운영 캐시 DB입니다. 다른 번호를 지정해주세요.")
+        # 기본 연결과 검색 조회 전용 연결('search') 모두 벤치마크 DB로
+        caches = {
+            alias: {**config, 'LOCATION': urlunsplit(urlsplit(config['LOCATION'])._replace(path=f'/{db}'))}
+            for alias, config in settings.CACHES.items()
+        }
+
+        with override_settings(CACHES=caches), \
+                mock.patch('products.local_cache.INVALIDATION_CHANNEL', f"{INVALIDATION_CHANNEL}:benchmark"):
+            try:
+                yield
+            finally:
+                flush_ranking_buffer()
+                wait_for_refreshes()
+                # L1 값은 벤치마크 DB 기준
+                invalidate_local_caches()
+
+    def _replay(self, workload, warmup: int, host: str) -> List[Dict[str, Any]]:
+        """요청을 프로세스 안에서 순서대로 재생 (네트워크 비용 제외, 뷰 처리 시간만 측정)"""
+        client = Client(HTTP_HOST=host)
+        url = reverse('product-search')
+        samples = []
+        for index, (keyword, page) in enumerate(workload):
+            with collect_stages() as timings:
+                started = time.perf_counter()
+                response = client.get(url, {'q': keyword, 'page': page})
+                total = (time.perf_counter() - started) * 1000
+            if index < warmup:
+                continue
+            samples.append({
+                'status': response.status_code,
+                'total': total,
+                'stages': dict(timings),
+                # ES 단계가 실행됐으면 캐시 미스
+                'hit': 'es' not in timings,
+            })
+        return samples
+
+    def _report(self, samples: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+        ok = [s for s in samples if s['status'] == 200]
+        result = {
+            'meta': {
+                'commit': self._git_commit(),
+                'timestamp': timezone.now().isoformat(),
+                'requests': len(samples),
+                'errors': len(samples) - len(ok),
+                'options': {key: options[key] for key in (
+                    'requests', 'warmup', 'vocabulary', 'skew', 'page_ratio', 'seed', 'cold', 'stub_es', 'redis_db'
+                )},
+            },
+            'total': summarize([s['total'] for s in ok]),
+            'cache_hit': summarize([s['total'] for s in ok if s['hit']]),
+            'cache_miss': summarize([s['total'] for s in ok if not s['hit']]),
+            'stages': {
+                name: summarize([s['stages'][name] for s in ok if name in s['stages']])
+                for name in STAGES
+            },
+        }
+
+        write = self.stdout.write
+        write(f"요청 {len(samples)}건 (오류 {result['meta']['errors']}건), "
+              f"캐시 히트 {result['cache_hit']['count']}건 / 미스 {result['cache_miss']['count']}건")
+        write(f"{'구간':<12}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+        rows = [('total', result['total']), ('cache_hit', result['cache_hit']), ('cache_miss', result['cache_miss'])]
+        rows += [(f"- {name}", summary) for name, summary in result['stages'].items()]
+        for name, summary in rows:
+            write(f"{name:<12}{summary['count']:>8}{summary['p50']:>10.2f}{summary['p95']:>10.2f}{summary['p99']:>10.2f}")
+        return result
+
+    def _compare(self, result: Dict[str, Any], baseline_path: str) -> None:
+        """이전 결과 대비 p95 변화율 출력"""
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        self.stdout.write(f"p95 비교 (기준: {baseline['meta'].get('commit') or baseline_path})")
+        pairs = [('total', result['total'], baseline['total'])]
+        pairs += [(name, result['stages'][name], baseline['stages'].get(name, {})) for name in STAGES]
+        for name, current, before in pairs:
+            if not before.get('count') or not current['count']:
+                continue
+            change = (current['p95'] - before['p95']) / before['p95'] * 100 if before['p95'] else 0.0
+            line = f"{name:<12}{before['p95']:>10.2f} -> {current['p95']:>10.2f} ms ({change:+.1f}%)"
+            self.stdout.write(self.style.WARNING(line) if change > 10 else line)
+
+    @staticmethod
+    def _git_commit() -> Optional[str]:
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
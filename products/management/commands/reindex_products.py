@@ -0,0 +1,164 @@
+import resource
+import time
+from datetime import datetime
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from elasticsearch.helpers import bulk, parallel_bulk, scan
+
+from products.documents import ProductDocument
+from products.index_sync import (
+    BULK_REQUEST_TIMEOUT, iter_product_chunks, product_actions, set_watermark, sync_changed_products, sync_products
+)
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = '새 인덱스에 전체 상품을 병렬 색인한 뒤 products alias를 교체합니다. (무중단 재색인, --incremental은 변경분만)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='DB 조회/_bulk 요청당 상품 수')
+        parser.add_argument('--threads', type=int, default=4, help='parallel_bulk 워커 스레드 수')
+        parser.add_argument('--keep', type=int, default=1, help='alias 교체 후 남겨둘 이전 인덱스 수 (롤백용)')
+        parser.add_argument('--no-swap', action='store_true', help='색인만 하고 alias는 교체하지 않음')
+        parser.add_argument('--incremental', action='store_true',
+                            help='새 인덱스 없이 워터마크(updated_at) 이후 변경된 상품만 현재 alias에 색인')
+        parser.add_argument('--since', help='증분 색인 기준 시각 (ISO 8601, 생략 시 저장된 워터마크)')
+
+    def handle(self, *args, **options):
+        if options['incremental']:
+            return self._incremental(options)
+
+        alias = ProductDocument._index._name
+        client = ProductDocument._get_connection()
+        index_name = f"{alias}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        replicas = ProductDocument._index._settings.get('number_of_replicas', 1)
+
+        # 1. 새 인덱스 생성 (색인 중에는 refresh/복제본 비활성화로 쓰기 비용 절감)
+        index = ProductDocument._index.clone(name=index_name)
+        index.settings(refresh_interval='-1', number_of_replicas=0)
+        index.create()
+        self.stdout.write(f"새 인덱스 생성: {index_name}")
+
+        # 2. keyset 청크로 읽어 parallel_bulk로 색인
+        started_at = timezone.now()
+        started = time.perf_counter()
+        indexed, failed = 0, 0
+        actions = (
+            action
+            for chunk in iter_product_chunks(options['chunk_size'])
+            for action in product_actions(chunk, index_name)
+        )
+        for ok, item in parallel_bulk(client, actions, thread_count=options['threads'],
+                                      chunk_size=options['chunk_size'], raise_on_error=False,
+                                      request_timeout=BULK_REQUEST_TIMEOUT):
+            if ok:
+                indexed += 1
+            else:
+                failed += 1
+                self.stderr.write(f"색인 실패: {item}")
+        elapsed = time.perf_counter() - started
+
+        # 3. 운영 설정 복구 후 refresh
+        client.indices.put_settings(index=index_name, body={
+            'index': {'refresh_interval': None, 'number_of_replicas': replicas}
+        })
+        client.indices.refresh(index=index_name)
+
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(
+            f"색인 완료: {indexed}개 (실패 {failed}개), {elapsed:.1f}초, "
+            f"{indexed / elapsed if elapsed else 0:.0f} docs/s, 최대 메모리 {peak_mb:.0f}MB"
+        )
+
+        if failed:
+            raise CommandError(f"{failed}개 문서 색인 실패, alias를 교체하지 않습니다. (인덱스: {index_name})")
+        if options['no_swap']:
+            return
+
+        # 4. 색인 도중 삭제된 상품은 삭제가 이전 인덱스로 갔으므로 교체 전에 새 인덱스에서 제거
+        removed = self._delete_missing(client, index_name, options['chunk_size'])
+        if removed:
+            self.stdout.write(f"색인 중 삭제된 상품 {removed}개 제거")
+
+        # 5. alias 원자적 교체 (기존 alias 해제 + 새 인덱스 연결을 한 요청으로)
+        self._swap_alias(client, alias, index_name)
+        set_watermark(started_at)
+        self.stdout.write(self.style.SUCCESS(f"alias 교체: {alias} -> {index_name}"))
+
+        # 6. 색인 도중 변경된 상품은 이전 인덱스로 갔으므로 다시 반영 (캐시 무효화 포함)
+        changed = list(Product.objects.filter(updated_at__gte=started_at).values_list('id', flat=True))
+        sync_products(changed)
+        if changed:
+            self.stdout.write(f"색인 중 변경된 상품 {len(changed)}개 재반영")
+        # 4단계 확인 이후 교체 전까지 삭제된 상품 (이후 삭제는 alias를 통해 새 인덱스로 감)
+        removed = self._delete_missing(client, index_name, options['chunk_size'])
+        if removed:
+            self.stdout.write(f"교체 직전 삭제된 상품 {removed}개 제거")
+
+        self._delete_old_indices(client, alias, options['keep'])
+
+    def _incremental(self, options):
+        """워터마크 이후 변경분(상품, 브랜드/성분 변경에 따른 상품)만 색인"""
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"--since 형식이 올바르지 않습니다: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        started = time.perf_counter()
+        try:
+            synced = sync_changed_products(options['chunk_size'], since=since)
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"증분 색인 완료: {synced}개, {elapsed:.1f}초"))
+
+    def _delete_missing(self, client, index_name, chunk_size):
+        """
+        인덱스에는 있지만 MySQL에서 삭제된 상품 문서를 제거
+
+        문서 ID만 scroll로 읽어 청크마다 MySQL 기본 키 조회 한 번으로 확인 (ID 전체를 메모리에 올리지 않음)
+
+        Returns:
+            제거한 문서 수
+        """
+        hits = scan(client, index=index_name, query={'_source': False}, size=chunk_size,
+                    request_timeout=BULK_REQUEST_TIMEOUT)
+        ids = (int(hit['_id']) for hit in hits)
+        removed = 0
+        for chunk in iter(lambda: list(islice(ids, chunk_size)), []):
+            found = set(Product.objects.filter(id__in=chunk).values_list('id', flat=True))
+            missing = [pk for pk in chunk if pk not in found]
+            if not missing:
+                continue
+            # 이미 없는 문서(404)는 무시
+            bulk(client, ({'_op_type': 'delete', '_index': index_name, '_id': pk} for pk in missing),
+                 raise_on_error=False, request_timeout=BULK_REQUEST_TIMEOUT)
+            removed += len(missing)
+        if removed:
+            client.indices.refresh(index=index_name)
+        return removed
+
+    def _swap_alias(self, client, alias, index_name):
+        """alias를 새 인덱스로 옮김 (검색은 교체 직전까지 이전 인덱스를 사용)"""
+        actions = [{'add': {'index': index_name, 'alias': alias}}]
+        if client.indices.exists_alias(name=alias):
+            old_indices = sorted(client.indices.get_alias(name=alias))
+            actions = [{'remove': {'index': old, 'alias': alias}} for old in old_indices] + actions
+        elif client.indices.exists(index=alias):
+            # search_index --rebuild로 만든 실제 인덱스는 alias와 이름이 겹치므로 같은 요청에서 삭제
+            actions = [{'remove_index': {'index': alias}}] + actions
+        client.indices.update_aliases(body={'actions': actions})
+
+    def _delete_old_indices(self, client, alias, keep):
+        """alias에서 빠진 이전 인덱스 중 최근 keep개를 제외하고 삭제"""
+        live = client.indices.get_alias(name=alias)
+        candidates = sorted(name for name in client.indices.get(index=f"{alias}-*") if name not in live)
+        for name in candidates[:max(len(candidates) - keep, 0)]:
+            client.indices.delete(index=name)
+            self.stdout.write(f"이전 인덱스 삭제: {name}")
@@ -1,65 +1,177 @@
 import random
+import time
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional, Tuple
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models import Max
 from faker import Faker
+from products.documents import ProductDocument
+from products.index_sync import BULK_REQUEST_TIMEOUT, iter_product_chunks
 from products.models import Brand, Product, Ingredient
+from products.safety import safety_values
+from products.search_cache import bump_catalog_version
+
+# 상품 생성 블록 크기 (블록마다 시드를 따로 두어 워커 수와 관계없이 같은 데이터 생성)
+GENERATION_BLOCK = 10000
+
+PRODUCT_TYPES = ['토너', '로션', '크림', '앰플', '세럼']
+
+
+def _block_seed(seed: Optional[int], block: int) -> Optional[int]:
+    return None if seed is None else seed * 1000003 + block
+
+
+def _generate_products(args: Tuple[Optional[int], int, int, List[int], List[int]]) -> List[Tuple[Any, ...]]:
+    """
+    상품 한 블록 생성 (multiprocessing 워커에서 실행되므로 모듈 최상위 함수)
+
+    Args:
+        args: (시드, 블록 번호, 생성 수, 브랜드 ID 목록, 성분 ID 목록)
+
+    Returns:
+        [(상품명, 브랜드 ID, 가격, 이미지 URL, 성분 ID 목록)]
+    """
+    seed, block, count, brand_ids, ingredient_ids = args
+    block_seed = _block_seed(seed, block)
+    rng = random.Random(block_seed)
+    fake = Faker('ko_KR')
+    fake.seed_instance(block_seed)
+
+    rows = []
+    for _ in range(count):
+        rows.append((
+            fake.catch_phrase() + " " + rng.choice(PRODUCT_TYPES) + f" {rng.randint(1, 999)}",
+            rng.choice(brand_ids),
+            rng.randint(100, 2000) * 100,
+            fake.image_url(),
+            # 제품 하나당 성분 3~10개 랜덤 매칭
+            rng.sample(ingredient_ids, k=min(rng.randint(3, 10), len(ingredient_ids))),
+        ))
+    return rows
+
 
 class Command(BaseCommand):
-    help = '초기 더미 데이터를 생성합니다.'
+    help = '초기 더미 데이터를 생성합니다. (bulk insert, --seed로 재현 가능)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brands', type=int, default=10, help='생성할 브랜드 수')
+        parser.add_argument('--ingredients', type=int, default=50, help='생성할 성분 수')
+        parser.add_argument('--products', type=int, default=100, help='생성할 상품 수')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk insert/색인 배치 크기')
+        parser.add_argument('--seed', type=int, help='난수 시드 (같은 시드면 같은 데이터, 벤치마크 재현용)')
+        parser.add_argument('--workers', type=int, default=1, help='Faker 데이터 생성 프로세스 수')
+        parser.add_argument('--no-index', action='store_true',
+                            help='ES 색인 생략 (나중에 reindex_products로 일괄 색인)')
 
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
+        seed = options['seed']
+        batch_size = options['batch_size']
         fake = Faker('ko_KR')
+        fake.seed_instance(seed)
+        rng = random.Random(seed)
+        started = time.perf_counter()
 
-        self.stdout.write('데이터 생성을 시작합니다... (약 10~20초 소요)')
+        self.stdout.write('데이터 생성을 시작합니다...')
 
-        # 1. 브랜드 생성 (10개)
-        brands = []
-        for _ in range(10):
-            # get_or_create: 중복되면 가져오고, 없으면 생성함 (에러 방지)
-            brand, created = Brand.objects.get_or_create(
-                name=fake.company(),
-                defaults={'website_url': fake.url()}
-            )
-            brands.append(brand)
+        # 1. 브랜드 생성 (이름이 겹치면 번호를 붙여 구분)
+        brands = self._create_brands(fake, options['brands'], batch_size)
         self.stdout.write(self.style.SUCCESS(f'Brand 데이터 준비 완료 (총 {len(brands)}개)'))
 
-        # 2. 성분 생성 (50개)
-        ingredients = []
-        for _ in range(50):
-            # 화학명 생성 시도, 실패시 단어 조합
-            try:
-                raw_name = fake.unique.chemical_name()
-            except:
-                raw_name = fake.word() + " 추출물"
-
-            ing, created = Ingredient.objects.get_or_create(
-                name=raw_name,
-                defaults={
-                    'ewg_score': random.randint(1, 10),
-                    'description': fake.sentence()
-                }
-            )
-            ingredients.append(ing)
+        # 2. 성분 생성 (성분명은 unique이므로 이미 있는 성분은 재사용)
+        ingredients = self._create_ingredients(fake, rng, options['ingredients'], batch_size)
         self.stdout.write(self.style.SUCCESS(f'Ingredient 데이터 준비 완료 (총 {len(ingredients)}개)'))
 
-        # 3. 상품 생성 및 성분 연결 (100개)
-        created_count = 0
-
-        # 상품은 이름이 같아도 생성이 가능하도록 두되, 너무 많은 중복 방지를 위해 약간의 랜덤성 추가
-        with transaction.atomic():
-            for _ in range(100):
-                # Product는 중복 허용 정책이라면 create, 아니라면 get_or_create.
-                # 여기서는 더미데이터 양을 늘리기 위해 create를 유지하되 랜덤성을 강화
-                product = Product.objects.create(
-                    name=fake.catch_phrase() + " " + random.choice(['토너', '로션', '크림', '앰플', '세럼']) + f" {random.randint(1, 999)}",
-                    brand=random.choice(brands),
-                    price=random.randint(100, 2000) * 100,
-                    image_url=fake.image_url()
-                )
-
-                # 제품 하나당 성분 3~10개 랜덤 매칭
-                selected_ingredients = random.sample(ingredients, k=random.randint(3, 10))
-                product.ingredients.add(*selected_ingredients)
-                created_count += 1
-
-        self.stdout.write(self.style.SUCCESS(f'Product {created_count}개 생성 완료!'))
\ No newline at end of file
+        # 3. 상품 + 상품-성분 연결 bulk insert
+        first_id, created_count = self._create_products(
+            seed, options['products'], [b.id for b in brands], {i.id: i.ewg_score for i in ingredients},
+            batch_size, options['workers'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Product {created_count}개 생성 완료! ({elapsed:.1f}초, {created_count / elapsed if elapsed else 0:.0f}개/초)'
+        ))
+
+        # 4. bulk insert는 signal을 보내지 않으므로 색인/캐시 무효화를 따로 일괄 처리
+        if not options['no_index'] and created_count:
+            self._index_products(first_id, batch_size)
+
+    def _create_brands(self, fake: Faker, count: int, batch_size: int) -> List[Brand]:
+        names = set()
+        brands = []
+        for _ in range(count):
+            name = fake.company()
+            if name in names:
+                name = f"{name} {len(names)}"
+            names.add(name)
+            brands.append(Brand(name=name, website_url=fake.url()))
+        last_id = Brand.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        Brand.objects.bulk_create(brands, batch_size=batch_size)
+        return list(Brand.objects.filter(id__gt=last_id).order_by('id'))
+
+    def _create_ingredients(self, fake: Faker, rng: random.Random, count: int, batch_size: int) -> List[Ingredient]:
+        names = set()
+        ingredients = []
+        for _ in range(count):
+            name = fake.word() + " 추출물"
+            if name in names:
+                name = f"{fake.word()} {len(names)} 추출물"
+            names.add(name)
+            ingredients.append(Ingredient(name=name, ewg_score=rng.randint(1, 10), description=fake.sentence()))
+        Ingredient.objects.bulk_create(ingredients, batch_size=batch_size, ignore_conflicts=True)
+        return list(Ingredient.objects.filter(name__in=names).order_by('id'))
+
+    def _create_products(self, seed: Optional[int], count: int, brand_ids: List[int], ewg_scores: Dict[int, int],
+                         batch_size: int, workers: int) -> Tuple[int, int]:
+        """
+        상품/연결 테이블 bulk insert
+
+        MySQL은 bulk_create 결과에 PK를 채워주지 않으므로 ID를 직접 배정해 연결 테이블 행을 만듭니다.
+        (동시에 다른 곳에서 상품을 만들지 않는 시딩 전용)
+        bulk insert는 신호를 보내지 않으므로 안전도 집계도 여기서 함께 계산합니다.
+
+        Args:
+            ewg_scores: {성분 ID: EWG 등급}
+
+        Returns:
+            (첫 상품 ID, 생성한 상품 수)
+        """
+        first_id = (Product.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+        blocks = [
+            (seed, block, min(GENERATION_BLOCK, count - start), brand_ids, sorted(ewg_scores))
+            for block, start in enumerate(range(0, count, GENERATION_BLOCK))
+        ]
+        through = Product.ingredients.through
+
+        next_id = first_id
+        pool = Pool(workers) if workers > 1 else None
+        try:
+            generated = pool.imap(_generate_products, blocks) if pool else map(_generate_products, blocks)
+            for rows in generated:
+                for start in range(0, len(rows), batch_size):
+                    products, links = [], []
+                    for name, brand_id, price, image_url, product_ingredients in rows[start:start + batch_size]:
+                        products.append(Product(id=next_id, name=name, brand_id=brand_id, price=price, image_url=image_url,
+                                                **safety_values(ewg_scores[i] for i in product_ingredients)))
+                        links.extend(through(product_id=next_id, ingredient_id=i) for i in product_ingredients)
+                        next_id += 1
+                    with transaction.atomic():
+                        Product.objects.bulk_create(products)
+                        through.objects.bulk_create(links, batch_size=batch_size * 10)
+                self.stdout.write(f'상품 {next_id - first_id}/{count}개 저장')
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        return first_id, next_id - first_id
+
+    def _index_products(self, first_id: int, batch_size: int) -> None:
+        """새로 만든 상품을 keyset 청크 단위 _bulk로 색인"""
+        document = ProductDocument()
+        indexed = 0
+        for chunk in iter_product_chunks(batch_size, Product.objects.filter(id__gte=first_id)):
+            document.update(chunk, request_timeout=BULK_REQUEST_TIMEOUT)
+            indexed += len(chunk)
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'ES 색인 완료 ({indexed}개)'))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.index_sync import drain_dirty_products, pending_count
+
+
+class Command(BaseCommand):
+    help = 'outbox(Redis Set)에 쌓인 변경 상품을 Elasticsearch에 일괄 색인합니다.'
+
+    def add_arguments(self, parser):
+        config = settings.SEARCH_INDEX_SYNC
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'],
+                            help='_bulk 요청당 상품 수')
+        parser.add_argument('--interval', type=float, default=config['FLUSH_INTERVAL'],
+                            help='outbox가 비었을 때 다시 확인하기까지 대기 시간 (초)')
+        parser.add_argument('--once', action='store_true', help='outbox를 한 번 비우고 종료 (cron, 배포 후 실행용)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write(f"ES 동기화 시작 (대기 중 {pending_count()}개, 배치 {batch_size}개)")
+
+        total = 0
+        while True:
+            try:
+                synced = drain_dirty_products(batch_size)
+            except Exception as e:
+                # 꺼낸 ID는 outbox로 돌아갔으므로 잠시 후 재시도
+                self.stderr.write(f"ES 동기화 실패, 재시도 예정: {str(e)}")
+                if options['once']:
+                    raise
+                time.sleep(options['interval'])
+                continue
+
+            total += synced
+            if synced:
+                self.stdout.write(f"{synced}개 색인 (누적 {total}개)")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"ES 동기화 완료: 총 {total}개"))
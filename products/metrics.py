@@ -0,0 +1,219 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from .local_cache import get_cache_stats
+from .timing import STAGES, collect_stages
+
+# 히스토그램 버킷 상한 (초, Prometheus 관례) - 캐시 히트(~1ms)부터 ES 타임아웃 근처까지
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 캐시 엔트리 인코딩/디코딩 시간 버킷 (초, 수십 µs ~ 수 ms)
+CODEC_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+# 캐시 엔트리 크기 버킷 (bytes)
+SIZE_BUCKETS = (512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072, 262144)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """
+    고정 버킷 히스토그램 (워커 프로세스 단위)
+
+    observe는 버킷 이진 탐색 + 잠금 안 덧셈뿐이라 요청마다 호출해도 비용이 거의 없습니다.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self._sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(self._buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self._buckets) + 1)
+            self._sum = 0.0
+
+    def snapshot(self) -> Tuple[List[Tuple[str, int]], float, int]:
+        """
+        Returns:
+            ([(버킷 상한 le, 누적 건수)], 합계(초), 전체 건수)
+        """
+        with self._lock:
+            counts, total_sum = list(self._counts), self._sum
+        cumulative, running = [], 0
+        for bound, count in zip(self._buckets + (float('inf'),), counts):
+            running += count
+            cumulative.append(('+Inf' if bound == float('inf') else repr(bound), running))
+        return cumulative, total_sum, running
+
+
+# 검색 요청 전체 / 단계별 소요 시간
+search_duration = Histogram()
+stage_durations: Dict[str, Histogram] = {name: Histogram() for name in STAGES}
+
+# 자동완성 요청 소요 시간 (목표 p99 10ms)
+suggest_duration = Histogram()
+
+# 검색 캐시 엔트리 인코딩/디코딩 시간, 크기 (rendered: 압축 전 본문, stored: Redis에 저장한 크기)
+codec_durations: Dict[str, Histogram] = {op: Histogram(CODEC_BUCKETS) for op in ('encode', 'decode')}
+payload_sizes: Dict[str, Histogram] = {size: Histogram(SIZE_BUCKETS) for size in ('rendered', 'stored')}
+
+
+def observe_search(timings: Dict[str, float], total_ms: float) -> None:
+    """collect_stages 결과(ms)를 히스토그램에 반영"""
+    search_duration.observe(total_ms / 1000)
+    for name, elapsed in timings.items():
+        histogram = stage_durations.get(name)
+        if histogram is not None:
+            histogram.observe(elapsed / 1000)
+
+
+def observe_codec(op: str, seconds: float, rendered: Optional[int] = None, stored: Optional[int] = None) -> None:
+    """검색 캐시 엔트리 인코딩/디코딩 시간과 크기(인코딩만) 기록"""
+    if not settings.SEARCH_METRICS['ENABLED']:
+        return
+    codec_durations[op].observe(seconds)
+    if rendered is not None:
+        payload_sizes['rendered'].observe(rendered)
+    if stored is not None:
+        payload_sizes['stored'].observe(stored)
+
+
+def server_timing_header(timings: Dict[str, float], total_ms: float) -> str:
+    """
+    Server-Timing 헤더 값 (브라우저 개발자 도구 Network 탭에 단계별로 표시됨)
+
+    예: "cache;dur=0.41, es;dur=12.03, db;dur=3.2, serialize;dur=1.1, total;dur=17.6"
+    """
+    parts = [f"{name};dur={timings[name]:.2f}" for name in STAGES if name in timings]
+    parts.append(f"total;dur={total_ms:.2f}")
+    return ', '.join(parts)
+
+
+def instrument_search(view_method: Callable) -> Callable:
+    """
+    검색 뷰 계측 데코레이터
+
+    뷰 전체를 collect_stages로 감싸 단계별 시간을 히스토그램에 쌓고
+    응답에 Server-Timing 헤더를 붙입니다. (SEARCH_METRICS['ENABLED']가 False면 그대로 실행)
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        config = settings.SEARCH_METRICS
+        if not config['ENABLED']:
+            return view_method(self, request, *args, **kwargs)
+
+        with collect_stages() as timings:
+            started = time.perf_counter()
+            response = view_method(self, request, *args, **kwargs)
+            total_ms = (time.perf_counter() - started) * 1000
+        _record_search(response, timings, total_ms)
+        return response
+
+    return wrapper
+
+
+def instrument_async_search(view_func: Callable) -> Callable:
+    """비동기 검색 뷰(async def view(request)) 계측 데코레이터 (instrument_search와 같은 히스토그램/헤더)"""
+    @functools.wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if not settings.SEARCH_METRICS['ENABLED']:
+            return await view_func(request, *args, **kwargs)
+
+        # 스레드로 넘긴 ORM 조회 단계도 contextvars 복사본이 같은 dict에 기록
+        with collect_stages() as timings:
+            started = time.perf_counter()
+            response = await view_func(request, *args, **kwargs)
+            total_ms = (time.perf_counter() - started) * 1000
+        _record_search(response, timings, total_ms)
+        return response
+
+    return wrapper
+
+
+def _record_search(response: HttpResponse, timings: Dict[str, float], total_ms: float) -> None:
+    observe_search(timings, total_ms)
+    if settings.SEARCH_METRICS['SERVER_TIMING']:
+        response['Server-Timing'] = server_timing_header(timings, total_ms)
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str = '') -> List[str]:
+    cumulative, total_sum, count = histogram.snapshot()
+    prefix = f"{labels}," if labels else ''
+    lines = [f'{name}_bucket{{{prefix}le="{le}"}} {value}' for le, value in cumulative]
+    suffix = f"{{{labels}}}" if labels else ''
+    lines.append(f"{name}_sum{suffix} {total_sum}")
+    lines.append(f"{name}_count{suffix} {count}")
+    return lines
+
+
+def render_metrics() -> str:
+    """
+    Prometheus 텍스트 형식 메트릭
+
+    Note:
+        값은 응답한 워커 프로세스 기준입니다. (gunicorn 워커가 여러 개면 워커마다 따로 수집)
+    """
+    lines = [
+        '# HELP purepick_search_duration_seconds Search request latency.',
+        '# TYPE purepick_search_duration_seconds histogram',
+    ]
+    lines += _histogram_lines('purepick_search_duration_seconds', search_duration)
+
+    lines += [
+        '# HELP purepick_search_stage_duration_seconds Search latency by stage.',
+        '# TYPE purepick_search_stage_duration_seconds histogram',
+    ]
+    for name, histogram in stage_durations.items():
+        lines += _histogram_lines('purepick_search_stage_duration_seconds', histogram, f'stage="{name}"')
+
+    lines += [
+        '# HELP purepick_suggest_duration_seconds Suggest request latency.',
+        '# TYPE purepick_suggest_duration_seconds histogram',
+    ]
+    lines += _histogram_lines('purepick_suggest_duration_seconds', suggest_duration)
+
+    lines += [
+        '# HELP purepick_cache_codec_duration_seconds Search cache entry encode/decode time.',
+        '# TYPE purepick_cache_codec_duration_seconds histogram',
+    ]
+    for op, histogram in codec_durations.items():
+        lines += _histogram_lines('purepick_cache_codec_duration_seconds', histogram, f'op="{op}"')
+
+    lines += [
+        '# HELP purepick_cache_payload_bytes Search cache entry size before compression and as stored.',
+        '# TYPE purepick_cache_payload_bytes histogram',
+    ]
+    for size, histogram in payload_sizes.items():
+        lines += _histogram_lines('purepick_cache_payload_bytes', histogram, f'size="{size}"')
+
+    lines += [
+        '# HELP purepick_cache_requests_total Cache lookups by cache and tier.',
+        '# TYPE purepick_cache_requests_total counter',
+    ]
+    stats = get_cache_stats()
+    for cache_name in ('search', 'ranking', 'suggest'):
+        for tier, tier_stats in stats[cache_name].items():
+            for result, key in (('hit', 'hits'), ('miss', 'misses')):
+                lines.append(
+                    f'purepick_cache_requests_total{{cache="{cache_name}",tier="{tier}",result="{result}"}} '
+                    f'{tier_stats[key]}'
+                )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """GET /metrics (Prometheus 스크레이프용)"""
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
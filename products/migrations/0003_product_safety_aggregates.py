@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:34
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max
+
+# 마이그레이션 시점의 기준값 (models.HAZARD_EWG_SCORE가 바뀌어도 이 마이그레이션 결과는 고정)
+HAZARD_EWG_SCORE = 7
+
+
+def fill_safety_aggregates(apps, schema_editor):
+    """기존 상품의 안전도 집계 채우기 (성분이 있는 상품만, 1000개씩)"""
+    Product = apps.get_model('products', 'Product')
+    through = Product.ingredients.through
+    rows = list(through.objects.values('product_id').annotate(
+        max_score=Max('ingredient__ewg_score'),
+        avg_score=Avg('ingredient__ewg_score'),
+        count=Count('ingredient_id'),
+    ).order_by('product_id'))
+    fields = ['max_ewg_score', 'avg_ewg_score', 'ingredient_count', 'has_hazardous_ingredient']
+    for start in range(0, len(rows), 1000):
+        Product.objects.bulk_update([
+            Product(
+                pk=row['product_id'],
+                max_ewg_score=row['max_score'],
+                avg_ewg_score=round(row['avg_score'], 2),
+                ingredient_count=row['count'],
+                has_hazardous_ingredient=row['max_score'] >= HAZARD_EWG_SCORE,
+            )
+            for row in rows[start:start + 1000]
+        ], fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='avg_ewg_score',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='has_hazardous_ingredient',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='ingredient_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='max_ewg_score',
+            field=models.PositiveSmallIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_safety_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,12 @@
 from django.db import models
-from typing import Optional
+from django.db.models import DEFERRED
+from typing import Optional, Tuple
+
+# EWG 7~10등급: 유해 가능성이 높은 성분 (has_hazardous_ingredient 기준)
+HAZARD_EWG_SCORE = 7
+
+# Product에 비정규화해 둔 성분 안전도 집계 필드 (ProductDocument에도 같은 이름으로 색인)
+SAFETY_FIELDS = ('max_ewg_score', 'avg_ewg_score', 'ingredient_count', 'has_hazardous_ingredient')
 
 class TimeStampedModel(models.Model):
     """
@@ -7,16 +14,42 @@ class TimeStampedModel(models.Model):
     생성 시간과 수정 시간을 자동으로 기록하여 운영 편의성을 높임
     """
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # 증분 색인 워터마크 조회용
+
+    # 값이 바뀌면 검색 결과(매칭/필터/정렬/패싯)가 달라지는 필드 (하위 모델에서 지정)
+    # 그 외 필드만 바뀌면 상품 조각만 새로 만들고 검색 캐시(카탈로그 버전)는 유지 (signals.py)
+    SEARCH_FIELDS: Tuple[str, ...] = ()
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 저장 시 검색 필드가 바뀌었는지 비교하기 위해 조회 시점 값 보관
+        instance.mark_search_fields_saved()
+        return instance
+
+    def _search_values(self) -> Tuple:
+        # 지연 로드 필드는 조회하지 않고 DEFERRED로 둠
+        return tuple(self.__dict__.get(name, DEFERRED) for name in self.SEARCH_FIELDS)
+
+    def search_fields_changed(self) -> bool:
+        """DB에서 읽은 뒤 검색 필드가 바뀌었는지 (새로 만든 객체, 지연 로드했던 필드가 있으면 True)"""
+        loaded = getattr(self, '_loaded_search_values', None)
+        return loaded is None or DEFERRED in loaded or loaded != self._search_values()
+
+    def mark_search_fields_saved(self) -> None:
+        """현재 검색 필드 값을 저장된 값으로 기록 (signals.py에서 저장 처리 후 호출)"""
+        self._loaded_search_values = self._search_values()
+
 class Brand(TimeStampedModel):
     """화장품 브랜드 정보"""
     name = models.CharField(max_length=100, db_index=True)  # 검색 성능을 위해 인덱스 추가
     website_url = models.URLField(blank=True, null=True)
 
+    SEARCH_FIELDS = ('name',)  # 검색/브랜드 패싯 대상
+
     def __str__(self) -> str:
         return self.name
 
@@ -29,6 +62,19 @@ class Ingredient(TimeStampedModel):
     ewg_score = models.IntegerField(default=1, help_text="1~10 사이의 EWG 안전 등급")
     description = models.TextField(blank=True)
 
+    SEARCH_FIELDS = ('name', 'ewg_score')  # 검색 대상, 안전도 필터/정렬
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 저장 시 EWG 등급이 바뀌었는지 비교하기 위해 조회 시점 값 보관 (signals.py)
+        instance._loaded_ewg_score = instance.ewg_score
+        return instance
+
+    def ewg_score_changed(self) -> bool:
+        """DB에서 읽은 뒤 EWG 등급이 바뀌었는지 (새로 만든 객체는 True)"""
+        return getattr(self, '_loaded_ewg_score', None) != self.ewg_score
+
     def __str__(self) -> str:
         return f"{self.name} (EWG: {self.ewg_score})"
 
@@ -42,11 +88,30 @@ class Product(TimeStampedModel):
     price = models.IntegerField(default=0)
     image_url = models.URLField(blank=True, null=True)
 
+    SEARCH_FIELDS = ('name', 'brand_id', 'price')  # 검색 대상, 브랜드/가격 필터/정렬/패싯
+
     # 핵심 관계: 하나의 화장품은 여러 성분을 가짐
     ingredients = models.ManyToManyField(Ingredient, related_name='products')
 
+    # 성분 안전도 집계 (성분 구성/EWG 등급이 바뀔 때 safety.py에서 갱신)
+    # 검색 필터/정렬을 nested 쿼리나 M2M 조인 없이 숫자 필드로 처리하기 위한 비정규화 값
+    max_ewg_score = models.PositiveSmallIntegerField(null=True, editable=False, db_index=True)  # 성분이 없으면 NULL
+    avg_ewg_score = models.FloatField(null=True, editable=False)
+    ingredient_count = models.PositiveIntegerField(default=0, editable=False)
+    has_hazardous_ingredient = models.BooleanField(default=False, editable=False)  # HAZARD_EWG_SCORE 이상 성분 포함
+
     class Meta:
         ordering = ['-id']  # 최신순 정렬 기본
 
+    def save(self, *args, **kwargs) -> None:
+        # 안전도 집계는 safety.recompute_safety만 갱신
+        # (성분 변경 전에 읽어 둔 인스턴스를 저장해도 오래된 집계로 덮어쓰지 않도록 일반 수정에서 제외)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in SAFETY_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return self.name
\ No newline at end of file
@@ -0,0 +1,195 @@
+import base64
+import json
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .analysis import FUZZY_CURSOR_MARK
+
+
+class InvalidPageError(ValueError):
+    """잘못된 페이지/커서 파라미터 (400 응답용)"""
+
+
+class PageRequest(NamedTuple):
+    """검증이 끝난 검색 페이지 요청"""
+    cursor_mode: bool                       # search_after 모드 여부
+    page: int                               # 페이지 번호 (커서 모드는 1)
+    page_size: int                          # 페이지 크기 (ES size)
+    search_after: Optional[List[Any]]       # 커서 모드의 search_after 값
+    cursor: str                             # 원본 커서 토큰 (캐시 키용)
+
+    @property
+    def offset(self) -> int:
+        """ES from 값"""
+        return (self.page - 1) * self.page_size
+
+    def cache_params(self) -> Dict[str, Any]:
+        """캐시 키에 포함할 페이지 파라미터"""
+        if self.cursor_mode:
+            return {'page_size': self.page_size, 'cursor': self.cursor or 'first'}
+        return {'page_size': self.page_size, 'page': self.page}
+
+
+class SearchPagination(PageNumberPagination):
+    """
+    Elasticsearch 검색 결과용 페이지네이션
+
+    DB 쿼리셋을 자르는 대신, 요청한 페이지에 해당하는 from/size를 계산해
+    ES에 그대로 넘깁니다. (요청당 응답에 필요한 행만 조회)
+
+    - 페이지 모드: ?page=3&page_size=20 -> from=40, size=20, count=hits.total
+    - 커서 모드: ?cursor=<토큰> -> search_after 기반 (깊은 페이지용, count 없음)
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    # ES index.max_result_window 기본값 (from + size 상한)
+    max_result_window = 10000
+
+    def __init__(self, request: Request) -> None:
+        self.request = request
+
+    def is_cursor_mode(self) -> bool:
+        """커서(search_after) 모드 여부 (cursor 파라미터가 있으면 빈 값이어도 커서 모드)"""
+        return self.cursor_query_param in self.request.query_params
+
+    def get_page_window(self) -> Tuple[int, int]:
+        """
+        요청 파라미터로부터 (page, page_size) 계산
+
+        Returns:
+            (page 번호, 페이지 크기)
+
+        Raises:
+            InvalidPageError: 숫자가 아니거나 1 미만, 또는 max_result_window 초과
+        """
+        page_size = self.get_page_size(self.request)
+        try:
+            page = int(self.request.query_params.get(self.page_query_param) or 1)
+        except ValueError:
+            raise InvalidPageError('페이지 번호는 숫자여야 합니다.')
+        if page < 1:
+            raise InvalidPageError('페이지 번호는 1 이상이어야 합니다.')
+        if page * page_size > self.max_result_window:
+            raise InvalidPageError(
+                f'{self.max_result_window}번째 이후 결과는 cursor 파라미터로 조회해주세요.'
+            )
+        return page, page_size
+
+    def get_page_request(self, sort_size: int) -> PageRequest:
+        """
+        페이지/커서 파라미터를 검증해 PageRequest로 변환
+
+        Args:
+            sort_size: 커서 모드 정렬 값 개수 (SearchFilters.sort_fields() + _score + id)
+
+        Raises:
+            InvalidPageError: 잘못된 페이지 번호 또는 커서
+        """
+        if self.is_cursor_mode():
+            return PageRequest(
+                cursor_mode=True,
+                page=1,
+                page_size=self.get_page_size(self.request),
+                search_after=self.get_cursor(sort_size),
+                cursor=self.request.query_params.get(self.cursor_query_param, ''),
+            )
+        page, page_size = self.get_page_window()
+        return PageRequest(cursor_mode=False, page=page, page_size=page_size, search_after=None, cursor='')
+
+    def get_cursor(self, sort_size: int) -> Optional[List[Any]]:
+        """
+        커서 토큰을 search_after 값으로 복원
+
+        Args:
+            sort_size: 정렬 값 개수 (오타 허용 검색 커서는 끝에 FUZZY_CURSOR_MARK가 하나 더 붙음)
+
+        Returns:
+            search_after 값 리스트 (첫 페이지면 None)
+
+        Raises:
+            InvalidPageError: 디코딩할 수 없거나 정렬 값 개수/형식이 맞지 않는 토큰
+        """
+        token = self.request.query_params.get(self.cursor_query_param, '')
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (ValueError, UnicodeError):
+            raise InvalidPageError('유효하지 않은 cursor 입니다.')
+        if not isinstance(values, list):
+            raise InvalidPageError('유효하지 않은 cursor 입니다.')
+        # 정렬과 맞지 않는 값은 ES 400 대신 여기서 거절 (다른 sort로 만든 커서 재사용 등)
+        if values and values[-1] == FUZZY_CURSOR_MARK:
+            values_size = len(values) - 1
+        else:
+            values_size = len(values)
+        if values_size != sort_size:
+            raise InvalidPageError('유효하지 않은 cursor 입니다.')
+        if not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in values):
+            raise InvalidPageError('유효하지 않은 cursor 입니다.')
+        return values
+
+    @staticmethod
+    def encode_cursor(sort_values: List[Any]) -> str:
+        """search_after 값(마지막 hit의 sort)을 URL-safe 토큰으로 변환"""
+        raw = json.dumps(list(sort_values), separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def get_paginated_data(self, results: List[Any], count: int, page: int, page_size: int) -> Dict[str, Any]:
+        """
+        페이지 모드 응답 생성 (PageNumberPagination과 같은 형식)
+
+        Args:
+            results: 현재 페이지 결과
+            count: 전체 결과 수 (ES hits.total)
+            page: 현재 페이지 번호
+            page_size: 페이지 크기
+        """
+        url = self.request.build_absolute_uri()
+        last_page = max(1, math.ceil(count / page_size))
+        last_page = min(last_page, self.max_result_window // page_size)
+
+        next_link = None
+        if page < last_page:
+            next_link = replace_query_param(url, self.page_query_param, page + 1)
+
+        previous_link = None
+        if page > 1:
+            if page - 1 == 1:
+                previous_link = remove_query_param(url, self.page_query_param)
+            else:
+                previous_link = replace_query_param(url, self.page_query_param, page - 1)
+
+        return {
+            'count': count,
+            'next': next_link,
+            'previous': previous_link,
+            'results': results,
+        }
+
+    def get_cursor_data(self, results: List[Any], last_sort: Optional[List[Any]], page_size: int) -> Dict[str, Any]:
+        """
+        커서 모드 응답 생성 (CursorPagination과 같은 형식, 앞으로만 이동)
+
+        Args:
+            results: 현재 페이지 결과
+            last_sort: 마지막 hit의 sort 값 (다음 페이지의 search_after)
+            page_size: 페이지 크기
+        """
+        next_link = None
+        if last_sort is not None and len(results) >= page_size:
+            url = self.request.build_absolute_uri()
+            next_link = replace_query_param(url, self.cursor_query_param, self.encode_cursor(last_sort))
+
+        return {
+            'next': next_link,
+            'previous': None,
+            'results': results,
+        }
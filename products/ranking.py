@@ -0,0 +1,302 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from .sketch import SKETCH_TOP_KEY, redis_sketch_add, redis_space_saving_add
+
+logger = logging.getLogger(__name__)
+
+# 누적 랭킹 (Sorted Set, 동적 캐시 TTL 결정에도 사용)
+# SEARCH_RANKING_BACKEND = 'sketch'이면 크기가 고정된 SKETCH_TOP_KEY를 대신 사용
+RANKING_KEY = "search_ranking"
+
+# 시간 버킷 랭킹: 분/시간 단위 Sorted Set에 나눠 적재하고 만료시킴
+MINUTE_BUCKET_PREFIX = "search_ranking:m"
+HOUR_BUCKET_PREFIX = "search_ranking:h"
+MINUTE_BUCKET_TTL = 60 * 61            # 1시간 윈도우 + 여유 1분
+HOUR_BUCKET_TTL = 60 * 60 * (24 * 7 + 1)  # 7일 윈도우 + 여유 1시간
+
+# 윈도우별 병합 결과 캐시 (몇 초간 재사용)
+WINDOW_RESULT_PREFIX = "search_ranking:top"
+WINDOW_RESULT_TTL = 5
+
+
+class RankingWindow(NamedTuple):
+    """랭킹 윈도우 설정"""
+    bucket_prefix: str   # 병합할 버킷 종류
+    bucket_seconds: int  # 버킷 하나의 길이 (초)
+    buckets: int         # 병합할 버킷 수
+    half_life: int       # 지수 감쇠 반감기 (초)
+
+
+WINDOWS: Dict[str, RankingWindow] = {
+    '1h': RankingWindow(MINUTE_BUCKET_PREFIX, 60, 60, 60 * 15),
+    '24h': RankingWindow(HOUR_BUCKET_PREFIX, 60 * 60, 24, 60 * 60 * 6),
+    '7d': RankingWindow(HOUR_BUCKET_PREFIX, 60 * 60, 24 * 7, 60 * 60 * 24),
+}
+
+
+def is_sketch_backend() -> bool:
+    """근사 랭킹(Count-Min Sketch + Top-K) 사용 여부"""
+    return settings.SEARCH_RANKING_BACKEND == 'sketch'
+
+
+def ranking_key() -> str:
+    """누적 랭킹 점수를 읽을 Sorted Set 키"""
+    return SKETCH_TOP_KEY if is_sketch_backend() else RANKING_KEY
+
+
+def increments_in_lookup() -> bool:
+    """
+    검색 캐시 조회 스크립트에서 랭킹을 바로 ZINCRBY 할지 여부
+
+    랭킹 버퍼를 쓰거나 근사 랭킹이면 조회 스크립트는 점수만 읽고,
+    증가는 record_searches(버퍼 flush 포함)가 처리합니다.
+    """
+    return not settings.SEARCH_RANKING_BUFFER['ENABLED'] and not is_sketch_backend()
+
+
+def bucket_keys(now: Optional[float] = None) -> List[Tuple[str, int]]:
+    """
+    현재 시각의 (버킷 키, TTL) 목록
+
+    Args:
+        now: 현재 시각 (테스트용)
+
+    Returns:
+        [(분 버킷 키, TTL), (시간 버킷 키, TTL)]
+    """
+    now = time.time() if now is None else now
+    return [
+        (f"{MINUTE_BUCKET_PREFIX}:{int(now // 60)}", MINUTE_BUCKET_TTL),
+        (f"{HOUR_BUCKET_PREFIX}:{int(now // 3600)}", HOUR_BUCKET_TTL),
+    ]
+
+
+def record_searches(con: Any, counts: Dict[str, int], now: Optional[float] = None) -> None:
+    """
+    검색어 랭킹 점수 증가 (누적 + 시간 버킷, 파이프라인 한 번으로 실행)
+
+    근사 랭킹이면 시간 버킷도 Space-Saving으로 TOP_K개만 보관
+    (일회성 검색어가 버킷마다 쌓이면 고정 메모리 Sketch를 쓰는 의미가 없음)
+
+    Args:
+        con: Redis 연결
+        counts: {검색어: 증가량}
+        now: 현재 시각 (테스트용)
+    """
+    if not counts:
+        return
+
+    pipe = con.pipeline(transaction=False)
+    buckets = bucket_keys(now)
+    sketch = settings.SEARCH_RANKING_SKETCH if is_sketch_backend() else None
+    for keyword, amount in counts.items():
+        if sketch is not None:
+            # 근사 랭킹: 고정 크기 Sketch + Top-K 후보만 갱신 (검색어 종류가 늘어도 메모리 일정)
+            redis_sketch_add(pipe, keyword, amount, sketch['WIDTH'], sketch['DEPTH'], sketch['TOP_K'])
+        else:
+            # Sorted Set(ZSET) 자료구조 사용: 점수 증가 (ZINCRBY)
+            pipe.zincrby(RANKING_KEY, amount, keyword)
+        for key, _ in buckets:
+            if sketch is not None:
+                redis_space_saving_add(pipe, key, keyword, amount, sketch['TOP_K'])
+            else:
+                pipe.zincrby(key, amount, keyword)
+    for key, ttl in buckets:
+        pipe.expire(key, ttl)
+    pipe.execute()
+
+
+def window_weights(window: RankingWindow, now: Optional[float] = None) -> Dict[str, float]:
+    """
+    윈도우에 포함되는 버킷별 지수 감쇠 가중치
+
+    Args:
+        window: 랭킹 윈도우 설정
+        now: 현재 시각 (테스트용)
+
+    Returns:
+        {버킷 키: 가중치} (현재 버킷 1.0, 반감기마다 절반)
+    """
+    now = time.time() if now is None else now
+    current = int(now // window.bucket_seconds)
+    return {
+        f"{window.bucket_prefix}:{current - age}": 0.5 ** (age * window.bucket_seconds / window.half_life)
+        for age in range(window.buckets)
+    }
+
+
+def top_keywords(con: Any, window_name: Optional[str] = None, limit: int = 10,
+                 now: Optional[float] = None) -> List[Tuple[str, float]]:
+    """
+    인기 검색어 Top-K 조회
+
+    Args:
+        con: Redis 연결
+        window_name: '1h' | '24h' | '7d' (None이면 누적 랭킹)
+        limit: 반환 개수
+        now: 현재 시각 (테스트용)
+
+    Returns:
+        [(검색어, 점수)] 점수 높은 순
+
+    Note:
+        윈도우 랭킹은 ZUNIONSTORE(가중치=지수 감쇠)로 병합한 결과를 몇 초간 캐시
+    """
+    if window_name is None:
+        # 점수 높은 순으로 상위 N개 가져오기 (ZREVRANGE)
+        ranks = con.zrevrange(ranking_key(), 0, limit - 1, withscores=True)
+        return [(keyword.decode('utf-8'), score) for keyword, score in ranks]
+
+    window = WINDOWS[window_name]
+    dest = f"{WINDOW_RESULT_PREFIX}:{window_name}"
+
+    pipe = con.pipeline(transaction=False)
+    pipe.exists(dest)
+    pipe.zrevrange(dest, 0, limit - 1, withscores=True)
+    exists, ranks = pipe.execute()
+
+    if not exists:
+        pipe = con.pipeline(transaction=False)
+        pipe.zunionstore(dest, window_weights(window, now))
+        pipe.expire(dest, WINDOW_RESULT_TTL)
+        pipe.zrevrange(dest, 0, limit - 1, withscores=True)
+        ranks = pipe.execute()[-1]
+        logger.debug(f"윈도우 랭킹 병합: {window_name} ({window.buckets}개 버킷)")
+
+    return [(keyword.decode('utf-8'), score) for keyword, score in ranks]
+
+
+class RankingBuffer:
+    """
+    랭킹 증가 write-behind 버퍼 (워커/프로세스당 하나)
+
+    검색 요청마다 ZINCRBY를 보내는 대신 메모리에 {검색어: 증가량}을 모아두고,
+    flush_interval마다 또는 검색어 종류가 max_keywords에 도달하면
+    record_searches로 파이프라인 한 번에 반영합니다.
+
+    워커가 비정상 종료되면 아직 반영하지 않은 증가분(pending)만큼 유실될 수 있으며,
+    stats()의 pending이 그 상한입니다.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_keywords: int = 500) -> None:
+        self.flush_interval = flush_interval
+        self.max_keywords = max_keywords
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._pending = 0          # 버퍼에 쌓인 (유실 가능한) 증가분
+        self._flushed = 0          # 반영 완료된 증가분
+        self._dropped = 0          # Redis 장애로 버린 증가분
+        self._flushes = 0
+        self._wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def add(self, keyword: str, amount: int = 1) -> None:
+        """검색어 증가분 적재 (Redis 호출 없음)"""
+        with self._lock:
+            self._counts[keyword] = self._counts.get(keyword, 0) + amount
+            self._pending += amount
+            full = len(self._counts) >= self.max_keywords
+        self._ensure_flusher()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        버퍼 내용을 Redis에 일괄 반영
+
+        Returns:
+            반영한 증가분 합계
+
+        Note:
+            Redis 장애 시 증가분을 버퍼에 되돌리되, max_keywords의 10배를 넘으면 버림
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return 0
+
+        total = sum(counts.values())
+        try:
+            record_searches(get_redis_connection("default"), counts)
+        except Exception as e:
+            logger.error(f"랭킹 버퍼 반영 실패: {str(e)}")
+            with self._lock:
+                if len(self._counts) + len(counts) <= self.max_keywords * 10:
+                    for keyword, amount in counts.items():
+                        self._counts[keyword] = self._counts.get(keyword, 0) + amount
+                else:
+                    self._pending -= total
+                    self._dropped += total
+            return 0
+
+        with self._lock:
+            self._pending -= total
+            self._flushed += total
+            self._flushes += 1
+        logger.debug(f"랭킹 버퍼 반영: {len(counts)}개 검색어, {total}회")
+        return total
+
+    def stats(self) -> Dict[str, int]:
+        """버퍼 상태 (pending = 비정상 종료 시 유실 가능한 증가분 상한)"""
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'keywords': len(self._counts),
+                'flushed': self._flushed,
+                'dropped': self._dropped,
+                'flushes': self._flushes,
+            }
+
+    def _ensure_flusher(self) -> None:
+        # fork(gunicorn preload) 이후에는 스레드가 복제되지 않으므로 프로세스별로 새로 시작
+        pid = os.getpid()
+        if self._flusher is not None and self._pid == pid:
+            return
+        with self._lock:
+            if self._flusher is not None and self._pid == pid:
+                return
+            self._pid = pid
+            self._flusher = threading.Thread(target=self._run, name='ranking-buffer-flusher', daemon=True)
+            self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+_ranking_buffer: Optional[RankingBuffer] = None
+_ranking_buffer_lock = threading.Lock()
+
+
+def get_ranking_buffer() -> RankingBuffer:
+    """설정(SEARCH_RANKING_BUFFER)으로 만든 프로세스 공용 랭킹 버퍼"""
+    global _ranking_buffer
+    if _ranking_buffer is None:
+        with _ranking_buffer_lock:
+            if _ranking_buffer is None:
+                config = settings.SEARCH_RANKING_BUFFER
+                _ranking_buffer = RankingBuffer(
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    max_keywords=config['MAX_KEYWORDS'],
+                )
+                # 정상 종료 시 남은 증가분 반영
+                atexit.register(_ranking_buffer.flush)
+    return _ranking_buffer
+
+
+def flush_ranking_buffer() -> int:
+    """워커 종료 훅(gunicorn worker_exit 등)에서 호출: 남은 증가분 반영"""
+    if _ranking_buffer is None:
+        return 0
+    return _ranking_buffer.flush()
@@ -0,0 +1,95 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Set
+
+from django.db import connections
+from django_redis import get_redis_connection
+
+from .resilience import request_deadline
+from .timing import _stage_timings
+
+logger = logging.getLogger(__name__)
+
+REFRESH_WORKERS = 2          # 워커(프로세스)당 백그라운드 갱신 스레드 수
+REFRESH_LOCK_TTL_MS = 10000  # 워커 간 중복 갱신 방지 락 (갱신 후 자연 만료)
+
+_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='search-refresh')
+_pending_lock = threading.Lock()
+_pending: Set[str] = set()
+
+
+def refresh_in_background(key: str, fn: Callable[[], Any]) -> bool:
+    """
+    캐시 갱신 작업을 백그라운드 스레드로 실행 (stale-while-revalidate)
+
+    같은 키는 프로세스 내에서 한 번만, 워커 간에는 SET NX PX 락으로 한 번만 예약합니다.
+
+    Args:
+        key: 검색 캐시 키
+        fn: 결과 계산 + 캐시 저장 함수
+
+    Returns:
+        갱신 작업 예약 여부 (이미 다른 곳에서 갱신 중이면 False)
+    """
+    with _pending_lock:
+        if key in _pending:
+            return False
+        _pending.add(key)
+
+    try:
+        con = get_redis_connection("default")
+        acquired = con.set(f"refresh:{key}", 1, nx=True, px=REFRESH_LOCK_TTL_MS)
+    except Exception as e:
+        logger.warning(f"캐시 갱신 락 획득 실패 (갱신 생략): {str(e)}")
+        acquired = False
+
+    if not acquired:
+        _done(key)
+        return False
+
+    # 요청 스레드의 contextvars를 복사하되 단계 시간 수집기는 떼어냄
+    # (갱신 작업의 es/db 시간이 이미 응답한 요청의 Server-Timing/메트릭에 섞이지 않도록)
+    context = contextvars.copy_context()
+    context.run(_stage_timings.set, None)
+    _executor.submit(context.run, _run, key, fn)
+    return True
+
+
+def wait_for_refreshes(timeout: float = REFRESH_LOCK_TTL_MS / 1000) -> bool:
+    """
+    예약된 백그라운드 갱신이 모두 끝날 때까지 대기 (벤치마크처럼 설정을 바꿔 실행한 뒤 원래대로 돌릴 때)
+
+    Returns:
+        timeout 안에 모두 끝났는지
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        with _pending_lock:
+            if not _pending:
+                return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+
+
+def _run(key: str, fn: Callable[[], Any]) -> None:
+    try:
+        # 응답을 보낸 요청의 마감이 아니라 갱신 작업 자체의 예산 (단계별 타임아웃도 이 안에서 결정)
+        with request_deadline():
+            fn()
+        logger.debug(f"백그라운드 캐시 갱신 완료: {key}")
+    except Exception as e:
+        # 갱신 실패 시 기존 stale 값이 hard TTL까지 계속 사용됨
+        logger.warning(f"백그라운드 캐시 갱신 실패: {key}: {str(e)}")
+    finally:
+        # 요청 스레드가 아니므로 DB 연결을 직접 정리
+        connections.close_all()
+        _done(key)
+
+
+def _done(key: str) -> None:
+    with _pending_lock:
+        _pending.discard(key)
@@ -0,0 +1,362 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db import connection
+from django_redis import get_redis_connection
+from django_redis.exceptions import ConnectionInterrupted
+from elasticsearch.exceptions import TransportError
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# 워커 간 공유 상태 키 (차단 여부는 키의 남은 TTL, 실패 수는 FAILURE_WINDOW초 카운터)
+_OPEN_KEY = "breaker:{name}:open"
+_FAILURES_KEY = "breaker:{name}:failures"
+_PROBE_KEY = "breaker:{name}:probe"
+
+# 다른 워커가 연 차단 상태를 확인하는 주기 (초, 닫힌 상태에서 요청마다 Redis를 조회하지 않도록)
+SYNC_INTERVAL = 1.0
+
+# 단계 예산이 이보다 작아도 최소 이만큼은 기다림 (초, 너무 짧은 타임아웃으로 정상 요청까지 실패하지 않도록)
+MIN_STAGE_TIMEOUT = 0.05
+
+
+class CircuitBreaker:
+    """
+    의존 서비스별 차단기 (closed -> open -> half-open -> closed)
+
+    - closed: 호출 허용, FAILURE_WINDOW초 안의 실패가 FAILURE_THRESHOLD 이상이면 open
+    - open: OPEN_SECONDS 동안 호출하지 않고 바로 실패 (느린 서비스를 기다리며 스레드가 쌓이지 않음)
+    - half-open: 한 요청만 시험 호출, 성공하면 closed / 실패하면 다시 open
+
+    shared=True면 실패 수와 open 상태를 Redis에 두어 모든 워커가 함께 판단합니다.
+    (Redis 장애 시에는 워커 내 상태로만 동작, Redis 자체의 차단기는 shared=False)
+    설정은 SEARCH_RESILIENCE에서 호출할 때마다 읽습니다.
+    """
+
+    def __init__(self, name: str, shared: bool = True) -> None:
+        self.name = name
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_until = 0.0
+        self._failures: Deque[float] = deque()
+        self._probing = False
+        self._synced_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._opened_until:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        호출 가능 여부 (False면 호출하지 말고 대체 응답)
+
+        half-open에서는 워커 간 하나의 요청만 True를 받습니다.
+        """
+        config = settings.SEARCH_RESILIENCE
+        if not config['BREAKER_ENABLED']:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN:
+                if now < self._opened_until:
+                    return False
+                self._state, self._probing = HALF_OPEN, False
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+                probe = True
+            else:
+                probe = False
+                sync = self.shared and now - self._synced_at >= SYNC_INTERVAL
+                if sync:
+                    self._synced_at = now
+
+        if probe:
+            # 다른 워커가 다시 열었으면 남은 시간만큼, 다른 워커가 시험 중이면 SYNC_INTERVAL 뒤 다시 확인
+            remaining = self._shared_open_remaining()
+            if remaining is None and not self._acquire_probe(config['OPEN_SECONDS']):
+                remaining = SYNC_INTERVAL
+            if remaining is not None:
+                with self._lock:
+                    self._open_locally(now, remaining)
+                return False
+            logger.info(f"차단기 시험 호출 (half-open): {self.name}")
+            return True
+
+        if sync:
+            remaining = self._shared_open_remaining()
+            if remaining:
+                with self._lock:
+                    self._open_locally(now, remaining)
+                logger.warning(f"차단기 열림 (다른 워커): {self.name} ({remaining:.1f}초)")
+                return False
+        return True
+
+    @contextmanager
+    def calling(self) -> Iterator[None]:
+        """
+        allow()가 True를 돌려준 뒤의 호출 구간 (나가는 모든 경로에서 결과 기록)
+
+        서비스 장애 예외(is_service_failure)면 실패, 그 외에는 예외가 나도 서비스는 응답한 것이므로 성공으로 기록
+        (half-open 시험 호출을 가져간 호출이 결과를 남기지 않으면 워커가 재시작될 때까지 차단이 풀리지 않음)
+        """
+        failed = False
+        try:
+            yield
+        except Exception as e:
+            failed = is_service_failure(e)
+            raise
+        finally:
+            if failed:
+                self.record_failure()
+            else:
+                self.record_success()
+
+    async def aallow(self) -> bool:
+        """
+        allow()의 비동기 버전 (이벤트 루프용)
+
+        shared 차단기는 Redis(django_redis 동기 클라이언트)로 상태를 맞추므로 스레드에서 실행
+        """
+        if not self.shared:
+            return self.allow()
+        return await sync_to_async(self.allow, thread_sensitive=False)()
+
+    @asynccontextmanager
+    async def acalling(self) -> AsyncIterator[None]:
+        """calling()의 비동기 버전 (결과 기록의 Redis 호출은 스레드에서, 장애 중에 이벤트 루프를 막지 않음)"""
+        failed = False
+        try:
+            yield
+        except Exception as e:
+            failed = is_service_failure(e)
+            raise
+        finally:
+            record = self.record_failure if failed else self.record_success
+            if self.shared:
+                await sync_to_async(record, thread_sensitive=False)()
+            else:
+                record()
+
+    def record_success(self) -> None:
+        """호출 성공 (half-open 시험 호출이었으면 닫음, 닫힌 상태에서는 Redis 호출 없음)"""
+        with self._lock:
+            if self._state != HALF_OPEN:
+                return
+            self._state, self._probing = CLOSED, False
+            self._failures.clear()
+        if self.shared:
+            self._redis_call(lambda con: con.delete(*self._keys()))
+        logger.info(f"차단기 닫힘 (복구 확인): {self.name}")
+
+    def record_failure(self) -> None:
+        """호출 실패 (연결 실패, 타임아웃, 5xx)"""
+        config = settings.SEARCH_RESILIENCE
+        if not config['BREAKER_ENABLED']:
+            return
+
+        now = time.monotonic()
+        window = config['FAILURE_WINDOW']
+        with self._lock:
+            if self._state == HALF_OPEN:
+                # 시험 호출 실패: 바로 다시 차단
+                trip = True
+            else:
+                self._failures.append(now)
+                while self._failures and self._failures[0] <= now - window:
+                    self._failures.popleft()
+                trip = len(self._failures) >= config['FAILURE_THRESHOLD']
+
+        if not trip and self.shared:
+            count = self._redis_call(lambda con: self._incr_failures(con, window))
+            trip = count is not None and count >= config['FAILURE_THRESHOLD']
+        if trip:
+            self._trip(now, config['OPEN_SECONDS'])
+
+    def reset(self) -> None:
+        """상태 초기화 (테스트, 운영 중 수동 복구)"""
+        with self._lock:
+            self._state, self._probing = CLOSED, False
+            self._opened_until = self._synced_at = 0.0
+            self._failures.clear()
+        if self.shared:
+            self._redis_call(lambda con: con.delete(*self._keys()))
+
+    def _trip(self, now: float, open_seconds: float) -> None:
+        with self._lock:
+            self._open_locally(now, open_seconds)
+        if self.shared:
+            def share(con):
+                pipe = con.pipeline(transaction=False)
+                pipe.set(self._key(_OPEN_KEY), 1, px=int(open_seconds * 1000))
+                pipe.delete(self._key(_FAILURES_KEY), self._key(_PROBE_KEY))
+                pipe.execute()
+            self._redis_call(share)
+        logger.warning(f"차단기 열림: {self.name} ({open_seconds}초 동안 호출 안 함)")
+
+    def _open_locally(self, now: float, seconds: float) -> None:
+        self._state, self._probing = OPEN, False
+        self._opened_until = now + seconds
+        self._failures.clear()
+
+    def _shared_open_remaining(self) -> Optional[float]:
+        """다른 워커가 연 차단의 남은 시간 (초, 없거나 Redis 장애면 None)"""
+        if not self.shared:
+            return None
+        pttl = self._redis_call(lambda con: con.pttl(self._key(_OPEN_KEY)))
+        return pttl / 1000 if pttl is not None and pttl > 0 else None
+
+    def _acquire_probe(self, open_seconds: float) -> bool:
+        if not self.shared:
+            return True
+        acquired = self._redis_call(
+            lambda con: bool(con.set(self._key(_PROBE_KEY), 1, nx=True, px=int(open_seconds * 1000)))
+        )
+        # Redis 장애면 워커별로 시험 호출
+        return acquired is None or bool(acquired)
+
+    def _incr_failures(self, con, window: float) -> int:
+        # 첫 실패에서만 만료 시각 설정 (INCR은 TTL을 유지하므로 고정 구간 카운터)
+        pipe = con.pipeline(transaction=False)
+        pipe.set(self._key(_FAILURES_KEY), 0, nx=True, px=int(window * 1000))
+        pipe.incr(self._key(_FAILURES_KEY))
+        return pipe.execute()[1]
+
+    def _key(self, template: str) -> str:
+        return template.format(name=self.name)
+
+    def _keys(self):
+        return [self._key(_OPEN_KEY), self._key(_FAILURES_KEY), self._key(_PROBE_KEY)]
+
+    def _redis_call(self, fn):
+        # 차단기 상태 공유는 부가 기능: Redis 장애면 워커 내 상태만 사용
+        # Redis 차단기 자신은 shared=False라 여기 오지 않음
+        redis_breaker = get_breaker('redis')
+        if self.name == 'redis' or not redis_breaker.allow():
+            return None
+        try:
+            with redis_breaker.calling():
+                return fn(get_redis_connection("default"))
+        except Exception as e:
+            logger.debug(f"차단기 상태 공유 실패 ({self.name}): {str(e)}")
+            return None
+
+
+def is_service_failure(e: Exception) -> bool:
+    """
+    차단기에 실패로 기록할 예외인지 (서비스가 응답하지 못한 경우만)
+
+    ES 연결 실패/타임아웃(ConnectionError, ConnectionTimeout)과 5xx, Redis 연결 실패/타임아웃, 단계 타임아웃
+    잘못된 쿼리(4xx) 등 서비스가 정상 응답한 오류는 제외
+    """
+    if isinstance(e, TransportError):
+        return not isinstance(e.status_code, int) or e.status_code >= 500
+    # TimeoutError: 단계 예산으로 건 asyncio 타임아웃
+    return isinstance(e, (RedisConnectionError, RedisTimeoutError, ConnectionInterrupted, TimeoutError))
+
+
+_breakers: Dict[str, CircuitBreaker] = {
+    'elasticsearch': CircuitBreaker('elasticsearch'),
+    # Redis 상태를 Redis에 둘 수는 없으므로 워커 내 상태만 사용
+    'redis': CircuitBreaker('redis', shared=False),
+}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """의존 서비스 차단기 ('elasticsearch' | 'redis', 워커당 하나)"""
+    return _breakers[name]
+
+
+# 현재 요청의 마감 시각 (time.monotonic 기준), 마감이 없으면 None (백그라운드 갱신 등)
+_deadline: ContextVar[Optional[float]] = ContextVar('search_deadline', default=None)
+
+
+@contextmanager
+def request_deadline(budget_ms: Optional[float] = None) -> Iterator[None]:
+    """
+    블록 안의 검색 처리에 요청 단위 마감 시각 설정
+
+    Args:
+        budget_ms: 전체 예산 (None이면 SEARCH_RESILIENCE['DEADLINE_MS'], 0이면 마감 없음)
+    """
+    budget_ms = settings.SEARCH_RESILIENCE['DEADLINE_MS'] if budget_ms is None else budget_ms
+    token = _deadline.set(time.monotonic() + budget_ms / 1000 if budget_ms else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """마감까지 남은 시간 (초, 마감이 없으면 None)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def stage_timeout(name: str) -> Optional[float]:
+    """
+    단계별 타임아웃 (초)
+
+    전체 예산 * STAGE_BUDGET[name] 비율을 넘지 않고, 남은 예산도 넘지 않음
+    (앞 단계가 늦어지면 뒤 단계 타임아웃이 줄어듦)
+
+    Returns:
+        타임아웃 (마감이 없거나 비율이 없는 단계면 None)
+    """
+    config = settings.SEARCH_RESILIENCE
+    share = config['STAGE_BUDGET'].get(name)
+    remaining = remaining_budget()
+    if share is None or remaining is None:
+        return None
+    return max(min(config['DEADLINE_MS'] / 1000 * share, remaining), MIN_STAGE_TIMEOUT)
+
+
+def budget_exhausted() -> bool:
+    """마감이 지났는지 (부가 작업 생략 판단용)"""
+    remaining = remaining_budget()
+    return remaining is not None and remaining <= 0
+
+
+@contextmanager
+def db_stage_timeout() -> Iterator[None]:
+    """
+    블록 안의 MySQL SELECT에 db 단계 타임아웃 적용 (MAX_EXECUTION_TIME 옵티마이저 힌트)
+
+    타임아웃은 블록에 들어갈 때의 stage_timeout('db') (마감이 없거나 MySQL이 아니면 그대로 실행)
+    초과하면 MySQL이 쿼리를 중단하고 OperationalError (호출하는 쪽에서 DB 조회 실패로 처리)
+    """
+    timeout = stage_timeout('db')
+    if timeout is None or connection.vendor != 'mysql':
+        yield
+        return
+    hint = f"SELECT /*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */"
+
+    def add_hint(execute, sql, params, many, context):
+        stripped = sql.lstrip()
+        if stripped[:6].upper() == 'SELECT':
+            sql = hint + stripped[6:]
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(add_hint):
+        yield
@@ -0,0 +1,79 @@
+from typing import Any, Dict, Iterable, List
+
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+
+from .models import HAZARD_EWG_SCORE, SAFETY_FIELDS, Product
+
+
+def safety_values(scores: Iterable[int]) -> Dict[str, Any]:
+    """
+    성분 EWG 등급 목록으로 안전도 집계 계산
+
+    Args:
+        scores: 상품에 포함된 성분들의 EWG 등급
+
+    Returns:
+        {max_ewg_score, avg_ewg_score, ingredient_count, has_hazardous_ingredient}
+        (성분이 없으면 최대/평균은 None)
+    """
+    scores = list(scores)
+    if not scores:
+        return {'max_ewg_score': None, 'avg_ewg_score': None, 'ingredient_count': 0,
+                'has_hazardous_ingredient': False}
+    max_score = max(scores)
+    return {
+        'max_ewg_score': max_score,
+        'avg_ewg_score': round(sum(scores) / len(scores), 2),
+        'ingredient_count': len(scores),
+        'has_hazardous_ingredient': max_score >= HAZARD_EWG_SCORE,
+    }
+
+
+def recompute_safety(product_ids: Iterable[int], batch_size: int = 1000,
+                     touch: bool = False) -> Dict[int, Dict[str, Any]]:
+    """
+    상품 안전도 집계를 연결 테이블 기준으로 다시 계산해 저장
+
+    배치마다 그룹 집계 쿼리 한 번 + bulk_update 한 번 (post_save 신호 없음)
+
+    Args:
+        product_ids: 다시 계산할 상품 ID
+        batch_size: 한 번에 처리할 상품 수
+        touch: updated_at도 함께 갱신 (증분 색인 워터마크에 걸리도록)
+
+    Returns:
+        {상품 ID: 계산한 집계 값}
+    """
+    ids: List[int] = sorted(set(product_ids))
+    through = Product.ingredients.through
+    fields = SAFETY_FIELDS + ('updated_at',) if touch else SAFETY_FIELDS
+    now = timezone.now()
+    computed = {}
+
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        rows = {
+            row['product_id']: row
+            for row in through.objects.filter(product_id__in=chunk).values('product_id').annotate(
+                max_score=Max('ingredient__ewg_score'),
+                avg_score=Avg('ingredient__ewg_score'),
+                count=Count('ingredient_id'),
+            )
+        }
+        products = []
+        for pk in chunk:
+            row = rows.get(pk)
+            values = safety_values(()) if row is None else {
+                'max_ewg_score': row['max_score'],
+                'avg_ewg_score': round(row['avg_score'], 2),
+                'ingredient_count': row['count'],
+                'has_hazardous_ingredient': row['max_score'] >= HAZARD_EWG_SCORE,
+            }
+            computed[pk] = values
+            product = Product(pk=pk, **values)
+            if touch:
+                product.updated_at = now
+            products.append(product)
+        Product.objects.bulk_update(products, fields)
+    return computed
@@ -0,0 +1,308 @@
+import logging
+import math
+import random
+import re
+import time
+import unicodedata
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from .local_cache import publish_invalidation
+from .ranking import bucket_keys, ranking_key
+
+logger = logging.getLogger(__name__)
+
+# 상품/브랜드/성분이 바뀔 때마다 1씩 증가하는 전역 카탈로그 버전
+# 캐시 키에 포함되므로, 버전이 오르면 이전 검색 결과는 다음 조회부터 사용되지 않음
+CATALOG_VERSION_KEY = "search:catalog_version"
+
+# 검색 요청 캐시 조회 전용 CACHES 별칭 (search_redis)
+SEARCH_REDIS_ALIAS = "search"
+
+# Stale-while-revalidate 설정
+# soft TTL이 지나면 stale 값을 응답하면서 백그라운드 갱신, hard TTL(= soft TTL * (1 + 비율))에 실제 만료
+STALE_TTL_RATIO = 1.0
+# XFetch 조기 갱신 계수 (클수록 일찍 갱신, 랭킹 점수가 높을수록 가중)
+XFETCH_BETA = 1.0
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 캐시 키 안에서 카탈로그 버전 자리를 표시하는 값 (Lua 스크립트가 실제 버전으로 치환)
+_VERSION_PLACEHOLDER = "\x00version\x00"
+
+# 검색 요청당 Redis 작업을 한 번의 왕복으로 처리하는 Lua 스크립트
+# KEYS[1]: 카탈로그 버전 키, KEYS[2]: 누적 랭킹 키, KEYS[3..]: 시간 버킷 랭킹 키
+# ARGV[1], ARGV[2]: 버전 앞/뒤 캐시 키 조각, ARGV[3]: 랭킹 키워드,
+# ARGV[4]: 랭킹 증가 여부 ('1'이면 ZINCRBY, 아니면 ZSCORE만), ARGV[5..]: 버킷별 TTL
+# 반환: {카탈로그 버전, 캐시된 payload(없으면 nil), 누적 랭킹 점수}
+_LOOKUP_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local payload = redis.call('GET', ARGV[1] .. version .. ARGV[2])
+local score
+if ARGV[4] == '1' then
+    score = redis.call('ZINCRBY', KEYS[2], 1, ARGV[3])
+    for i = 3, #KEYS do
+        redis.call('ZINCRBY', KEYS[i], 1, ARGV[3])
+        redis.call('EXPIRE', KEYS[i], ARGV[i + 2])
+    end
+else
+    score = redis.call('ZSCORE', KEYS[2], ARGV[3]) or '0'
+end
+return {version, payload or false, score}
+"""
+
+def normalize_query(query: str) -> str:
+    """
+    검색어 정규화 (캐시 키, ES 쿼리 공통)
+
+    - Unicode NFKC: 조합형(NFD) 한글, 전각 문자 등을 하나의 표현으로 통일
+    - casefold: 대소문자 구분 제거 ("Toner" == "toner")
+    - 공백 정리: 앞뒤 공백 제거, 연속 공백은 한 칸으로
+
+    Args:
+        query: 원본 검색어
+
+    Returns:
+        정규화된 검색어
+    """
+    normalized = unicodedata.normalize('NFKC', query).casefold()
+    return _WHITESPACE_RE.sub(' ', normalized).strip()
+
+
+def build_search_cache_key(query: str, params: Optional[Dict[str, Any]] = None, version: Union[int, str] = 0) -> str:
+    """
+    검색 결과 캐시 키 생성
+
+    Args:
+        query: 검색어 (내부에서 normalize_query 적용)
+        params: 페이지네이션/필터 파라미터 (None, 빈 값은 제외하고 이름순 정렬)
+        version: 카탈로그 버전
+
+    Returns:
+        캐시 키 (예: "search:v3:toner:page=2&page_size=20")
+    """
+    parts = [f"search:v{version}:{normalize_query(query)}"]
+    if params:
+        signature = '&'.join(
+            f"{name}={params[name]}"
+            for name in sorted(params)
+            if params[name] not in (None, '')
+        )
+        if signature:
+            parts.append(signature)
+    return ':'.join(parts)
+
+
+def search_redis() -> Any:
+    """
+    검색 요청의 캐시 조회용 Redis 연결 (CACHES 'search', 운영 프로필은 캐시 단계 예산만큼의 소켓 타임아웃)
+
+    같은 Redis라도 백그라운드 작업(랭킹 반영, outbox 등)은 기본 연결을 사용합니다.
+    """
+    return get_redis_connection(SEARCH_REDIS_ALIAS)
+
+
+def get_catalog_version() -> int:
+    """
+    현재 카탈로그 버전 조회
+
+    Returns:
+        카탈로그 버전 (키가 없거나 Redis 장애 시 0)
+    """
+    try:
+        con = get_redis_connection("default")
+        version = con.get(CATALOG_VERSION_KEY)
+        return int(version) if version is not None else 0
+    except Exception as e:
+        logger.warning(f"카탈로그 버전 조회 실패, 기본값 사용: {str(e)}")
+        return 0
+
+
+def bump_catalog_version() -> Optional[int]:
+    """
+    카탈로그 버전 증가 (상품 데이터 변경 시 호출)
+
+    Returns:
+        증가된 버전 (Redis 장애 시 None)
+
+    Note:
+        Redis 장애가 상품 저장을 막으면 안 되므로 실패는 로그만 남김
+        (pub/sub 알림을 놓친 워커의 L1 캐시는 L1 TTL 안에 만료)
+    """
+    try:
+        con = get_redis_connection("default")
+        version = con.incr(CATALOG_VERSION_KEY)
+        # 워커별 L1 캐시는 pub/sub 알림으로 비움
+        publish_invalidation(con, version)
+        logger.debug(f"카탈로그 버전 증가: v{version}")
+        return version
+    except Exception as e:
+        logger.warning(f"카탈로그 버전 증가 실패: {str(e)}")
+        return None
+
+
+class SearchCacheLookup(NamedTuple):
+    """lookup_search_cache 결과"""
+    version: int                 # 조회 시점의 카탈로그 버전
+    cache_key: str               # 해당 버전의 캐시 키 (미스 시 저장용)
+    payload: Any                 # 캐시 엔트리 (make_cache_entry 형식, 미스면 None)
+    ranking_score: float         # 누적 랭킹 점수 (TTL 결정용)
+
+
+def lookup_search_cache(query: str, params: Dict[str, Any], keyword: str,
+                        increment: bool = True) -> SearchCacheLookup:
+    """
+    카탈로그 버전 조회 + 캐시 조회 + 랭킹 증가(누적, 시간 버킷)를 Redis 한 번의 왕복으로 처리
+
+    기존에는 버전 GET, 캐시 GET, ZSCORE(TTL 결정), ZINCRBY(랭킹)를 각각 호출했지만,
+    Lua 스크립트로 묶어 캐시 히트는 1회, 미스는 1회 + 저장 1회로 줄입니다.
+
+    Args:
+        query: 검색어 (캐시 키용, normalize_query 적용)
+        params: 페이지네이션/필터 파라미터
+        keyword: 랭킹에 집계할 검색어
+        increment: False면 랭킹은 조회(ZSCORE)만 함 (랭킹 버퍼, 근사 랭킹이 따로 반영할 때)
+
+    Returns:
+        SearchCacheLookup
+
+    Raises:
+        redis 예외: 호출하는 쪽에서 캐시 미스로 처리
+    """
+    con = search_redis()
+    script = con.register_script(_LOOKUP_SCRIPT)
+    keys, args = _lookup_script_params(query, params, keyword, increment)
+    return _lookup_result(query, params, script(keys=keys, args=args))
+
+
+async def alookup_search_cache(con: Any, query: str, params: Dict[str, Any], keyword: str,
+                               increment: bool = True) -> SearchCacheLookup:
+    """
+    lookup_search_cache의 비동기 버전 (redis.asyncio 연결, 같은 Lua 스크립트/키 규칙)
+
+    Args:
+        con: redis.asyncio 클라이언트
+
+    Raises:
+        redis 예외: 호출하는 쪽에서 캐시 미스로 처리
+    """
+    script = con.register_script(_LOOKUP_SCRIPT)
+    keys, args = _lookup_script_params(query, params, keyword, increment)
+    return _lookup_result(query, params, await script(keys=keys, args=args))
+
+
+def _lookup_script_params(query: str, params: Dict[str, Any], keyword: str,
+                          increment: bool) -> Tuple[List[Any], List[Any]]:
+    """조회 스크립트의 (KEYS, ARGV)"""
+    # django-redis 키 규칙(prefix, version)을 적용한 뒤 버전 자리를 기준으로 나눔
+    raw_key = str(cache.client.make_key(
+        build_search_cache_key(query, params, version=_VERSION_PLACEHOLDER)
+    ))
+    key_head, key_tail = raw_key.split(_VERSION_PLACEHOLDER, 1)
+
+    buckets = bucket_keys() if increment else []
+    keys = [CATALOG_VERSION_KEY, ranking_key(), *[key for key, _ in buckets]]
+    args = [key_head, key_tail, keyword, '1' if increment else '0', *[ttl for _, ttl in buckets]]
+    return keys, args
+
+
+def _lookup_result(query: str, params: Dict[str, Any], result: List[Any]) -> SearchCacheLookup:
+    """조회 스크립트 반환값 {버전, payload, 점수}를 SearchCacheLookup으로 변환"""
+    version, payload, score = result
+    version = int(version)
+    return SearchCacheLookup(
+        version=version,
+        cache_key=build_search_cache_key(query, params, version=version),
+        payload=cache.client.decode(payload) if payload is not None else None,
+        ranking_score=float(score),
+    )
+
+
+def make_cache_entry(data: Dict[str, Any], soft_ttl: int, delta: float, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    검색 결과를 캐시 엔트리로 감싸기 (계산 시간과 soft 만료 시각 포함)
+
+    Args:
+        data: 검색 응답 데이터
+        soft_ttl: 갱신이 필요해지는 시간 (초)
+        delta: 결과 계산에 걸린 시간 (초, XFetch 가중치)
+        now: 현재 시각 (테스트용)
+
+    Returns:
+        {'data', 'computed_at', 'delta', 'soft_expires_at'}
+    """
+    now = time.time() if now is None else now
+    return {
+        'data': data,
+        'computed_at': now,
+        'delta': delta,
+        'soft_expires_at': now + soft_ttl,
+    }
+
+
+def hard_ttl(soft_ttl: int) -> int:
+    """soft TTL 이후 stale 값을 보관하는 시간까지 포함한 실제 캐시 TTL"""
+    return int(soft_ttl * (1 + STALE_TTL_RATIO))
+
+
+def needs_refresh(entry: Dict[str, Any], ranking_score: float = 0,
+                  now: Optional[float] = None, rand: Optional[float] = None) -> bool:
+    """
+    캐시 엔트리 갱신 필요 여부 (stale 또는 XFetch 조기 갱신)
+
+    XFetch: now - delta * beta * ln(rand) >= soft_expires_at 이면 미리 갱신.
+    계산이 오래 걸리는(delta 큰) 결과와 인기 검색어(beta 큰)일수록 만료 전에
+    갱신될 확률이 높아져, 사용자가 미스 지연을 겪지 않습니다.
+
+    Args:
+        entry: make_cache_entry로 만든 캐시 엔트리
+        ranking_score: 검색어 랭킹 점수
+        now: 현재 시각 (테스트용)
+        rand: (0, 1] 난수 (테스트용)
+
+    Returns:
+        True면 응답은 캐시로 하고 백그라운드 갱신 필요
+    """
+    now = time.time() if now is None else now
+    soft_expires_at = entry['soft_expires_at']
+    if now >= soft_expires_at:
+        return True
+
+    rand = (1.0 - random.random()) if rand is None else rand
+    beta = XFETCH_BETA * (1 + math.log10(1 + max(ranking_score, 0)))
+    return now - entry['delta'] * beta * math.log(rand) >= soft_expires_at
+
+
+def read_cached_data(cache_key: str) -> Optional[Dict[str, Any]]:
+    """캐시 엔트리에서 응답 데이터만 조회 (없으면 None)"""
+    entry = cache.get(cache_key)
+    return entry['data'] if entry is not None else None
+
+
+def read_stale_data(query: str, params: Dict[str, Any], version: int, depth: int) -> Optional[Dict[str, Any]]:
+    """
+    이전 카탈로그 버전에 남아 있는 같은 검색의 응답 데이터 (ES 장애 시 대체 응답용)
+
+    버전이 오르면 이전 키는 더 읽히지 않지만 hard TTL까지 남아 있으므로,
+    최근 depth개 버전의 키를 MGET 한 번으로 조회해 가장 최신 것을 사용
+
+    Args:
+        query: 정규화된 검색어
+        params: 페이지네이션/필터 파라미터
+        version: 현재 카탈로그 버전
+        depth: 거슬러 올라갈 버전 수
+
+    Returns:
+        응답 데이터 (없으면 None)
+    """
+    versions = range(version - 1, max(version - depth, 0) - 1, -1)
+    keys = [build_search_cache_key(query, params, version=v) for v in versions]
+    if not keys:
+        return None
+    entries = cache.get_many(keys)
+    for key in keys:
+        if key in entries:
+            return entries[key]['data']
+    return None
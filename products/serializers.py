@@ -18,4 +18,8 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'brand', 'price', 'ingredients', 'image_url', 'created_at']
\ No newline at end of file
+        fields = [
+            'id', 'name', 'brand', 'price', 'ingredients', 'image_url', 'created_at',
+            # 성분 안전도 집계 (읽기 전용, 성분 변경 시 자동 갱신)
+            'max_ewg_score', 'avg_ewg_score', 'ingredient_count', 'has_hazardous_ingredient',
+        ]
\ No newline at end of file
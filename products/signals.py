@@ -0,0 +1,88 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .index_sync import enqueue_fanout, enqueue_products
+from .models import Brand, Ingredient, Product
+from .safety import recompute_safety
+
+# ES 색인과 캐시 무효화(카탈로그 버전)는 커밋 이후 index_sync에서 일괄 처리
+# (ProductDocument.ignore_signals = True: 저장마다 동기 색인하지 않음)
+# 카탈로그 버전은 검색 결과(매칭/필터/정렬/패싯)가 바뀔 수 있을 때만 올림 (생성/삭제, SEARCH_FIELDS 변경)
+# 그 외 수정은 updated_at이 바뀐 상품의 조각만 새로 만들어짐 (products.fragments)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def sync_product(sender, instance: Product, signal, **kwargs) -> None:
+    """상품 저장/삭제 시 재색인 대상 등록"""
+    bump_version = signal is post_delete or kwargs.get('created') or instance.search_fields_changed()
+    instance.mark_search_fields_saved()
+    enqueue_products([instance.pk], bump_version=bump_version)
+
+
+@receiver(post_save, sender=Brand)
+def sync_brand_products(sender, instance: Brand, created: bool, **kwargs) -> None:
+    """브랜드 변경 시 소속 상품 재색인 (문서에 브랜드 정보가 포함됨)"""
+    bump_version = instance.search_fields_changed()
+    instance.mark_search_fields_saved()
+    if not created:
+        # 상품 조각 캐시(products.fragments) 키가 바뀌도록 상품 updated_at도 갱신 (소속 상품이 많으므로 배치 작업으로)
+        enqueue_fanout('brand', instance.pk, bump_version=bump_version)
+
+
+@receiver(post_save, sender=Ingredient)
+def sync_ingredient_products(sender, instance: Ingredient, created: bool, **kwargs) -> None:
+    """성분 변경 시 해당 성분을 가진 상품 재색인 (EWG 등급이 바뀌었으면 안전도 집계도 갱신)"""
+    score_changed = instance.ewg_score_changed()
+    instance._loaded_ewg_score = instance.ewg_score
+    bump_version = instance.search_fields_changed()
+    instance.mark_search_fields_saved()
+    if created:
+        return
+    # 상품 조각 캐시(products.fragments) 키가 바뀌도록 상품 updated_at도 갱신 (소속 상품이 많으므로 배치 작업으로)
+    enqueue_fanout('ingredient', instance.pk, recompute=score_changed, bump_version=bump_version)
+
+
+@receiver(pre_delete, sender=Ingredient)
+def collect_ingredient_products(sender, instance: Ingredient, **kwargs) -> None:
+    """성분 삭제 전 해당 성분을 가진 상품 보관 (연결은 삭제 과정에서 지워짐)"""
+    through = Product.ingredients.through
+    instance._affected_product_ids = list(
+        through.objects.filter(ingredient_id=instance.pk).values_list('product_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def sync_deleted_ingredient_products(sender, instance: Ingredient, **kwargs) -> None:
+    """성분 삭제 후 안전도 집계 갱신 + 재색인"""
+    product_ids = getattr(instance, '_affected_product_ids', [])
+    if product_ids:
+        # 삭제된 성분은 updated_at으로 찾을 수 없으므로 상품 쪽 updated_at 갱신 (증분 색인용)
+        recompute_safety(product_ids, touch=True)
+        enqueue_products(product_ids)
+
+
+@receiver(m2m_changed, sender=Product.ingredients.through)
+def sync_ingredients_change(sender, instance, action: str, reverse: bool, pk_set, **kwargs) -> None:
+    """상품-성분 연결 변경 시 안전도 집계 갱신 + 재색인 (ingredient.products 쪽 변경 포함)"""
+    if not reverse:
+        product_ids = [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else []
+    elif action in ('post_add', 'post_remove'):
+        product_ids = list(pk_set or [])
+    elif action == 'pre_clear':
+        # 연결이 지워진 뒤에는 대상 상품을 알 수 없으므로 post_clear까지 보관
+        instance._cleared_product_ids = list(instance.products.values_list('id', flat=True))
+        product_ids = []
+    elif action == 'post_clear':
+        product_ids = getattr(instance, '_cleared_product_ids', [])
+    else:
+        product_ids = []
+
+    if product_ids:
+        # 연결 테이블 변경은 상품 updated_at을 바꾸지 않으므로 증분 색인 워터마크에 걸리도록 함께 갱신
+        computed = recompute_safety(product_ids, touch=True)
+        if not reverse:
+            # product.ingredients.add() 후 같은 인스턴스에서 바로 읽어도 최신 집계가 보이도록
+            for name, value in computed[instance.pk].items():
+                setattr(instance, name, value)
+        enqueue_products(product_ids)
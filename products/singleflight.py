@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+# 워커 간 락 설정
+LOCK_TTL_MS = 5000         # 락 자동 만료 (계산 중 워커가 죽어도 5초 뒤 풀림)
+WAIT_TIMEOUT = 3.0         # 다른 워커의 결과를 기다리는 최대 시간 (초)
+POLL_INTERVAL = 0.05       # 캐시 확인 간격 (초)
+
+# 내 토큰일 때만 락 삭제 (만료 후 다른 워커가 잡은 락을 지우지 않도록)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    프로세스 내 요청 병합 (single-flight)
+
+    같은 키로 동시에 들어온 요청 중 하나(leader)만 fn을 실행하고,
+    나머지는 leader의 Future 결과(또는 예외)를 그대로 받습니다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        키당 한 번만 fn 실행
+
+        Args:
+            key: 병합 기준 키 (정규화된 검색 캐시 키)
+            fn: 결과 계산 함수
+
+        Returns:
+            fn 결과 (leader가 계산한 값을 공유)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            logger.debug(f"single-flight 대기 (프로세스 내): {key}")
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """
+    이벤트 루프 내 요청 병합 (비동기 검색용 single-flight)
+
+    SingleFlight와 같지만 leader의 결과를 asyncio.Future로 공유하므로
+    기다리는 요청이 스레드를 점유하지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        키당 한 번만 fn 실행
+
+        Args:
+            key: 병합 기준 키 (정규화된 검색 캐시 키)
+            fn: 결과 계산 코루틴 함수
+
+        Returns:
+            fn 결과 (leader가 계산한 값을 공유)
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            logger.debug(f"single-flight 대기 (이벤트 루프 내): {key}")
+            # 대기 중인 요청이 취소돼도 leader의 계산은 계속
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        # 기다리는 요청이 없을 때 예외 미확인 경고가 남지 않도록 결과를 한 번 읽어둠
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
+
+
+def redis_single_flight(key: str, compute: Callable[[], Any], read_cached: Callable[[], Any]) -> Any:
+    """
+    워커(프로세스) 간 요청 병합
+
+    SET NX PX로 락을 잡은 워커만 compute를 실행해 캐시에 저장하고,
+    락을 못 잡은 워커는 캐시에 값이 생길 때까지 짧게 기다립니다.
+
+    Args:
+        key: 검색 캐시 키 (락 키는 "lock:{key}")
+        compute: 결과 계산 + 캐시 저장 함수
+        read_cached: 캐시 조회 함수 (없으면 None)
+
+    Returns:
+        계산 결과 또는 다른 워커가 저장한 캐시 값
+
+    Note:
+        Redis 장애, 대기 시간 초과, 락 보유 워커의 실패 시에는 직접 계산 (검색이 멈추면 안 됨)
+    """
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+
+    try:
+        con = get_redis_connection("default")
+        acquired = con.set(lock_key, token, nx=True, px=LOCK_TTL_MS)
+    except Exception as e:
+        logger.warning(f"single-flight 락 획득 실패, 직접 계산: {str(e)}")
+        return compute()
+
+    if acquired:
+        try:
+            return compute()
+        finally:
+            try:
+                con.register_script(_RELEASE_SCRIPT)(keys=[lock_key], args=[token])
+            except Exception as e:
+                logger.warning(f"single-flight 락 해제 실패 (TTL로 만료): {str(e)}")
+
+    logger.debug(f"single-flight 대기 (워커 간): {key}")
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        try:
+            cached = read_cached()
+            if cached is not None:
+                return cached
+            if not con.exists(lock_key):
+                # 락이 풀렸는데 캐시가 없음 -> leader가 실패했거나 캐싱을 못 함
+                break
+        except Exception as e:
+            logger.warning(f"single-flight 대기 중 캐시 조회 실패: {str(e)}")
+            break
+
+    logger.info(f"single-flight 대기 종료, 직접 계산: {key}")
+    return compute()
+
+
+# 워커(프로세스)당 하나
+search_flight = SingleFlight()
+async_search_flight = AsyncSingleFlight()
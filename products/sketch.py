@@ -0,0 +1,221 @@
+import hashlib
+import heapq
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# Redis 근사 랭킹 키
+SKETCH_KEY = "search_ranking:cms"        # Count-Min Sketch 카운터 (Hash, 필드 = "행:열")
+SKETCH_TOP_KEY = "search_ranking:topk"   # 상위 K개 후보 (Sorted Set, 크기 고정)
+
+# 검색어 하나를 Sketch에 반영하고 Top-K 후보를 갱신하는 Lua 스크립트
+# KEYS[1]: Sketch Hash, KEYS[2]: Top-K Sorted Set
+# ARGV[1]: 검색어, ARGV[2]: 증가량, ARGV[3]: K, ARGV[4..]: 행별 카운터 필드
+# 반환: 증가 후 추정 빈도
+_SKETCH_ADD_SCRIPT = """
+local estimate = nil
+for i = 4, #ARGV do
+    local value = redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[2])
+    if estimate == nil or value < estimate then
+        estimate = value
+    end
+end
+redis.call('ZADD', KEYS[2], estimate, ARGV[1])
+local size = redis.call('ZCARD', KEYS[2])
+local k = tonumber(ARGV[3])
+if size > k then
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, size - k - 1)
+end
+return estimate
+"""
+
+# 크기가 K로 고정된 Sorted Set에 검색어를 더하는 Lua 스크립트 (Space-Saving)
+# 꽉 찬 상태에서 새 검색어가 들어오면 최솟값 항목을 밀어내고 그 점수 + 증가량으로 시작
+# (새 검색어가 항상 1점으로 들어와 바로 잘리면 자주 검색돼도 점수가 쌓이지 않음)
+# KEYS[1]: Sorted Set, ARGV[1]: 검색어, ARGV[2]: 증가량, ARGV[3]: K
+_SPACE_SAVING_ADD_SCRIPT = """
+local amount = tonumber(ARGV[2])
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    redis.call('ZINCRBY', KEYS[1], amount, ARGV[1])
+    return
+end
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    local evicted = redis.call('ZPOPMIN', KEYS[1])
+    amount = amount + tonumber(evicted[2])
+end
+redis.call('ZADD', KEYS[1], amount, ARGV[1])
+"""
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch (고정 메모리 빈도 추정)
+
+    width = ceil(e / epsilon), depth = ceil(ln(1 / delta)) 일 때
+    추정값은 항상 실제 빈도 이상이고, 확률 1 - delta로 실제 빈도 + epsilon * N 이하입니다.
+    (N = 전체 증가량 합계)
+
+    행별 해시는 프로세스와 무관하게 같은 값이 나오도록 blake2b 기반 이중 해싱을 사용하므로
+    여러 워커의 Sketch를 merge(원소별 합)하거나 Redis에서 공유할 수 있습니다.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [[0] * width for _ in range(depth)]
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float) -> 'CountMinSketch':
+        """오차율(epsilon), 실패 확률(delta)로 크기 결정"""
+        return cls(width=math.ceil(math.e / epsilon), depth=math.ceil(math.log(1 / delta)))
+
+    def indexes(self, item: str) -> List[int]:
+        """행별 열 번호 (h1 + i * h2 이중 해싱)"""
+        return sketch_indexes(item, self.width, self.depth)
+
+    def add(self, item: str, count: int = 1) -> int:
+        """
+        빈도 증가
+
+        Returns:
+            증가 후 추정 빈도
+        """
+        self.total += count
+        estimate = None
+        for row, col in enumerate(self.indexes(item)):
+            self._rows[row][col] += count
+            value = self._rows[row][col]
+            estimate = value if estimate is None else min(estimate, value)
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        """추정 빈도 (실제 빈도 이상)"""
+        return min(self._rows[row][col] for row, col in enumerate(self.indexes(item)))
+
+    def merge(self, other: 'CountMinSketch') -> None:
+        """같은 크기의 다른 Sketch를 합침 (워커별 Sketch 병합)"""
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError('Sketch 크기가 다르면 병합할 수 없습니다.')
+        for row in range(self.depth):
+            mine, theirs = self._rows[row], other._rows[row]
+            for col in range(self.width):
+                mine[col] += theirs[col]
+        self.total += other.total
+
+    @property
+    def epsilon(self) -> float:
+        """상대 오차 상한 (N 대비)"""
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        """오차 상한을 넘을 확률"""
+        return math.exp(-self.depth)
+
+    def error_bound(self) -> float:
+        """현재까지의 증가량 기준 과대 추정 상한 (epsilon * N)"""
+        return self.epsilon * self.total
+
+    @property
+    def counters(self) -> int:
+        """카운터 개수 (메모리 사용량은 이 값에 비례)"""
+        return self.width * self.depth
+
+
+class HeavyHitters:
+    """
+    Count-Min Sketch + 크기가 K로 고정된 Top-K 후보
+
+    Top-K 후보는 추정 빈도가 가장 낮은 항목부터 밀려나므로,
+    메모리는 Sketch 카운터 + K개 항목으로 고정됩니다.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, k: int = 100) -> None:
+        self.sketch = CountMinSketch(width, depth)
+        self.k = k
+        self._top: Dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1) -> None:
+        """빈도 증가 + Top-K 후보 갱신"""
+        estimate = self.sketch.add(item, count)
+        self._top[item] = estimate
+        if len(self._top) > self.k:
+            del self._top[min(self._top, key=self._top.get)]
+
+    def merge(self, other: 'HeavyHitters') -> None:
+        """다른 워커의 결과를 합치고 후보 빈도를 다시 추정"""
+        self.sketch.merge(other.sketch)
+        candidates = set(self._top) | set(other._top)
+        estimates = {item: self.sketch.estimate(item) for item in candidates}
+        self._top = dict(heapq.nlargest(self.k, estimates.items(), key=lambda pair: pair[1]))
+
+    def top(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """추정 빈도 높은 순 상위 항목"""
+        return heapq.nlargest(limit, self._top.items(), key=lambda pair: pair[1])
+
+
+def sketch_indexes(item: str, width: int, depth: int) -> List[int]:
+    """
+    행별 열 번호 계산 (프로세스 간 동일, Redis Sketch와 공유)
+
+    Args:
+        item: 검색어
+        width: Sketch 폭
+        depth: Sketch 깊이(행 수)
+    """
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + row * h2) % width for row in range(depth)]
+
+
+def redis_sketch_add(pipe: Any, keyword: str, amount: int, width: int, depth: int, k: int,
+                     sketch_key: str = SKETCH_KEY, top_key: str = SKETCH_TOP_KEY) -> None:
+    """
+    Redis Sketch에 검색어 반영 (파이프라인에 명령만 추가)
+
+    모든 워커가 같은 Hash/Sorted Set에 더하므로 워커 간 병합이 따로 필요 없습니다.
+
+    Args:
+        pipe: Redis 파이프라인
+        keyword: 검색어
+        amount: 증가량
+        width: Sketch 폭
+        depth: Sketch 깊이
+        k: Top-K 후보 수
+        sketch_key: Sketch Hash 키 (벤치마크용)
+        top_key: Top-K Sorted Set 키 (벤치마크용)
+    """
+    fields = [f"{row}:{col}" for row, col in enumerate(sketch_indexes(keyword, width, depth))]
+    script = pipe.register_script(_SKETCH_ADD_SCRIPT)
+    script(keys=[sketch_key, top_key], args=[keyword, amount, k, *fields])
+
+
+def redis_space_saving_add(pipe: Any, key: str, keyword: str, amount: int, k: int) -> None:
+    """
+    크기 K Sorted Set에 Space-Saving 방식으로 검색어 반영 (파이프라인에 명령만 추가)
+
+    점수는 실제 빈도 이상이고, 실제 빈도가 (전체 증가량 / K)보다 큰 검색어는 항상 남습니다.
+
+    Args:
+        pipe: Redis 파이프라인
+        key: Sorted Set 키 (시간 버킷 등)
+        keyword: 검색어
+        amount: 증가량
+        k: 보관할 항목 수
+    """
+    script = pipe.register_script(_SPACE_SAVING_ADD_SCRIPT)
+    script(keys=[key], args=[keyword, amount, k])
+
+
+def describe_error_bound(width: int, depth: int, total: Optional[int] = None) -> Dict[str, Any]:
+    """설정값 기준 오차 보장 요약 (문서/벤치마크 출력용)"""
+    epsilon = math.e / width
+    bound = {
+        'epsilon': epsilon,
+        'delta': math.exp(-depth),
+        'counters': width * depth,
+    }
+    if total is not None:
+        bound['max_overestimate'] = epsilon * total
+    return bound
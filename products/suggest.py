@@ -0,0 +1,117 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from .documents import ProductDocument
+from .local_cache import get_suggest_l1
+from .ranking import top_keywords
+from .search_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# completion suggester 이름 (ES 응답의 suggest.<이름>)
+SUGGESTER_NAME = 'names'
+
+# 자동완성 L1 캐시에서 인기 검색어 후보 목록을 보관하는 키
+RANKING_POOL_KEY = 'ranking-pool'
+
+
+def ranking_pool() -> List[Tuple[str, str, float]]:
+    """
+    자동완성 후보로 쓸 인기 검색어 (누적 랭킹 상위 RANKING_POOL개)
+
+    워커 메모리에 RANKING_TTL초 보관하므로 키 입력마다 Redis를 조회하지 않습니다.
+
+    Returns:
+        [(정규화된 검색어, 원본 검색어, 점수)] 점수 높은 순 (정규화 기준 중복 제거)
+    """
+    config = settings.SEARCH_SUGGEST
+    local = get_suggest_l1() if settings.SEARCH_LOCAL_CACHE['ENABLED'] else None
+    pool = local.get(RANKING_POOL_KEY) if local is not None else None
+    if pool is not None:
+        return pool
+
+    try:
+        ranks = top_keywords(get_redis_connection("default"), limit=config['RANKING_POOL'])
+    except Exception as e:
+        # 랭킹은 부가 정보이므로 실패하면 카탈로그 후보만 사용
+        logger.warning(f"자동완성 인기 검색어 조회 실패: {str(e)}")
+        ranks = []
+
+    pool, seen = [], set()
+    for keyword, score in ranks:
+        normalized = normalize_query(keyword)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            pool.append((normalized, keyword, score))
+    if local is not None:
+        local.set(RANKING_POOL_KEY, pool, ttl=config['RANKING_TTL'])
+    return pool
+
+
+def catalog_suggestions(prefix: str, size: int) -> Optional[List[str]]:
+    """
+    ES completion suggester로 상품명/브랜드명/성분명 후보 조회 (FST 메모리 조회라 fuzzy 검색보다 훨씬 저렴)
+
+    Returns:
+        후보 문자열 목록 (ES 장애 시 None)
+    """
+    search = ProductDocument.search().suggest(
+        SUGGESTER_NAME, prefix, completion={'field': 'suggest', 'size': size, 'skip_duplicates': True}
+    ).source(False).extra(size=0)
+    try:
+        response = search.execute()
+    except Exception as e:
+        logger.warning(f"자동완성 ES 조회 실패: {e.__class__.__name__}: {str(e)}")
+        return None
+    return [option.text for option in response.suggest[SUGGESTER_NAME][0].options]
+
+
+def get_suggestions(prefix: str) -> List[Dict[str, Any]]:
+    """
+    자동완성 후보 (인기 검색어 먼저, 나머지는 카탈로그 이름)
+
+    Args:
+        prefix: 정규화된 입력 접두어
+
+    Returns:
+        [{'text': 후보, 'source': 'ranking' | 'catalog'}] 최대 SIZE개
+
+    Note:
+        접두어 CACHE_PREFIX_LENGTH자 이하는 후보가 가장 많이 겹치고 요청도 가장 많으므로 결과 전체를 L1에 보관
+    """
+    config = settings.SEARCH_SUGGEST
+    size = config['SIZE']
+    cacheable = settings.SEARCH_LOCAL_CACHE['ENABLED'] and len(prefix) <= config['CACHE_PREFIX_LENGTH']
+    cache_key = f"prefix:{prefix}"
+    if cacheable:
+        cached = get_suggest_l1().get(cache_key)
+        if cached is not None:
+            return cached
+
+    suggestions = [
+        {'text': keyword, 'source': 'ranking'}
+        for normalized, keyword, _ in ranking_pool()
+        if normalized.startswith(prefix)
+    ][:size]
+
+    complete = True
+    if len(suggestions) < size:
+        seen = {normalize_query(item['text']) for item in suggestions}
+        # 인기 검색어와 겹치는 후보가 빠져도 SIZE개를 채울 수 있도록 여유 있게 요청
+        catalog = catalog_suggestions(prefix, size + len(suggestions))
+        complete = catalog is not None
+        for text in catalog or []:
+            normalized = normalize_query(text)
+            if normalized not in seen:
+                seen.add(normalized)
+                suggestions.append({'text': text, 'source': 'catalog'})
+            if len(suggestions) >= size:
+                break
+
+    if cacheable and complete:
+        # ES 장애로 인기 검색어만 채운 결과는 보관하지 않음
+        get_suggest_l1().set(cache_key, suggestions)
+    return suggestions
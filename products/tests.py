@@ -1,4 +1,5 @@
 from django.test import TestCase, TransactionTestCase
+from django.conf import settings
 from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -7,6 +8,31 @@ from unittest.mock import patch, MagicMock
 
 from .models import Brand, Ingredient, Product
 from .documents import ProductDocument
+from .search_cache import (
+    build_search_cache_key, get_catalog_version, lookup_search_cache, normalize_query
+)
+
+
+def mock_es_response(mock_search, hits, total=None):
+    """
+    ProductDocument.search() 체인 모킹
+
+    query/sort/extra/슬라이싱을 어떤 순서로 호출해도 같은 검색 객체를 돌려주고,
+    execute()는 hits를 담은 응답(hits.total.value 포함)을 반환합니다.
+    """
+    search = MagicMock()
+    for method in ('query', 'filter', 'sort', 'extra', 'params', 'source'):
+        getattr(search, method).return_value = search
+    search.__getitem__.return_value = search
+
+    response = MagicMock()
+    response.__iter__.side_effect = lambda: iter(hits)
+    response.__len__.side_effect = lambda: len(hits)
+    response.hits.total.value = len(hits) if total is None else total
+    search.execute.return_value = response
+
+    mock_search.return_value = search
+    return search
 
 
 class ProductModelTests(TestCase):
@@ -134,7 +160,7 @@ class ProductSearchAPITests(TransactionTestCase):
         # Elasticsearch 결과 모킹
         mock_hit = MagicMock()
         mock_hit.meta.id = self.product.id
-        mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+        mock_es_response(mock_search, [mock_hit])
 
         url = reverse('product-search')
         response = self.client.get(url, {'q': 'toner'})
@@ -151,7 +177,7 @@ class ProductSearchAPITests(TransactionTestCase):
         # 첫 번째 요청 - 캐시 미스
         mock_hit = MagicMock()
         mock_hit.meta.id = self.product.id
-        mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+        mock_es_response(mock_search, [mock_hit])
 
         url = reverse('product-search')
         query = 'green tea'
@@ -160,7 +186,9 @@ class ProductSearchAPITests(TransactionTestCase):
         self.assertEqual(response1.status_code, 200)
 
         # 캐시에 저장되었는지 확인
-        cache_key = f"search:{query}"
+        cache_key = build_search_cache_key(
+            query, {'page': 1, 'page_size': 20}, version=get_catalog_version()
+        )
         cached_data = cache.get(cache_key)
         self.assertIsNotNone(cached_data)
 
@@ -178,7 +206,7 @@ class ProductSearchAPITests(TransactionTestCase):
         """검색 랭킹 증가 테스트"""
         mock_hit = MagicMock()
         mock_hit.meta.id = self.product.id
-        mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+        mock_es_response(mock_search, [mock_hit])
 
         url = reverse('product-search')
         query = 'test keyword'
@@ -206,7 +234,7 @@ class ProductSearchAPITests(TransactionTestCase):
         """여러 검색어 랭킹 테스트"""
         mock_hit = MagicMock()
         mock_hit.meta.id = self.product.id
-        mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+        mock_es_response(mock_search, [mock_hit])
 
         url = reverse('product-search')
 
@@ -335,14 +363,16 @@ class ProductSearchErrorHandlingTests(TransactionTestCase):
         with patch('products.views.ProductDocument.search') as mock_search:
             mock_hit = MagicMock()
             mock_hit.meta.id = product.id
-            mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+            mock_es_response(mock_search, [mock_hit])
 
             # 앞뒤로 공백이 있는 검색어
             response = self.client.get(url, {'q': '  test query  '})
 
             self.assertEqual(response.status_code, 200)
             # 공백이 제거되어 캐시 키 생성
-            cache_key = "search:test query"
+            cache_key = build_search_cache_key(
+                'test query', {'page': 1, 'page_size': 20}, version=get_catalog_version()
+            )
             self.assertIsNotNone(cache.get(cache_key))
 
     @patch('products.views.ProductDocument.search')
@@ -381,7 +411,7 @@ class ProductSearchErrorHandlingTests(TransactionTestCase):
     def test_search_no_results(self, mock_search):
         """검색 결과가 없는 경우 테스트"""
         # 빈 결과 반환
-        mock_search.return_value.query.return_value.execute.return_value = []
+        mock_es_response(mock_search, [])
 
         url = reverse('product-search')
         response = self.client.get(url, {'q': 'nonexistent'})
@@ -398,7 +428,7 @@ class ProductSearchErrorHandlingTests(TransactionTestCase):
         # 검색은 성공하지만 Redis는 연결 실패
         mock_hit = MagicMock()
         mock_hit.meta.id = 1
-        mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+        mock_es_response(mock_search, [mock_hit])
 
         # Redis 연결 오류 시뮬레이션
         from redis.exceptions import ConnectionError as RedisConnectionError
@@ -559,7 +589,7 @@ class ProductSearchPerformanceTests(TestCase):
         # 검색 결과 반환
         mock_hit = MagicMock()
         mock_hit.meta.id = self.products[0].id
-        mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+        mock_es_response(mock_search, [mock_hit])
 
         url = reverse('product-search')
         response = self.client.get(url, {'q': 'performance'})
@@ -578,7 +608,7 @@ class ProductSearchPerformanceTests(TestCase):
         # 검색 결과 반환
         mock_hit = MagicMock()
         mock_hit.meta.id = self.products[0].id
-        mock_search.return_value.query.return_value.execute.return_value = [mock_hit]
+        mock_es_response(mock_search, [mock_hit])
 
         url = reverse('product-search')
 
@@ -626,3 +656,2413 @@ class ProductSearchOrderPreservationTests(TestCase):
 
         result_ids = [p.id for p in products]
         self.assertEqual(result_ids, product_ids)
+
+
+class ProductDocumentSourceTests(TestCase):
+    """ES _source 기반 검색 응답 테스트 (SEARCH_RESULT_SOURCE = 'document')"""
+
+    def setUp(self):
+        """테스트 데이터 생성"""
+        self.client = APIClient()
+        cache.clear()
+        self.brand = Brand.objects.create(name="Doc Brand", website_url="https://doc.com")
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"Doc Product {i}",
+                brand=self.brand,
+                price=1000 * (i + 1),
+                image_url=None if i == 0 else f"https://example.com/{i}.jpg"
+            )
+            self.products.append(product)
+        ingredients = [
+            Ingredient.objects.create(name=f"Doc Ingredient {i}", ewg_score=i + 1)
+            for i in range(3)
+        ]
+        self.products[1].ingredients.add(*ingredients)
+        self.products[2].ingredients.add(ingredients[0])
+
+    def _to_hit(self, product):
+        """ES 색인 -> 조회 과정을 흉내내어 검색 결과(hit) 생성"""
+        from elasticsearch.serializer import JSONSerializer
+        serializer = JSONSerializer()
+        source = serializer.loads(serializer.dumps(ProductDocument().prepare(product)))
+        return ProductDocument.from_es({'_index': 'products', '_id': str(product.id), '_source': source})
+
+    def test_document_matches_serializer_output(self):
+        """_source 기반 직렬화 결과가 MySQL 경로와 바이트 단위로 동일한지 확인"""
+        from rest_framework.renderers import JSONRenderer
+        from .serializers import ProductSerializer
+        from .views import ProductViewSet
+
+        ordered = [self.products[2], self.products[0], self.products[1]]
+        from_db = ProductSerializer(ordered, many=True).data
+        from_docs = ProductSerializer(
+            ProductViewSet()._documents_from_hits([self._to_hit(p) for p in ordered]),
+            many=True
+        ).data
+
+        self.assertEqual(JSONRenderer().render(from_docs), JSONRenderer().render(from_db))
+
+    @patch('products.views.ProductDocument.search')
+    def test_search_responses_identical_between_sources(self, mock_search):
+        """두 응답 모드의 검색 API 응답이 동일하고, document 모드는 DB를 조회하지 않는지 확인"""
+        hits = [self._to_hit(p) for p in reversed(self.products)]
+        mock_hit_ids = [MagicMock(meta=MagicMock(id=p.id)) for p in reversed(self.products)]
+        url = reverse('product-search')
+
+        mock_es_response(mock_search, mock_hit_ids)
+        with self.settings(SEARCH_RESULT_SOURCE='database'):
+            db_response = self.client.get(url, {'q': 'doc'})
+
+        cache.clear()
+        mock_es_response(mock_search, hits)
+        with self.settings(SEARCH_RESULT_SOURCE='document'):
+            with self.assertNumQueries(0):
+                doc_response = self.client.get(url, {'q': 'doc'})
+
+        self.assertEqual(doc_response.status_code, 200)
+        self.assertEqual(doc_response.content, db_response.content)
+
+
+class ProductSearchPaginationTests(TestCase):
+    """ES from/size, search_after 기반 검색 페이지네이션 테스트"""
+
+    def setUp(self):
+        """테스트 데이터 생성"""
+        self.client = APIClient()
+        cache.clear()
+        self.brand = Brand.objects.create(name="Page Brand")
+        self.products = [
+            Product.objects.create(name=f"Page Product {i}", brand=self.brand, price=1000 * i)
+            for i in range(3)
+        ]
+        self.url = reverse('product-search')
+
+    def _hits(self):
+        hits = []
+        for i, product in enumerate(self.products):
+            hit = MagicMock()
+            hit.meta.id = product.id
+            hit.meta.sort = [1.5 - i * 0.1, product.id]
+            hits.append(hit)
+        return hits
+
+    @patch('products.views.ProductDocument.search')
+    def test_page_translated_to_es_slice(self, mock_search):
+        """page/page_size가 ES from/size로 변환되고 count는 hits.total을 사용"""
+        search = mock_es_response(mock_search, self._hits(), total=45)
+
+        response = self.client.get(self.url, {'q': 'page', 'page': 2, 'page_size': 3})
+
+        self.assertEqual(response.status_code, 200)
+        search.__getitem__.assert_called_with(slice(3, 6))
+        data = response.json()
+        self.assertEqual(data['count'], 45)
+        self.assertEqual([p['id'] for p in data['results']], [p.id for p in self.products])
+        self.assertIn('page=3', data['next'])
+        self.assertNotIn('page=', data['previous'])
+
+    @patch('products.views.ProductDocument.search')
+    def test_last_page_has_no_next(self, mock_search):
+        """마지막 페이지에서는 next 링크가 없음"""
+        mock_es_response(mock_search, self._hits(), total=6)
+
+        data = self.client.get(self.url, {'q': 'page', 'page': 2, 'page_size': 3}).json()
+
+        self.assertIsNone(data['next'])
+        self.assertEqual(data['count'], 6)
+
+    def test_invalid_page_params(self):
+        """잘못된 페이지 번호, max_result_window 초과 요청은 400"""
+        for params in ({'page': 'abc'}, {'page': 0}, {'page': 600, 'page_size': 20}):
+            response = self.client.get(self.url, {'q': 'page', **params})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+
+    @patch('products.views.ProductDocument.search')
+    def test_cursor_mode_uses_search_after(self, mock_search):
+        """cursor 모드는 마지막 hit의 sort 값으로 다음 페이지를 search_after 조회"""
+        from urllib.parse import parse_qs, urlparse
+        hits = self._hits()
+        search = mock_es_response(mock_search, hits)
+
+        first = self.client.get(self.url, {'q': 'page', 'cursor': '', 'page_size': 3}).json()
+
+        self.assertNotIn('count', first)
+        self.assertEqual(len(first['results']), 3)
+        search.sort.assert_called_with('_score', {'id': 'desc'})
+        cursor = parse_qs(urlparse(first['next']).query)['cursor'][0]
+
+        cache.clear()
+        self.client.get(self.url, {'q': 'page', 'cursor': cursor, 'page_size': 3})
+        search.extra.assert_called_with(search_after=list(hits[-1].meta.sort))
+
+    def test_cursor_mode_invalid_token(self):
+        """디코딩할 수 없는 cursor는 400"""
+        response = self.client.get(self.url, {'q': 'page', 'cursor': '!!!'})
+        self.assertEqual(response.status_code, 400)
+
+    @patch('products.views.ProductDocument.search')
+    def test_cursor_mode_rejects_mismatched_sort_values(self, mock_search):
+        """정렬 값 개수가 맞지 않거나 스칼라가 아닌 값이 든 cursor는 ES 조회 없이 400"""
+        from .analysis import FUZZY_CURSOR_MARK
+        from .pagination import SearchPagination
+        invalid = [
+            ({}, [1.5]),
+            ({}, [1.5, 10, 3]),
+            ({}, [1.5, {'id': 10}]),
+            ({}, [1.5, [10]]),
+            ({}, [1.5, None]),
+            ({'sort': 'safety'}, [1.5, 10]),
+        ]
+        for params, values in invalid:
+            with self.subTest(values=values, **params):
+                cursor = SearchPagination.encode_cursor(values)
+                response = self.client.get(self.url, {'q': 'page', 'cursor': cursor, **params})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+        mock_search.assert_not_called()
+
+        # 정렬 필드 수 + _score + id (오타 허용 표시는 별도)
+        mock_es_response(mock_search, [])
+        valid = [
+            ({}, [1.5, 10]),
+            ({}, [1.5, 10, FUZZY_CURSOR_MARK]),
+            ({'sort': 'safety'}, [3, 2.5, 1.5, 10]),
+        ]
+        for params, values in valid:
+            with self.subTest(values=values, **params):
+                cursor = SearchPagination.encode_cursor(values)
+                response = self.client.get(self.url, {'q': 'page', 'cursor': cursor, **params})
+                self.assertEqual(response.status_code, 200)
+
+
+class SearchCacheKeyTests(TestCase):
+    """검색 캐시 키 정규화 및 카탈로그 버전 무효화 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.client = APIClient()
+        cache.clear()
+        self.brand = Brand.objects.create(name="Key Brand")
+        self.product = Product.objects.create(name="Key Toner", brand=self.brand)
+
+    def test_normalize_query(self):
+        """대소문자, 공백, NFC/NFD 한글 표현이 같은 검색어로 정규화"""
+        import unicodedata
+        self.assertEqual(normalize_query("  Toner  "), "toner")
+        self.assertEqual(normalize_query("green   TEA\ttoner"), "green tea toner")
+        self.assertEqual(
+            normalize_query(unicodedata.normalize('NFD', "수분크림")),
+            normalize_query(unicodedata.normalize('NFC', "수분크림"))
+        )
+
+    def test_cache_key_includes_params_and_version(self):
+        """페이지 파라미터와 카탈로그 버전이 다르면 다른 키"""
+        base = build_search_cache_key("toner", {'page': 1, 'page_size': 20}, version=1)
+        self.assertEqual(base, build_search_cache_key("TONER ", {'page_size': 20, 'page': 1}, version=1))
+        self.assertNotEqual(base, build_search_cache_key("toner", {'page': 2, 'page_size': 20}, version=1))
+        self.assertNotEqual(base, build_search_cache_key("toner", {'page': 1, 'page_size': 20}, version=2))
+
+    @patch('products.views.ProductDocument.search')
+    def test_pages_cached_separately(self, mock_search):
+        """페이지마다 다른 캐시 엔트리를 사용"""
+        hit = MagicMock()
+        hit.meta.id = self.product.id
+        mock_es_response(mock_search, [hit], total=2)
+        url = reverse('product-search')
+
+        self.client.get(url, {'q': 'toner', 'page': 1, 'page_size': 1})
+        self.client.get(url, {'q': 'Toner ', 'page': 1, 'page_size': 1})
+        self.assertEqual(mock_search.call_count, 1)
+
+        self.client.get(url, {'q': 'toner', 'page': 2, 'page_size': 1})
+        self.assertEqual(mock_search.call_count, 2)
+
+    def test_product_write_bumps_catalog_version(self):
+        """상품 저장/성분 변경이 커밋되면 카탈로그 버전 증가"""
+        before = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "Renamed Toner"
+            self.product.save()
+        self.assertEqual(get_catalog_version(), before + 1)
+
+        ingredient = Ingredient.objects.create(name="Key Ingredient")
+        before = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.ingredients.add(ingredient)
+        self.assertEqual(get_catalog_version(), before + 1)
+
+
+class SearchCacheLookupTests(TestCase):
+    """캐시 조회 + 랭킹 증가 단일 왕복(Lua 스크립트) 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.client = APIClient()
+        cache.clear()
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.delete("search_ranking")
+        self.params = {'page': 1, 'page_size': 20}
+
+    def test_lookup_returns_payload_and_score(self):
+        """현재 버전 키의 payload와 증가된 랭킹 점수를 함께 반환"""
+        payload = {'count': 1, 'results': [{'id': 1}]}
+        cache.set(build_search_cache_key('toner', self.params, version=get_catalog_version()), payload)
+
+        first = lookup_search_cache('toner', self.params, keyword='toner')
+        second = lookup_search_cache('toner', self.params, keyword='toner')
+
+        self.assertEqual(first.payload, payload)
+        self.assertEqual(first.ranking_score, 1)
+        self.assertEqual(second.ranking_score, 2)
+        self.assertEqual(first.cache_key, build_search_cache_key('toner', self.params, version=first.version))
+
+    def test_lookup_ignores_previous_version(self):
+        """카탈로그 버전이 오르면 이전 버전 payload는 미스"""
+        version = get_catalog_version()
+        cache.set(build_search_cache_key('toner', self.params, version=version), {'count': 1})
+        self.redis_conn.incr("search:catalog_version")
+
+        lookup = lookup_search_cache('toner', self.params, keyword='toner')
+
+        self.assertIsNone(lookup.payload)
+        self.assertEqual(lookup.version, version + 1)
+
+    @patch('products.views.ProductDocument.search')
+    def test_cache_hit_single_round_trip(self, mock_search):
+        """캐시 히트 시 Redis 명령은 한 번만 실행 (상품 조각 캐시면 조각 MGET 한 번 추가), 모두 조회 전용 연결로"""
+        from django.test import override_settings
+        search_conn = get_redis_connection("search")
+        brand = Brand.objects.create(name="Lua Brand")
+        product = Product.objects.create(name="Lua Toner", brand=brand)
+        hit = MagicMock()
+        hit.meta.id = product.id
+        mock_es_response(mock_search, [hit])
+        url = reverse('product-search')
+
+        for fragments, expected in ((False, 1), (True, 2)):
+            cache.clear()
+            with override_settings(SEARCH_FRAGMENT_CACHE={**settings.SEARCH_FRAGMENT_CACHE, 'ENABLED': fragments}):
+                self.client.get(url, {'q': 'lua'})
+                with patch.object(self.redis_conn, 'execute_command', wraps=self.redis_conn.execute_command) as spy, \
+                        patch.object(search_conn, 'execute_command', wraps=search_conn.execute_command) as search_spy:
+                    response = self.client.get(url, {'q': 'lua'})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(search_spy.call_count, expected)
+            self.assertEqual(spy.call_count, 0)
+            self.assertEqual(self.redis_conn.zscore("search_ranking", 'lua'), 2)
+
+
+class SingleFlightTests(TestCase):
+    """동시 캐시 미스 요청 병합(single-flight) 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.delete("lock:flight-key")
+        cache.delete("flight-key")
+
+    def test_concurrent_calls_share_one_computation(self):
+        """프로세스 내 동시 호출은 한 번만 계산하고 결과를 공유"""
+        import threading
+        from .singleflight import SingleFlight
+
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return {'count': 1}
+
+        leader = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+        leader.start()
+        started.wait(timeout=5)
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+            for _ in range(3)
+        ]
+        for follower in followers:
+            follower.start()
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(timeout=5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'count': 1}] * 4)
+
+    def test_leader_exception_propagates(self):
+        """leader의 예외는 그대로 전달되고 키는 정리됨"""
+        from .singleflight import SingleFlight
+        flight = SingleFlight()
+
+        with self.assertRaises(ValueError):
+            flight.do('key', lambda: (_ for _ in ()).throw(ValueError('boom')))
+        self.assertEqual(flight.do('key', lambda: 'ok'), 'ok')
+
+    @patch('products.singleflight.POLL_INTERVAL', 0.01)
+    def test_waiter_reads_value_cached_by_lock_holder(self):
+        """다른 워커가 락을 잡고 있으면 계산하지 않고 캐시된 결과를 기다림"""
+        import threading
+        from .singleflight import redis_single_flight
+
+        self.redis_conn.set("lock:flight-key", "other-worker", px=5000)
+        threading.Timer(0.05, lambda: cache.set("flight-key", {'count': 7})).start()
+        compute = MagicMock(return_value={'count': 0})
+
+        result = redis_single_flight("flight-key", compute, lambda: cache.get("flight-key"))
+
+        self.assertEqual(result, {'count': 7})
+        compute.assert_not_called()
+
+    @patch('products.singleflight.POLL_INTERVAL', 0.01)
+    def test_waiter_computes_when_lock_released_without_value(self):
+        """락이 풀렸는데 캐시가 없으면 직접 계산"""
+        from .singleflight import redis_single_flight
+
+        compute = MagicMock(return_value={'count': 3})
+        result = redis_single_flight("flight-key", compute, lambda: cache.get("flight-key"))
+        self.assertEqual(result, {'count': 3})
+        self.assertFalse(self.redis_conn.exists("lock:flight-key"))
+
+        self.redis_conn.set("lock:flight-key", "other-worker", px=20)
+        self.assertEqual(redis_single_flight("flight-key", compute, lambda: None), {'count': 3})
+        self.assertEqual(compute.call_count, 2)
+
+
+class StaleWhileRevalidateTests(TestCase):
+    """stale-while-revalidate, XFetch 조기 갱신 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.client = APIClient()
+        cache.clear()
+        self.brand = Brand.objects.create(name="SWR Brand")
+        self.product = Product.objects.create(name="SWR Toner", brand=self.brand)
+        self.params = {'page': 1, 'page_size': 20}
+
+    def test_needs_refresh(self):
+        """soft TTL 전에는 갱신하지 않고, 이후에는 항상 갱신"""
+        from .search_cache import make_cache_entry, needs_refresh
+        entry = make_cache_entry({'results': []}, soft_ttl=100, delta=0.5, now=1000)
+
+        self.assertFalse(needs_refresh(entry, now=1050, rand=1.0))
+        self.assertTrue(needs_refresh(entry, now=1100, rand=1.0))
+
+    def test_xfetch_refreshes_expensive_popular_entries_earlier(self):
+        """계산 비용이 크고 인기 있는 검색어일수록 만료 전에 갱신"""
+        from .search_cache import make_cache_entry, needs_refresh
+        entry = make_cache_entry({'results': []}, soft_ttl=100, delta=5.0, now=1000)
+
+        # -ln(0.01) * 5 = 23초 -> 만료 20초 전이면 조기 갱신
+        self.assertTrue(needs_refresh(entry, ranking_score=0, now=1080, rand=0.01))
+        self.assertFalse(needs_refresh(entry, ranking_score=0, now=1070, rand=0.01))
+        # 인기 검색어는 beta가 커져서 더 일찍 갱신
+        self.assertTrue(needs_refresh(entry, ranking_score=1000, now=1070, rand=0.01))
+
+    @patch('products.views.refresh_in_background')
+    @patch('products.views.ProductDocument.search')
+    def test_stale_entry_served_and_refreshed(self, mock_search, mock_refresh):
+        """soft TTL이 지난 값은 바로 응답하고 백그라운드 갱신을 예약"""
+        from .search_cache import make_cache_entry
+        hit = MagicMock()
+        hit.meta.id = self.product.id
+        mock_es_response(mock_search, [hit])
+        cache_key = build_search_cache_key('swr', self.params, version=get_catalog_version())
+        stale = {'count': 0, 'next': None, 'previous': None, 'results': []}
+        cache.set(cache_key, make_cache_entry(stale, soft_ttl=10, delta=0.1, now=0))
+
+        response = self.client.get(reverse('product-search'), {'q': 'swr'})
+
+        self.assertEqual(response.json(), stale)
+        mock_search.assert_not_called()
+        mock_refresh.assert_called_once()
+        refresh_key, refresh_fn = mock_refresh.call_args[0]
+        self.assertEqual(refresh_key, cache_key)
+
+        # 예약된 갱신 작업이 실행되면 최신 결과로 캐시가 교체됨
+        refresh_fn()
+        refreshed = cache.get(cache_key)
+        self.assertEqual(refreshed['data']['count'], 1)
+        self.assertGreater(refreshed['soft_expires_at'], refreshed['computed_at'])
+
+    def test_refresh_in_background_dedupes(self):
+        """같은 키의 갱신은 락이 살아있는 동안 한 번만 예약"""
+        import threading
+        from .refresh import refresh_in_background
+        get_redis_connection("default").delete("refresh:dedupe-key")
+        done = threading.Event()
+
+        self.assertTrue(refresh_in_background("dedupe-key", done.set))
+        self.assertTrue(done.wait(timeout=5))
+        self.assertFalse(refresh_in_background("dedupe-key", done.set))
+
+
+class WindowedRankingTests(TestCase):
+    """시간 버킷 기반 실시간(윈도우) 랭킹 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.client = APIClient()
+        cache.clear()
+        self.redis_conn = get_redis_connection("default")
+        for key in self.redis_conn.scan_iter("search_ranking*"):
+            self.redis_conn.delete(key)
+
+    def test_window_weights_decay(self):
+        """현재 버킷 가중치 1.0, 반감기마다 절반"""
+        from .ranking import WINDOWS, window_weights
+        weights = window_weights(WINDOWS['1h'], now=60 * 1000)
+
+        self.assertEqual(len(weights), 60)
+        self.assertEqual(weights["search_ranking:m:1000"], 1.0)
+        self.assertAlmostEqual(weights["search_ranking:m:985"], 0.5)
+
+    @patch('products.views.ProductDocument.search')
+    def test_search_writes_time_buckets(self, mock_search):
+        """검색 시 분/시간 버킷에도 점수가 쌓이고 만료가 설정됨"""
+        from .ranking import bucket_keys
+        mock_es_response(mock_search, [])
+        now = 1_700_000_000
+
+        # 요청 중에 분이 바뀌어도 같은 버킷을 보도록 시각 고정
+        with patch('products.ranking.time') as mock_time:
+            mock_time.time.return_value = now
+            self.client.get(reverse('product-search'), {'q': 'bucket'})
+
+        for key, ttl in bucket_keys(now):
+            self.assertEqual(self.redis_conn.zscore(key, 'bucket'), 1)
+            self.assertGreater(self.redis_conn.ttl(key), 0)
+
+    def test_window_ranking_prefers_recent_searches(self):
+        """최근 검색이 오래된 검색보다 높은 순위 (누적 랭킹과 다름)"""
+        import time
+        from .ranking import record_searches
+        now = time.time()
+        record_searches(self.redis_conn, {'old keyword': 10}, now=now - 50 * 60)
+        record_searches(self.redis_conn, {'new keyword': 6}, now=now)
+
+        all_time = self.client.get(reverse('product-ranking')).json()
+        recent = self.client.get(reverse('product-ranking'), {'window': '1h'}).json()
+
+        self.assertEqual(all_time[0]['keyword'], 'old keyword')
+        self.assertEqual(recent[0]['keyword'], 'new keyword')
+        self.assertEqual(recent[0]['score'], 6)
+
+    def test_window_ranking_result_cached(self):
+        """병합 결과는 몇 초간 재사용"""
+        from .ranking import record_searches
+        record_searches(self.redis_conn, {'cached': 1})
+        first = self.client.get(reverse('product-ranking'), {'window': '24h'}).json()
+
+        record_searches(self.redis_conn, {'cached': 5})
+        second = self.client.get(reverse('product-ranking'), {'window': '24h'}).json()
+
+        self.assertEqual(first, second)
+        self.assertGreater(self.redis_conn.ttl("search_ranking:top:24h"), 0)
+
+    def test_invalid_window(self):
+        """지원하지 않는 window는 400"""
+        response = self.client.get(reverse('product-ranking'), {'window': '2h'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RankingBufferTests(TestCase):
+    """랭킹 write-behind 버퍼 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        from .ranking import RankingBuffer
+        self.client = APIClient()
+        cache.clear()
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.delete("search_ranking")
+        self.buffer = RankingBuffer(flush_interval=3600, max_keywords=100)
+
+    def test_flush_applies_aggregated_counts(self):
+        """증가분은 메모리에 모였다가 flush 시 한 번에 반영"""
+        from .ranking import bucket_keys
+        for keyword in ['toner', 'toner', 'cream', 'toner']:
+            self.buffer.add(keyword)
+
+        self.assertEqual(self.buffer.stats()['pending'], 4)
+        self.assertIsNone(self.redis_conn.zscore("search_ranking", 'toner'))
+
+        self.assertEqual(self.buffer.flush(), 4)
+        self.assertEqual(self.redis_conn.zscore("search_ranking", 'toner'), 3)
+        self.assertEqual(self.redis_conn.zscore(bucket_keys()[0][0], 'cream'), 1)
+        stats = self.buffer.stats()
+        self.assertEqual(stats['pending'], 0)
+        self.assertEqual(stats['flushed'], 4)
+
+    def test_flush_when_keyword_limit_reached(self):
+        """검색어 종류가 max_keywords에 도달하면 주기와 상관없이 반영"""
+        import time
+        from .ranking import RankingBuffer
+        buffer = RankingBuffer(flush_interval=3600, max_keywords=2)
+        buffer.add('first')
+        buffer.add('second')
+
+        deadline = time.monotonic() + 5
+        while buffer.stats()['flushed'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.redis_conn.zscore("search_ranking", 'second'), 1)
+
+    @patch('products.ranking.get_redis_connection')
+    def test_flush_failure_keeps_pending(self, mock_redis):
+        """Redis 장애 시 증가분은 버퍼에 남아 다음 flush에서 재시도"""
+        from redis.exceptions import ConnectionError as RedisConnectionError
+        mock_redis.side_effect = RedisConnectionError("Connection refused")
+        self.buffer.add('retry', 2)
+
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.stats()['pending'], 2)
+
+        mock_redis.side_effect = None
+        mock_redis.return_value = self.redis_conn
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.redis_conn.zscore("search_ranking", 'retry'), 2)
+
+    @patch('products.views.ProductDocument.search')
+    def test_search_uses_buffer_when_enabled(self, mock_search):
+        """버퍼 사용 시 검색 요청 경로에서는 랭킹을 쓰지 않음"""
+        mock_es_response(mock_search, [])
+        url = reverse('product-search')
+        config = {'ENABLED': True, 'FLUSH_INTERVAL': 3600, 'MAX_KEYWORDS': 100}
+
+        with self.settings(SEARCH_RANKING_BUFFER=config), \
+                patch('products.views.get_ranking_buffer', return_value=self.buffer):
+            self.client.get(url, {'q': 'buffered'})
+            self.client.get(url, {'q': 'buffered'})
+
+        self.assertIsNone(self.redis_conn.zscore("search_ranking", 'buffered'))
+        self.buffer.flush()
+        self.assertEqual(self.redis_conn.zscore("search_ranking", 'buffered'), 2)
+
+
+    def test_gunicorn_worker_exit_flushes_buffer(self):
+        """gunicorn 워커 종료 훅이 남은 증가분을 반영"""
+        import runpy
+        from django.conf import settings as django_settings
+        config = runpy.run_path(str(django_settings.BASE_DIR / 'config' / 'gunicorn.conf.py'))
+        self.buffer.add('exiting', 3)
+
+        server = MagicMock()
+        with patch('products.ranking._ranking_buffer', self.buffer):
+            config['worker_exit'](server, MagicMock(pid=1234))
+
+        self.assertEqual(self.redis_conn.zscore("search_ranking", 'exiting'), 3)
+        server.log.info.assert_called_once()
+        self.assertTrue(config['preload_app'])
+        self.assertGreater(config['max_requests_jitter'], 0)
+
+class ApproximateRankingTests(TestCase):
+    """근사 랭킹(Count-Min Sketch + Top-K) 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        from .sketch import SKETCH_KEY, SKETCH_TOP_KEY
+        self.client = APIClient()
+        cache.clear()
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.delete("search_ranking", SKETCH_KEY, SKETCH_TOP_KEY)
+
+    def test_sketch_never_underestimates_within_bound(self):
+        """추정값은 실제 빈도 이상, epsilon * N 이하"""
+        from collections import Counter
+        from .sketch import CountMinSketch
+        sketch = CountMinSketch(width=64, depth=4)
+        counts = Counter({f"keyword-{i}": (i % 7) + 1 for i in range(200)})
+        for keyword, count in counts.items():
+            sketch.add(keyword, count)
+
+        errors = [sketch.estimate(keyword) - count for keyword, count in counts.items()]
+        self.assertGreaterEqual(min(errors), 0)
+        within = sum(1 for error in errors if error <= sketch.error_bound())
+        self.assertGreaterEqual(within / len(errors), 1 - sketch.delta)
+
+    def test_merge_equals_single_sketch(self):
+        """워커별 결과를 병합하면 한 곳에서 집계한 것과 같음"""
+        from .sketch import HeavyHitters
+        merged, worker, single = HeavyHitters(256, 4, 3), HeavyHitters(256, 4, 3), HeavyHitters(256, 4, 3)
+        for keyword in ['toner'] * 5 + ['cream'] * 2:
+            merged.add(keyword)
+            single.add(keyword)
+        for keyword in ['serum'] * 4 + ['toner'] * 2 + ['lotion']:
+            worker.add(keyword)
+            single.add(keyword)
+
+        merged.merge(worker)
+        self.assertEqual(merged.top(3), single.top(3))
+        self.assertEqual(merged.top(1), [('toner', 7)])
+
+    def test_sketch_backend_bounds_ranking_size(self):
+        """sketch 백엔드는 누적/시간 버킷 모두 Top-K 개수만 보관하고 ranking API가 그 결과를 반환"""
+        from .ranking import bucket_keys, record_searches
+        from .sketch import SKETCH_TOP_KEY
+        sketch = {'WIDTH': 256, 'DEPTH': 4, 'TOP_K': 3}
+        now = 1_700_000_000
+        with self.settings(SEARCH_RANKING_BACKEND='sketch', SEARCH_RANKING_SKETCH=sketch):
+            con = get_redis_connection("default")
+            record_searches(con, {'toner': 10, 'cream': 6, 'serum': 4}, now=now)
+            record_searches(con, {f"typo-{i}": 1 for i in range(20)}, now=now)
+            response = self.client.get(reverse('product-ranking'))
+
+        self.assertEqual(self.redis_conn.zcard(SKETCH_TOP_KEY), 3)
+        self.assertFalse(self.redis_conn.exists("search_ranking"))
+        keywords = [item['keyword'] for item in response.data]
+        self.assertEqual(keywords, ['toner', 'cream', 'serum'])
+        for key, _ in bucket_keys(now):
+            self.assertEqual(self.redis_conn.zcard(key), 3)
+
+    def test_sketch_bucket_admits_new_hot_keyword(self):
+        """꽉 찬 시간 버킷에 새로 들어온 인기 검색어도 점수가 쌓여 윈도우 랭킹 1위가 됨 (Space-Saving)"""
+        from .ranking import bucket_keys, record_searches, top_keywords
+        sketch = {'WIDTH': 256, 'DEPTH': 4, 'TOP_K': 3}
+        now = 1_700_000_000
+        with self.settings(SEARCH_RANKING_BACKEND='sketch', SEARCH_RANKING_SKETCH=sketch):
+            con = get_redis_connection("default")
+            record_searches(con, {'x': 1, 'y': 1, 'z': 1}, now=now)
+            for _ in range(50):
+                record_searches(con, {'aaa': 1}, now=now)
+
+        for key, _ in bucket_keys(now):
+            self.assertEqual(self.redis_conn.zcard(key), 3)
+            self.assertEqual(self.redis_conn.zscore(key, 'aaa'), 51)
+        self.assertEqual(top_keywords(self.redis_conn, '1h', limit=1, now=now)[0][0], 'aaa')
+
+    @patch('products.views.ProductDocument.search')
+    def test_search_records_to_sketch(self, mock_search):
+        """sketch 백엔드에서 검색하면 정확 랭킹 ZSET은 만들지 않음"""
+        from .sketch import SKETCH_TOP_KEY
+        mock_es_response(mock_search, [])
+        with self.settings(SEARCH_RANKING_BACKEND='sketch'):
+            self.client.get(reverse('product-search'), {'q': 'toner'})
+            self.client.get(reverse('product-search'), {'q': 'toner'})
+
+        self.assertEqual(self.redis_conn.zscore(SKETCH_TOP_KEY, 'toner'), 2)
+        self.assertFalse(self.redis_conn.exists("search_ranking"))
+
+    def test_benchmark_command(self):
+        """벤치마크 명령이 메모리/정확도 결과를 JSON으로 저장"""
+        import json
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('benchmark_ranking', queries=2000, vocabulary=300, width=256,
+                         output=output.name, stdout=StringIO())
+            with open(output.name, encoding='utf-8') as f:
+                result = json.load(f)
+
+        self.assertEqual(result['queries'], 2000)
+        self.assertEqual(result['accuracy']['underestimates'], 0)
+        self.assertLess(result['memory']['sketch_bytes'], result['memory']['exact_bytes'])
+
+
+LOCAL_CACHE_ENABLED = {'ENABLED': True, 'MAX_ENTRIES': 1000, 'TTL': 5, 'RANKING_TTL': 1, 'MIN_SCORE': 10}
+
+
+class LocalCacheTests(TestCase):
+    """워커 메모리(L1) 캐시 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        from .local_cache import get_ranking_l1, get_search_l1, search_l2
+        from .search_cache import CATALOG_VERSION_KEY
+        self.client = APIClient()
+        cache.clear()
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.delete("search_ranking")
+        self.search_l1 = get_search_l1()
+        self.search_l1.clear()
+        get_ranking_l1().clear()
+        search_l2.reset()
+        # 이전 테스트의 bump_catalog_version 알림이 늦게 도착해 L1을 비우지 않도록 카탈로그 버전을 높게 고정
+        # (L1은 이미 반영한 버전 이하의 알림을 무시)
+        self.pinned_version = 1000
+        self.redis_conn.set(CATALOG_VERSION_KEY, self.pinned_version)
+        self.search_l1.invalidate(self.pinned_version)
+        self.addCleanup(self.search_l1.clear)
+
+    def test_lru_eviction_and_ttl(self):
+        """최대 개수를 넘으면 오래 안 쓴 항목부터, TTL이 지나면 만료"""
+        from .local_cache import LocalCache
+        local = LocalCache(max_entries=2, ttl=5)
+        local.set('a', 1, now=0)
+        local.set('b', 2, now=0)
+        local.get('a', now=1)
+        local.set('c', 3, now=1)
+
+        self.assertIsNone(local.get('b', now=1))
+        self.assertEqual(local.get('a', now=1), 1)
+        self.assertIsNone(local.get('c', now=6))
+        self.assertEqual(local.stats()['evictions'], 1)
+
+    def test_invalidate_rejects_older_version(self):
+        """무효화 이후에는 이전 카탈로그 버전으로 계산한 값은 저장하지 않음"""
+        from .local_cache import LocalCache
+        local = LocalCache()
+        local.set('key', 'old', version=1)
+        local.invalidate(version=2)
+
+        self.assertIsNone(local.get('key'))
+        self.assertFalse(local.set('key', 'late', version=1))
+        self.assertTrue(local.set('key', 'new', version=2))
+
+    @patch('products.views.ProductDocument.search')
+    def test_popular_keyword_served_from_l1(self, mock_search):
+        """인기 검색어는 두 번째 요청부터 Redis 캐시 조회 없이 L1에서 응답 (랭킹은 계속 집계)"""
+        from . import views
+        mock_es_response(mock_search, [])
+        self.redis_conn.zadd("search_ranking", {'toner': 20})
+        url = reverse('product-search')
+
+        with self.settings(SEARCH_LOCAL_CACHE=LOCAL_CACHE_ENABLED), \
+                patch('products.views.lookup_search_cache', wraps=views.lookup_search_cache) as lookup:
+            first = self.client.get(url, {'q': 'toner'})
+            second = self.client.get(url, {'q': 'toner'})
+            stats = self.client.get(reverse('product-cache-stats')).data
+
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(lookup.call_count, 1)
+        # 빈 결과라 정확 검색 + 오타 허용 폴백 = ES 요청 2번 (첫 요청에서만)
+        self.assertEqual(mock_search.call_count, 2)
+        self.assertEqual(self.redis_conn.zscore("search_ranking", 'toner'), 22)
+        self.assertEqual(stats['search']['l1']['hits'], 1)
+        self.assertEqual(stats['search']['l2']['misses'], 1)
+
+    def test_cache_stats_do_not_start_listener(self):
+        """L1을 쓰지 않으면 캐시 통계 조회가 L1/무효화 구독 스레드를 만들지 않음"""
+        from . import local_cache
+        with patch('products.local_cache._ensure_listener') as ensure_listener, \
+                patch('products.local_cache._search_l1', None), \
+                patch('products.local_cache._ranking_l1', None), \
+                patch('products.local_cache._suggest_l1', None):
+            stats = self.client.get(reverse('product-cache-stats')).data
+            self.assertIsNone(local_cache._search_l1)
+            self.assertIsNone(local_cache._suggest_l1)
+        ensure_listener.assert_not_called()
+        self.assertEqual(stats['search']['l1']['hits'], 0)
+        self.assertEqual(stats['suggest']['l1']['entries'], 0)
+
+    @patch('products.views.ProductDocument.search')
+    def test_unpopular_keyword_not_kept_in_l1(self, mock_search):
+        """랭킹 점수가 낮은 검색어는 L1에 저장하지 않음 (긴 꼬리 검색어로 L1이 밀리지 않도록)"""
+        mock_es_response(mock_search, [])
+        with self.settings(SEARCH_LOCAL_CACHE=LOCAL_CACHE_ENABLED):
+            self.client.get(reverse('product-search'), {'q': 'rare'})
+
+        self.assertEqual(self.search_l1.stats()['entries'], 0)
+
+    @patch('products.views.ProductDocument.search')
+    def test_catalog_change_invalidates_l1(self, mock_search):
+        """카탈로그 버전이 오르면 L1이 비워지고 다음 요청은 다시 검색"""
+        from .search_cache import bump_catalog_version
+        mock_es_response(mock_search, [])
+        self.redis_conn.zadd("search_ranking", {'toner': 20})
+        url = reverse('product-search')
+
+        with self.settings(SEARCH_LOCAL_CACHE=LOCAL_CACHE_ENABLED):
+            self.client.get(url, {'q': 'toner'})
+            bump_catalog_version()
+            self.client.get(url, {'q': 'toner'})
+
+        self.assertEqual(mock_search.call_count, 4)  # 빈 결과라 요청마다 오타 허용 폴백 포함 2번
+
+    def test_pubsub_invalidation_from_other_worker(self):
+        """다른 워커가 발행한 카탈로그 버전 알림으로 L1 무효화"""
+        import time
+        from .local_cache import INVALIDATION_CHANNEL
+        self.search_l1.set('key', 'value')
+        version = self.pinned_version + 99
+
+        deadline = time.monotonic() + 5
+        while self.search_l1.version < version and time.monotonic() < deadline:
+            self.redis_conn.publish(INVALIDATION_CHANNEL, version)
+            time.sleep(0.05)
+
+        self.assertEqual(self.search_l1.version, version)
+        self.assertIsNone(self.search_l1.get('key'))
+
+    def test_ranking_served_from_l1(self):
+        """랭킹 목록은 RANKING_TTL 동안 Redis 조회 없이 재사용"""
+        from . import views
+        self.redis_conn.zadd("search_ranking", {'toner': 3})
+        url = reverse('product-ranking')
+
+        with self.settings(SEARCH_LOCAL_CACHE=LOCAL_CACHE_ENABLED), \
+                patch('products.views.top_keywords', wraps=views.top_keywords) as top:
+            first = self.client.get(url)
+            second = self.client.get(url)
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(top.call_count, 1)
+
+
+class IndexSyncTests(TestCase):
+    """outbox 기반 ES 색인 동기화 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        from .index_sync import CONTENT_DIRTY_KEY, DIRTY_KEY, FANOUT_KEY
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.delete(DIRTY_KEY, CONTENT_DIRTY_KEY, FANOUT_KEY)
+        self.brand = Brand.objects.create(name="Innisfree")
+        self.ingredients = [
+            Ingredient.objects.create(name=f"Ingredient {i}", ewg_score=i) for i in range(1, 4)
+        ]
+        self.outbox = {'MODE': 'outbox', 'BATCH_SIZE': 500, 'FLUSH_INTERVAL': 1.0}
+        self.immediate = {'MODE': 'immediate', 'BATCH_SIZE': 500, 'FLUSH_INTERVAL': 1.0}
+
+    def _create_product(self):
+        product = Product.objects.create(name="Green Tea Toner", brand=self.brand, price=15000)
+        for ingredient in self.ingredients:
+            product.ingredients.add(ingredient)
+        return product
+
+    @patch('products.index_sync.ProductDocument.update')
+    def test_outbox_collects_ids_and_drains_in_bulk(self, mock_update):
+        """저장/성분 추가는 ID만 기록하고, drain 시 한 번의 bulk로 색인"""
+        from .index_sync import DIRTY_KEY, drain_dirty_products
+        with self.settings(ELASTICSEARCH_DSL_AUTOSYNC=True, SEARCH_INDEX_SYNC=self.outbox):
+            with self.captureOnCommitCallbacks(execute=True):
+                product = self._create_product()
+            self.assertFalse(mock_update.called)
+            self.assertEqual(self.redis_conn.smembers(DIRTY_KEY), {str(product.id).encode()})
+
+            version = get_catalog_version()
+            self.assertEqual(drain_dirty_products(100), 1)
+
+        mock_update.assert_called_once()
+        self.assertEqual([p.id for p in mock_update.call_args[0][0]], [product.id])
+        self.assertEqual(self.redis_conn.scard(DIRTY_KEY), 0)
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    @patch('products.index_sync.ProductDocument.update')
+    def test_display_field_edit_skips_catalog_bump(self, mock_update):
+        """검색 결과에 영향이 없는 필드 수정은 별도 outbox로, 색인 후에도 카탈로그 버전 유지"""
+        from .index_sync import CONTENT_DIRTY_KEY, DIRTY_KEY, drain_dirty_products, pending_count
+        product = self._create_product()
+        product.refresh_from_db()
+        with self.settings(ELASTICSEARCH_DSL_AUTOSYNC=True, SEARCH_INDEX_SYNC=self.outbox):
+            with self.captureOnCommitCallbacks(execute=True):
+                product.image_url = "https://example.com/toner.jpg"
+                product.save()
+            self.assertEqual(self.redis_conn.scard(DIRTY_KEY), 0)
+            self.assertEqual(self.redis_conn.smembers(CONTENT_DIRTY_KEY), {str(product.id).encode()})
+            self.assertEqual(pending_count(), 1)
+
+            version = get_catalog_version()
+            self.assertEqual(drain_dirty_products(100), 1)
+
+        self.assertEqual([p.id for p in mock_update.call_args[0][0]], [product.id])
+        self.assertEqual(get_catalog_version(), version)
+
+    @patch('products.index_sync.ProductDocument.update')
+    def test_immediate_mode_indexes_after_commit(self, mock_update):
+        """immediate 모드는 커밋 전에는 색인하지 않고, 커밋 직후 같은 프로세스에서 색인"""
+        with self.settings(ELASTICSEARCH_DSL_AUTOSYNC=True, SEARCH_INDEX_SYNC=self.immediate):
+            with self.captureOnCommitCallbacks(execute=True):
+                product = self._create_product()
+                self.assertFalse(mock_update.called)
+
+        self.assertTrue(mock_update.called)
+        self.assertEqual([p.id for p in mock_update.call_args[0][0]], [product.id])
+
+    @patch('products.index_sync.ProductDocument.update')
+    def test_deleted_product_removed_from_index(self, mock_update):
+        """삭제된 상품은 delete 액션으로 반영"""
+        product = self._create_product()
+        product_id = product.id
+        with self.settings(ELASTICSEARCH_DSL_AUTOSYNC=True, SEARCH_INDEX_SYNC=self.immediate):
+            with self.captureOnCommitCallbacks(execute=True):
+                product.delete()
+
+        args, kwargs = mock_update.call_args
+        self.assertEqual([p.id for p in args[0]], [product_id])
+        self.assertEqual(kwargs['action'], 'delete')
+
+    def test_brand_and_ingredient_changes_fan_out(self):
+        """브랜드/성분 수정 시 관련 상품이 재색인 대상 (브랜드는 워커의 소속 상품 반영 작업으로)"""
+        from .index_sync import DIRTY_KEY, FANOUT_KEY, run_fanouts
+        product = self._create_product()
+        other = Product.objects.create(name="Cream", brand=Brand.objects.create(name="Other"))
+        with self.settings(ELASTICSEARCH_DSL_AUTOSYNC=True, SEARCH_INDEX_SYNC=self.outbox):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.brand.name = "Innisfree Korea"
+                self.brand.save()
+            self.assertEqual(self.redis_conn.smembers(FANOUT_KEY), {f"brand:{self.brand.pk}:0:1".encode()})
+            self.assertEqual(run_fanouts(), 1)
+            self.assertEqual(self.redis_conn.smembers(DIRTY_KEY), {str(product.id).encode()})
+
+            self.redis_conn.delete(DIRTY_KEY)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.ingredients[0].delete()
+            self.assertEqual(self.redis_conn.smembers(DIRTY_KEY), {str(product.id).encode()})
+        self.assertNotIn(str(other.id).encode(), self.redis_conn.smembers(DIRTY_KEY))
+
+    def test_brand_fan_out_runs_in_bounded_batches(self):
+        """브랜드 저장 요청의 쿼리 수는 소속 상품 수와 무관하고, 워커는 배치 크기 이하로 나눠 갱신"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .index_sync import CONTENT_DIRTY_KEY, run_fanouts
+        ids = [Product.objects.create(name=f"Toner {i}", brand=self.brand).id for i in range(5)]
+        with self.settings(ELASTICSEARCH_DSL_AUTOSYNC=True, SEARCH_INDEX_SYNC=self.outbox):
+            with self.assertNumQueries(1):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.brand.save()
+
+            with self.settings(SEARCH_INDEX_SYNC={**self.outbox, 'BATCH_SIZE': 2}):
+                with CaptureQueriesContext(connection) as ctx:
+                    run_fanouts()
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "products_product"')]
+        # 5개 상품 → 2/2/1개씩 3번 갱신 (+ ID 조회 4번)
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(len(ctx.captured_queries), 7)
+        # 이름 변경 없는 저장이므로 카탈로그 버전을 올리지 않는 outbox로
+        self.assertEqual(self.redis_conn.smembers(CONTENT_DIRTY_KEY), {str(pk).encode() for pk in ids})
+
+    @patch('products.index_sync.ProductDocument.update')
+    def test_drain_failure_requeues_ids(self, mock_update):
+        """색인 실패 시 꺼낸 ID는 outbox로 되돌림"""
+        from elasticsearch.exceptions import ConnectionError as ESConnectionError
+        from .index_sync import DIRTY_KEY, drain_dirty_products
+        mock_update.side_effect = ESConnectionError("Connection refused")
+        product = self._create_product()
+        self.redis_conn.sadd(DIRTY_KEY, product.id)
+
+        with self.assertRaises(ESConnectionError):
+            drain_dirty_products(100)
+        self.assertEqual(self.redis_conn.scard(DIRTY_KEY), 1)
+
+    @patch('products.index_sync.ProductDocument.update')
+    def test_sync_command_once(self, mock_update):
+        """sync_search_index --once는 outbox를 배치 단위로 비우고 종료"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .index_sync import DIRTY_KEY
+        ids = [self._create_product().id for _ in range(3)]
+        self.redis_conn.sadd(DIRTY_KEY, *ids)
+
+        call_command('sync_search_index', once=True, batch_size=2, stdout=StringIO())
+
+        self.assertEqual(mock_update.call_count, 2)
+        self.assertEqual(self.redis_conn.scard(DIRTY_KEY), 0)
+
+
+class ReindexProductsCommandTests(TestCase):
+    """무중단 전체 재색인 명령 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        brand = Brand.objects.create(name="Innisfree")
+        ingredient = Ingredient.objects.create(name="Green Tea Extract", ewg_score=1)
+        for i in range(5):
+            product = Product.objects.create(name=f"Toner {i}", brand=brand, price=10000)
+            product.ingredients.add(ingredient)
+        self.bulk = MagicMock()
+
+    def _run(self, client, indexed_ids=None, **options):
+        from io import StringIO
+        from django.core.management import call_command
+        sent = []
+
+        def fake_parallel_bulk(es, actions, **kwargs):
+            for action in actions:
+                sent.append(action)
+                yield True, {'index': {'_id': action['_id']}}
+
+        def fake_scan(es, index, **kwargs):
+            ids = [action['_id'] for action in sent] if indexed_ids is None else indexed_ids
+            return iter([{'_id': str(pk)} for pk in ids])
+
+        with patch.object(ProductDocument, '_get_connection', return_value=client), \
+                patch.object(ProductDocument._index, 'clone') as clone, \
+                patch('products.management.commands.reindex_products.parallel_bulk', fake_parallel_bulk), \
+                patch('products.management.commands.reindex_products.scan', fake_scan), \
+                patch('products.management.commands.reindex_products.bulk', self.bulk):
+            call_command('reindex_products', chunk_size=2, stdout=StringIO(), **options)
+        return clone.return_value, sent
+
+    def test_streams_all_products_into_new_index(self):
+        """전체 상품을 청크 단위로 새 인덱스에 색인하고 alias를 원자적으로 교체"""
+        client = MagicMock()
+        client.indices.exists_alias.return_value = False
+        client.indices.exists.return_value = True
+        client.indices.get.return_value = {}
+
+        index, sent = self._run(client)
+
+        self.assertTrue(index.create.called)
+        new_index = sent[0]['_index']
+        self.assertTrue(new_index.startswith('products-'))
+        self.assertEqual(sorted(a['_id'] for a in sent), sorted(Product.objects.values_list('id', flat=True)))
+        self.assertEqual(sent[0]['_source']['brand']['name'], "Innisfree")
+        index.settings.assert_called_with(refresh_interval='-1', number_of_replicas=0)
+
+        actions = client.indices.update_aliases.call_args[1]['body']['actions']
+        self.assertEqual(actions, [
+            {'remove_index': {'index': 'products'}},
+            {'add': {'index': new_index, 'alias': 'products'}},
+        ])
+
+    def test_no_swap_keeps_alias(self):
+        """--no-swap이면 색인만 하고 alias는 그대로"""
+        client = MagicMock()
+        self._run(client, no_swap=True)
+        self.assertFalse(client.indices.update_aliases.called)
+
+    def test_products_deleted_during_build_removed_before_swap(self):
+        """색인 도중 삭제된 상품(새 인덱스에만 남은 문서)은 alias 교체 전에 새 인덱스에서 제거"""
+        client = MagicMock()
+        client.indices.exists_alias.return_value = False
+        client.indices.get.return_value = {}
+        calls = []
+        self.bulk.side_effect = lambda es, actions, **kwargs: calls.append(('bulk', list(actions)))
+        client.indices.update_aliases.side_effect = lambda **kwargs: calls.append(('swap', None))
+        deleted_id = Product.objects.order_by('id').last().id + 1
+        indexed_ids = list(Product.objects.values_list('id', flat=True)) + [deleted_id]
+
+        index, sent = self._run(client, indexed_ids=indexed_ids)
+
+        new_index = sent[0]['_index']
+        self.assertEqual(calls[0], ('bulk', [{'_op_type': 'delete', '_index': new_index, '_id': deleted_id}]))
+        self.assertEqual(calls[1], ('swap', None))
+
+
+class IncrementalReindexTests(TestCase):
+    """updated_at 워터마크 기반 증분 색인 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정: 모든 데이터를 하루 전에 수정된 것으로 맞춤"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from .index_sync import WATERMARK_KEY
+        get_redis_connection("default").delete(WATERMARK_KEY)
+
+        self.brand = Brand.objects.create(name="Innisfree")
+        self.other_brand = Brand.objects.create(name="Laneige")
+        self.green_tea = Ingredient.objects.create(name="Green Tea Extract", ewg_score=1)
+        self.water = Ingredient.objects.create(name="Water", ewg_score=1)
+        self.toner = Product.objects.create(name="Toner", brand=self.brand)
+        self.cream = Product.objects.create(name="Cream", brand=self.other_brand)
+        self.serum = Product.objects.create(name="Serum", brand=self.other_brand)
+        self.toner.ingredients.add(self.water)
+        self.cream.ingredients.add(self.green_tea)
+
+        old = timezone.now() - timedelta(days=1)
+        for model in (Brand, Ingredient, Product):
+            model.objects.update(updated_at=old)
+        self.since = old + timedelta(hours=1)
+
+    def test_nothing_changed(self):
+        """워터마크 이후 변경이 없으면 대상 없음"""
+        from .index_sync import changed_product_ids
+        self.assertEqual(changed_product_ids(self.since), set())
+
+    def test_fan_out_from_brand_and_ingredient(self):
+        """브랜드/성분 수정은 관련 상품으로, 성분 연결 변경은 해당 상품으로 이어짐"""
+        from .index_sync import changed_product_ids
+        self.brand.save()
+        self.assertEqual(changed_product_ids(self.since), {self.toner.id})
+
+        self.green_tea.save()
+        self.assertEqual(changed_product_ids(self.since), {self.toner.id, self.cream.id})
+
+        self.serum.ingredients.add(self.water)
+        self.assertEqual(changed_product_ids(self.since), {self.toner.id, self.cream.id, self.serum.id})
+
+    @patch('products.index_sync.ProductDocument.update')
+    def test_incremental_command_moves_watermark(self, mock_update):
+        """증분 색인은 변경분만 배치로 색인하고 워터마크를 옮김"""
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from .index_sync import get_watermark, set_watermark
+
+        with self.assertRaises(CommandError):
+            call_command('reindex_products', incremental=True, stdout=StringIO())
+
+        set_watermark(self.since)
+        self.cream.save()
+        version = get_catalog_version()
+        call_command('reindex_products', incremental=True, stdout=StringIO())
+
+        mock_update.assert_called_once()
+        self.assertEqual([p.id for p in mock_update.call_args[0][0]], [self.cream.id])
+        self.assertGreater(get_watermark(), self.since)
+        self.assertEqual(get_catalog_version(), version + 1)
+
+
+class SeedDataCommandTests(TestCase):
+    """seed_data bulk 생성 테스트"""
+
+    def _seed(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+        call_command('seed_data', no_index=True, stdout=StringIO(), **options)
+
+    def test_bulk_creates_requested_counts(self):
+        """요청한 수만큼 브랜드/성분/상품과 상품-성분 연결 생성"""
+        self._seed(brands=3, ingredients=12, products=25, batch_size=10, seed=7)
+
+        self.assertEqual(Brand.objects.count(), 3)
+        self.assertEqual(Ingredient.objects.count(), 12)
+        self.assertEqual(Product.objects.count(), 25)
+        for product in Product.objects.prefetch_related('ingredients'):
+            self.assertGreaterEqual(len(product.ingredients.all()), 3)
+
+    def test_same_seed_same_data(self):
+        """같은 시드면 같은 상품 데이터 (벤치마크 재현)"""
+        def snapshot():
+            return list(Product.objects.order_by('id').values_list('name', 'price', 'brand__name'))
+
+        self._seed(brands=2, ingredients=10, products=15, seed=42)
+        first = snapshot()
+        Product.objects.all().delete()
+        Brand.objects.all().delete()
+        Ingredient.objects.all().delete()
+        self._seed(brands=2, ingredients=10, products=15, seed=42)
+
+        self.assertEqual(snapshot(), first)
+
+    @patch('products.management.commands.seed_data.ProductDocument.update')
+    def test_indexes_in_bulk_after_load(self, mock_update):
+        """signal 대신 적재가 끝난 뒤 배치 단위로 색인"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .index_sync import BULK_REQUEST_TIMEOUT
+        call_command('seed_data', brands=2, ingredients=10, products=25, batch_size=10, seed=1, stdout=StringIO())
+
+        self.assertEqual(mock_update.call_count, 3)
+        for call in mock_update.call_args_list:
+            self.assertEqual(call.kwargs['request_timeout'], BULK_REQUEST_TIMEOUT)
+
+
+class SearchBenchmarkCommandTests(TestCase):
+    """검색 벤치마크 명령 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        cache.clear()
+        brand = Brand.objects.create(name="Innisfree")
+        ingredient = Ingredient.objects.create(name="Green Tea Extract", ewg_score=1)
+        for i in range(30):
+            product = Product.objects.create(name=f"Green Tea Toner {i}", brand=brand, price=10000)
+            product.ingredients.add(ingredient)
+
+    def test_percentile(self):
+        """최근접 순위 백분위수"""
+        from .management.commands.benchmark_search import percentile
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_reports_stage_percentiles(self):
+        """ES 대용으로 부하를 재생하고 단계별 백분위수와 히트/미스를 JSON으로 저장"""
+        import json
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('benchmark_search', requests=60, warmup=5, vocabulary=5, stub_es=True,
+                         host='testserver', output=output.name, compare=None, stdout=StringIO())
+            with open(output.name, encoding='utf-8') as f:
+                result = json.load(f)
+
+            out = StringIO()
+            call_command('benchmark_search', requests=20, warmup=0, vocabulary=5, stub_es=True,
+                         host='testserver', compare=output.name, stdout=out)
+
+        self.assertEqual(result['meta']['errors'], 0)
+        self.assertEqual(result['total']['count'], 60)
+        self.assertGreater(result['cache_hit']['count'], 0)
+        self.assertGreater(result['cache_miss']['count'], 0)
+        # 랭킹은 버퍼가 꺼져 있으면 캐시 조회 스크립트에서 함께 처리되므로 cache 단계에 포함
+        self.assertIn('ranking', result['stages'])
+        for name in ('validation', 'cache', 'es', 'db', 'serialize'):
+            self.assertGreater(result['stages'][name]['count'], 0, name)
+            self.assertLessEqual(result['stages'][name]['p50'], result['stages'][name]['p99'])
+        self.assertIn('p95 비교', out.getvalue())
+
+    def test_runs_isolated_from_serving_redis(self):
+        """벤치마크는 전용 Redis DB에서 실행 (운영 랭킹/카탈로그 버전/캐시 그대로), document 모드도 ES 대용 지원"""
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from .search_cache import CATALOG_VERSION_KEY
+        redis_conn = get_redis_connection("default")
+        redis_conn.delete("search_ranking")
+        redis_conn.set(CATALOG_VERSION_KEY, 7)
+        before = set(redis_conn.keys('*'))
+
+        out = StringIO()
+        with self.settings(SEARCH_RESULT_SOURCE='document'):
+            call_command('benchmark_search', requests=20, warmup=0, vocabulary=5, stub_es=True, cold=True,
+                         host='testserver', output=None, compare=None, stdout=out)
+
+        self.assertIn('요청 20건 (오류 0건)', out.getvalue())
+        self.assertEqual(set(redis_conn.keys('*')), before)
+        self.assertEqual(int(redis_conn.get(CATALOG_VERSION_KEY)), 7)
+        with self.assertRaises(CommandError):
+            call_command('benchmark_search', requests=1, warmup=0, vocabulary=5, stub_es=True, redis_db=1,
+                         host='testserver', stdout=StringIO())
+
+
+    def test_http_benchmark_compares_targets(self):
+        """같은 동시성으로 대상별 처리량/지연을 비교 (응답 200이 아니면 오류로 집계)"""
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from io import StringIO
+        from django.core.management import call_command
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200 if self.path.startswith('/ok') else 500)
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        out = StringIO()
+        try:
+            call_command('benchmark_http', targets=[f'ok={base}/ok/', f'broken={base}/broken/'],
+                         concurrency=4, requests=20, warmup=2, vocabulary=5, stdout=out)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        lines = out.getvalue().splitlines()
+        ok_line = next(line for line in lines if line.startswith('ok '))
+        broken_line = next(line for line in lines if line.startswith('broken '))
+        self.assertEqual(ok_line.split()[2], '0')
+        self.assertEqual(broken_line.split()[2], '20')
+        self.assertIn('broken 처리량: ok 대비 -100.0%', out.getvalue())
+
+class SearchMetricsTests(TestCase):
+    """검색 단계별 메트릭 / Server-Timing 헤더 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        from .metrics import search_duration, stage_durations
+        self.client = APIClient()
+        cache.clear()
+        brand = Brand.objects.create(name="Innisfree")
+        self.product = Product.objects.create(name="Green Tea Toner", brand=brand, price=15000)
+        search_duration.reset()
+        for histogram in stage_durations.values():
+            histogram.reset()
+
+    def _search(self, mock_search, keyword='toner'):
+        mock_hit = MagicMock()
+        mock_hit.meta.id = self.product.id
+        mock_es_response(mock_search, [mock_hit])
+        return self.client.get(reverse('product-search'), {'q': keyword})
+
+    def test_histogram_buckets_are_cumulative(self):
+        """버킷은 상한 이하 누적 건수, +Inf는 전체 건수"""
+        from .metrics import Histogram
+        histogram = Histogram(buckets=(0.01, 0.1))
+        for seconds in (0.005, 0.05, 0.05, 3.0):
+            histogram.observe(seconds)
+
+        buckets, total_sum, count = histogram.snapshot()
+        self.assertEqual(buckets, [('0.01', 1), ('0.1', 3), ('+Inf', 4)])
+        self.assertAlmostEqual(total_sum, 3.105)
+        self.assertEqual(count, 4)
+
+    @patch('products.views.ProductDocument.search')
+    def test_server_timing_header(self, mock_search):
+        """미스는 ES/DB/직렬화 단계, 히트는 캐시 단계만 헤더에 표시"""
+        miss = self._search(mock_search)
+        hit = self._search(mock_search)
+
+        self.assertEqual(miss.status_code, 200)
+        for name in ('validation', 'cache', 'es', 'db', 'serialize', 'total'):
+            self.assertIn(f'{name};dur=', miss['Server-Timing'])
+        self.assertIn('cache;dur=', hit['Server-Timing'])
+        self.assertNotIn('es;dur=', hit['Server-Timing'])
+
+    @patch('products.views.ProductDocument.search')
+    def test_metrics_endpoint(self, mock_search):
+        """Prometheus 텍스트 형식으로 요청/단계별 히스토그램과 캐시 카운터 노출"""
+        self._search(mock_search)
+        self._search(mock_search)
+        self.client.get(reverse('product-search'), {'q': ''})  # 검증 실패도 요청 시간에 포함
+
+        response = self.client.get(reverse('metrics'))
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('purepick_search_duration_seconds_count 3', body)
+        self.assertIn('purepick_search_stage_duration_seconds_count{stage="es"} 1', body)
+        self.assertIn('purepick_search_stage_duration_seconds_bucket{stage="es",le="+Inf"} 1', body)
+        self.assertIn('purepick_cache_requests_total{cache="search",tier="l2",result="hit"}', body)
+
+    @patch('products.views.ProductDocument.search')
+    def test_disabled(self, mock_search):
+        """SEARCH_METRICS 비활성화 시 헤더/히스토그램 없음"""
+        from django.test import override_settings
+        from .metrics import search_duration
+        with override_settings(SEARCH_METRICS={'ENABLED': False, 'SERVER_TIMING': True}):
+            response = self._search(mock_search)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(search_duration.snapshot()[2], 0)
+
+
+class SearchFilterTests(TestCase):
+    """검색 필터 / 패싯 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.client = APIClient()
+        cache.clear()
+        self.brand = Brand.objects.create(name="Innisfree")
+        self.product = Product.objects.create(name="Green Tea Toner", brand=self.brand, price=15000)
+        self.url = reverse('product-search')
+
+    def _search(self, mock_search, params):
+        mock_hit = MagicMock()
+        mock_hit.meta.id = self.product.id
+        search = mock_es_response(mock_search, [mock_hit])
+        return search, self.client.get(self.url, {'q': 'toner', **params})
+
+    def test_filter_query(self):
+        """가격 범위/브랜드는 filter, EWG 상한/제외 성분은 must_not (점수 계산 없음)"""
+        from .filters import parse_search_filters
+        filters = parse_search_filters({
+            'min_price': '10000', 'max_price': '20000', 'brand': '3,1', 'max_ewg': '3', 'exclude_ingredient': '7',
+        })
+        query = filters.to_query().to_dict()['bool']
+
+        self.assertEqual(query['filter'], [
+            {'range': {'price': {'gte': 10000, 'lte': 20000}}},
+            {'terms': {'brand.id': [1, 3]}},
+        ])
+        self.assertEqual(query['must_not'][0], {'range': {'max_ewg_score': {'gt': 3}}})
+        self.assertEqual(query['must_not'][1]['nested']['query'], {'terms': {'ingredients.id': [7]}})
+        self.assertIsNone(parse_search_filters({}).to_query())
+
+    def test_invalid_filters(self):
+        """숫자가 아니거나 범위를 벗어난 필터는 400"""
+        for params in ({'min_price': 'abc'}, {'max_ewg': '11'}, {'brand': '1,x'},
+                       {'min_price': '20000', 'max_price': '10000'}, {'exclude_ingredient': '-1'},
+                       {'sort': 'price'}):
+            response = self.client.get(self.url, {'q': 'toner', **params})
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
+
+    @patch('products.views.ProductDocument.search')
+    def test_filters_applied_and_cached_separately(self, mock_search):
+        """필터는 ES filter로 전달되고, 필터마다 다른 캐시 키 (ID 순서는 무관)"""
+        search, _ = self._search(mock_search, {'brand': '1,2'})
+        self.assertEqual(search.filter.call_count, 1)
+
+        self._search(mock_search, {'brand': '2,1'})
+        self.assertEqual(mock_search.call_count, 1)
+
+        self._search(mock_search, {'brand': '1'})
+        self.assertEqual(mock_search.call_count, 2)
+
+        search, _ = self._search(mock_search, {})
+        search.filter.assert_not_called()
+
+    @patch('products.views.ProductDocument.search')
+    def test_facets_on_first_page(self, mock_search):
+        """첫 페이지 응답에만 같은 ES 요청의 집계 결과를 패싯으로 포함"""
+        mock_hit = MagicMock()
+        mock_hit.meta.id = self.product.id
+        search = mock_es_response(mock_search, [mock_hit], total=40)
+        aggregations = search.execute.return_value.aggregations
+        brand_name = MagicMock(key='Innisfree')
+        aggregations.brands.buckets = [MagicMock(key=self.brand.id, doc_count=40, **{'name.buckets': [brand_name]})]
+        aggregations.price.buckets = [MagicMock(key=10000.0, doc_count=40)]
+        aggregations.ewg.buckets = [MagicMock(key=3, doc_count=5), MagicMock(key=1, doc_count=35)]
+
+        first = self.client.get(self.url, {'q': 'toner'})
+        second = self.client.get(self.url, {'q': 'toner', 'page': 2})
+
+        self.assertEqual(first.data['facets'], {
+            'brands': [{'id': self.brand.id, 'name': 'Innisfree', 'count': 40}],
+            'price': [{'from': 10000, 'to': 20000, 'count': 40}],
+            'ewg': [{'score': 1, 'count': 35}, {'score': 3, 'count': 5}],
+        })
+        self.assertNotIn('facets', second.data)
+
+
+class ProductSafetyAggregateTests(TestCase):
+    """상품 성분 안전도 집계(비정규화) 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        cache.clear()
+        self.brand = Brand.objects.create(name="Innisfree")
+        self.product = Product.objects.create(name="Green Tea Toner", brand=self.brand, price=15000)
+        self.mild = Ingredient.objects.create(name="Green Tea Extract", ewg_score=1)
+        self.moderate = Ingredient.objects.create(name="Fragrance", ewg_score=4)
+        self.hazard = Ingredient.objects.create(name="BHT", ewg_score=8)
+
+    def _reload(self):
+        return Product.objects.get(pk=self.product.pk)
+
+    def test_ingredient_set_change(self):
+        """성분 추가/제거 시 최대/평균 등급, 성분 수, 유해 성분 여부 갱신"""
+        self.product.ingredients.add(self.mild, self.moderate)
+        self.assertEqual(self.product.max_ewg_score, 4)  # 같은 인스턴스에도 반영
+
+        product = self._reload()
+        self.assertEqual((product.max_ewg_score, product.avg_ewg_score, product.ingredient_count), (4, 2.5, 2))
+        self.assertFalse(product.has_hazardous_ingredient)
+
+        self.hazard.products.add(self.product)
+        self.assertTrue(self._reload().has_hazardous_ingredient)
+
+        self.product.ingredients.clear()
+        product = self._reload()
+        self.assertEqual((product.max_ewg_score, product.avg_ewg_score, product.ingredient_count), (None, None, 0))
+
+    def test_ewg_score_change_and_delete(self):
+        """성분 EWG 등급 변경/성분 삭제 시 해당 성분을 가진 상품 재계산 (다른 필드 수정은 재계산 안 함)"""
+        self.product.ingredients.add(self.mild, self.moderate)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.moderate.ewg_score = 9
+            self.moderate.save()
+        self.assertEqual(self._reload().max_ewg_score, 9)
+
+        with patch('products.index_sync.recompute_safety') as recompute:
+            with self.captureOnCommitCallbacks(execute=True):
+                ingredient = Ingredient.objects.get(pk=self.moderate.pk)
+                ingredient.description = "향료"
+                ingredient.save()
+        recompute.assert_not_called()
+
+        self.moderate.delete()
+        product = self._reload()
+        self.assertEqual((product.max_ewg_score, product.ingredient_count), (1, 1))
+
+    def test_reverse_clear(self):
+        """ingredient.products.clear()도 연결이 지워진 뒤 재계산"""
+        self.product.ingredients.add(self.hazard)
+        self.hazard.products.clear()
+        self.assertFalse(self._reload().has_hazardous_ingredient)
+
+    def test_stale_instance_does_not_overwrite(self):
+        """성분 변경 전에 읽어 둔 인스턴스를 저장해도 집계는 유지"""
+        stale = self._reload()
+        self.product.ingredients.add(self.hazard)
+
+        stale.price = 20000
+        stale.save()
+
+        product = self._reload()
+        self.assertEqual(product.price, 20000)
+        self.assertEqual(product.max_ewg_score, 8)
+
+    def test_recompute_matches_python_values(self):
+        """연결 테이블 그룹 집계와 seed_data용 Python 계산이 같은 값"""
+        from .safety import recompute_safety, safety_values
+        Product.ingredients.through.objects.bulk_create([
+            Product.ingredients.through(product_id=self.product.pk, ingredient_id=i.pk)
+            for i in (self.mild, self.moderate, self.hazard)
+        ])
+        computed = recompute_safety([self.product.pk])
+
+        self.assertEqual(computed[self.product.pk], safety_values([1, 4, 8]))
+        self.assertEqual(self._reload().avg_ewg_score, 4.33)
+
+    @patch('products.views.ProductDocument.search')
+    def test_safety_sort(self, mock_search):
+        """sort=safety는 비정규화 필드 정렬 후 점수순 (nested 정렬 없음)"""
+        mock_hit = MagicMock()
+        mock_hit.meta.id = self.product.id
+        search = mock_es_response(mock_search, [mock_hit])
+
+        response = APIClient().get(reverse('product-search'), {'q': 'toner', 'sort': 'safety'})
+
+        self.assertEqual(response.status_code, 200)
+        search.sort.assert_called_once_with(
+            {'max_ewg_score': {'order': 'asc', 'missing': '_last'}},
+            {'avg_ewg_score': {'order': 'asc', 'missing': '_last'}},
+            '_score',
+        )
+        self.assertIn('max_ewg_score', response.data['results'][0])
+
+
+def mock_suggest_response(mock_search, texts):
+    """ProductDocument.search().suggest(...) 체인 모킹 (completion 후보 texts)"""
+    search = MagicMock()
+    for method in ('suggest', 'source', 'extra'):
+        getattr(search, method).return_value = search
+    response = MagicMock()
+    response.suggest.__getitem__.return_value.__getitem__.return_value.options = [
+        MagicMock(text=text) for text in texts
+    ]
+    search.execute.return_value = response
+    mock_search.return_value = search
+    return search
+
+
+class SuggestAPITests(TestCase):
+    """검색어 자동완성 API 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        from .local_cache import get_suggest_l1
+        from .ranking import ranking_key
+        self.client = APIClient()
+        self.url = reverse('product-suggest')
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.delete(ranking_key())
+        get_suggest_l1().clear()
+
+    def _rank(self, keyword, score):
+        from .ranking import ranking_key
+        self.redis_conn.zadd(ranking_key(), {keyword: score})
+
+    @patch('products.suggest.ProductDocument.search')
+    def test_popular_keywords_first(self, mock_search):
+        """접두어가 맞는 인기 검색어를 점수순으로 먼저, 나머지는 카탈로그 후보 (정규화 기준 중복 제거)"""
+        self._rank('green tea', 50)
+        self._rank('Green Tea Toner', 80)
+        self._rank('cream', 100)
+        search = mock_suggest_response(mock_search, ['green tea toner', 'Green Tea Extract'])
+
+        response = self.client.get(self.url, {'q': 'Gre'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['query'], 'gre')
+        self.assertEqual(response.data['suggestions'], [
+            {'text': 'Green Tea Toner', 'source': 'ranking'},
+            {'text': 'green tea', 'source': 'ranking'},
+            {'text': 'Green Tea Extract', 'source': 'catalog'},
+        ])
+        args, kwargs = search.suggest.call_args
+        self.assertEqual(args, ('names', 'gre'))
+        self.assertEqual(kwargs['completion']['field'], 'suggest')
+
+    @patch('products.suggest.ProductDocument.search')
+    def test_short_prefix_cache(self, mock_search):
+        """짧은 접두어 결과만 워커 메모리에 보관"""
+        from django.test import override_settings
+        mock_suggest_response(mock_search, ['Green Tea Toner'])
+
+        with override_settings(SEARCH_LOCAL_CACHE={**settings.SEARCH_LOCAL_CACHE, 'ENABLED': True}):
+            for q in ('gr', 'gr', 'green', 'green'):
+                self.client.get(self.url, {'q': q})
+
+        # gr: 1번, green: 2번
+        self.assertEqual(mock_search.call_count, 3)
+
+    @patch('products.suggest.ProductDocument.search')
+    def test_es_failure_returns_ranking_only(self, mock_search):
+        """ES 장애 시 인기 검색어만으로 응답하고 결과는 캐시하지 않음"""
+        from django.test import override_settings
+        from elasticsearch.exceptions import ConnectionError as ESConnectionError
+        self._rank('green tea', 10)
+        mock_search.return_value.suggest.return_value.source.return_value.extra.return_value \
+            .execute.side_effect = ESConnectionError('N/A', 'Connection error', 'Connection refused')
+
+        with override_settings(SEARCH_LOCAL_CACHE={**settings.SEARCH_LOCAL_CACHE, 'ENABLED': True}):
+            first = self.client.get(self.url, {'q': 'g'})
+            self.client.get(self.url, {'q': 'g'})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['suggestions'], [{'text': 'green tea', 'source': 'ranking'}])
+        self.assertEqual(mock_search.call_count, 2)
+
+    @patch('products.suggest.ProductDocument.search')
+    def test_does_not_count_ranking(self, mock_search):
+        """키 입력마다 호출되므로 랭킹 점수는 올리지 않음"""
+        from .ranking import ranking_key
+        mock_suggest_response(mock_search, [])
+        self.client.get(self.url, {'q': 'toner'})
+        self.assertIsNone(self.redis_conn.zscore(ranking_key(), 'toner'))
+
+    def test_invalid_prefix(self):
+        """빈 접두어/길이 초과는 400"""
+        self.assertEqual(self.client.get(self.url, {'q': '  '}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'a' * 51}).status_code, 400)
+
+
+class SearchQueryTests(TestCase):
+    """정확/구문 일치 우선 검색 + 오타 허용 폴백 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.client = APIClient()
+        cache.clear()
+        brand = Brand.objects.create(name="Innisfree")
+        self.product = Product.objects.create(name="수분크림", brand=brand, price=15000)
+        self.url = reverse('product-search')
+
+    def _queries(self, mock_search):
+        """ES에 보낸 점수 계산 쿼리 (요청 순서대로)"""
+        return [call.args[0].to_dict() for call in mock_search.return_value.query.call_args_list]
+
+    def test_primary_query_has_no_fuzziness(self):
+        """정확 검색은 구문 일치 가중치가 가장 크고 fuzzy 없음, 성분명은 nested 쿼리"""
+        import json
+        from .analysis import build_search_query
+        query = build_search_query('수분 크림').to_dict()
+        should = query['bool']['should']
+
+        self.assertNotIn('fuzziness', json.dumps(query))
+        self.assertEqual(should[0]['multi_match']['type'], 'phrase')
+        self.assertEqual(max(clause.get('multi_match', {}).get('boost', 0) for clause in should), 4)
+        self.assertEqual(should[-1]['nested']['path'], 'ingredients')
+
+    @patch('products.views.ProductDocument.search')
+    def test_fuzzy_only_when_no_results(self, mock_search):
+        """정확 검색 결과가 있으면 한 번, 없으면 오타 허용 검색으로 한 번 더"""
+        mock_hit = MagicMock()
+        mock_hit.meta.id = self.product.id
+        mock_es_response(mock_search, [mock_hit])
+        self.client.get(self.url, {'q': '수분크림'})
+        self.assertEqual(len(self._queries(mock_search)), 1)
+
+        mock_search.reset_mock()
+        mock_es_response(mock_search, [])
+        self.client.get(self.url, {'q': '수뷴크림'})
+        queries = self._queries(mock_search)
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('fuzziness', str(queries[0]))
+        self.assertIn('fuzziness', str(queries[1]))
+
+    @patch('products.views.ProductDocument.search')
+    def test_fuzzy_cursor_continues_with_fuzzy(self, mock_search):
+        """오타 허용 결과의 커서로 다음 페이지를 요청하면 정확 검색 없이 오타 허용 검색만"""
+        from urllib.parse import parse_qs, urlparse
+        from .analysis import FUZZY_CURSOR_MARK
+        from .pagination import SearchPagination
+        mock_hit = MagicMock()
+        mock_hit.meta.id = self.product.id
+        mock_hit.meta.sort = [1.5, self.product.id]
+        search = mock_es_response(mock_search, [mock_hit])
+        # 정확 검색은 빈 결과, 오타 허용 검색은 hit 하나
+        empty = MagicMock()
+        empty.__iter__.side_effect = lambda: iter([])
+        search.execute.side_effect = [empty, search.execute.return_value]
+
+        first = self.client.get(self.url, {'q': '수뷴크림', 'cursor': '', 'page_size': 1})
+        cursor = parse_qs(urlparse(first.data['next']).query)['cursor'][0]
+        self.assertEqual(SearchPagination.encode_cursor([1.5, self.product.id, FUZZY_CURSOR_MARK]), cursor)
+
+        mock_search.reset_mock()
+        search.execute.side_effect = None
+        self.client.get(self.url, {'q': '수뷴크림', 'cursor': cursor, 'page_size': 1})
+        queries = self._queries(mock_search)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('fuzziness', str(queries[0]))
+        _, kwargs = search.extra.call_args
+        self.assertEqual(kwargs, {'search_after': [1.5, self.product.id]})
+
+
+def es_raw_response(product_ids, total=None):
+    """AsyncElasticsearch.search()가 돌려주는 원본 응답 dict (패싯 집계는 빈 버킷)"""
+    return {
+        'took': 1,
+        'timed_out': False,
+        'hits': {
+            'total': {'value': len(product_ids) if total is None else total, 'relation': 'eq'},
+            'max_score': 1.0,
+            'hits': [
+                {'_index': 'products', '_id': str(pk), '_score': 1.0, '_source': {}, 'sort': [1.0, pk]}
+                for pk in product_ids
+            ],
+        },
+        'aggregations': {
+            'brands': {'buckets': []},
+            'price': {'buckets': []},
+            'ewg': {'buckets': []},
+        },
+    }
+
+
+class AsyncSearchAPITests(TestCase):
+    """비동기(ASGI) 검색 API 테스트 (AsyncElasticsearch 모킹, redis.asyncio는 실제 캐시 Redis 사용)"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        from .ranking import ranking_key
+        self.client = APIClient()
+        self.url = reverse('product-search-async')
+        cache.clear()
+        get_redis_connection("default").delete(ranking_key())
+        brand = Brand.objects.create(name="Innisfree")
+        self.product1 = Product.objects.create(name="Green Tea Toner", brand=brand, price=15000)
+        self.product2 = Product.objects.create(name="Green Tea Cream", brand=brand, price=25000)
+
+    def _mock_es(self, mock_get_es, *responses):
+        from unittest.mock import AsyncMock
+        es = MagicMock()
+        es.search = AsyncMock(side_effect=list(responses))
+        mock_get_es.return_value = es
+        return es
+
+    @patch('products.async_search.get_async_es')
+    def test_same_response_as_sync_search(self, mock_get_es):
+        """ES 순서대로 MySQL에서 조회해 동기 검색과 같은 응답 본문"""
+        es = self._mock_es(mock_get_es, es_raw_response([self.product2.id, self.product1.id]))
+
+        response = self.client.get(self.url, {'q': 'green tea'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([item['id'] for item in data['results']], [self.product2.id, self.product1.id])
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['facets'], {'brands': [], 'price': [], 'ewg': []})
+        self.assertEqual(data['results'][0]['brand']['name'], 'Innisfree')
+        body = es.search.call_args.kwargs['body']
+        self.assertIn('aggs', body)
+        self.assertTrue(body['track_total_hits'])
+
+    @patch('products.async_search.get_async_es')
+    def test_cache_hit_and_ranking(self, mock_get_es):
+        """두 번째 요청은 redis.asyncio 캐시 히트 (ES 1회), 랭킹은 요청마다 증가"""
+        from .ranking import ranking_key
+        es = self._mock_es(mock_get_es, es_raw_response([self.product1.id]))
+
+        first = self.client.get(self.url, {'q': 'toner'})
+        second = self.client.get(self.url, {'q': 'toner'})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(es.search.await_count, 1)
+        self.assertEqual(get_redis_connection("default").zscore(ranking_key(), 'toner'), 2)
+
+    @patch('products.async_search.get_async_es')
+    def test_shares_cache_with_sync_search(self, mock_get_es):
+        """동기 검색이 저장한 결과를 그대로 사용 (같은 캐시 키/엔트리 형식)"""
+        es = self._mock_es(mock_get_es)
+        with patch('products.views.ProductDocument.search') as mock_search:
+            mock_hit = MagicMock()
+            mock_hit.meta.id = self.product1.id
+            mock_es_response(mock_search, [mock_hit])
+            sync_response = self.client.get(reverse('product-search'), {'q': 'toner'})
+
+        async_response = self.client.get(self.url, {'q': 'toner'})
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+        es.search.assert_not_awaited()
+
+    @patch('products.async_search.get_async_es')
+    def test_fuzzy_fallback(self, mock_get_es):
+        """정확 검색 결과가 없으면 오타 허용 쿼리로 한 번 더 검색"""
+        es = self._mock_es(mock_get_es, es_raw_response([]), es_raw_response([self.product1.id]))
+
+        response = self.client.get(self.url, {'q': 'grean'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()['results']], [self.product1.id])
+        self.assertEqual(es.search.await_count, 2)
+
+    @patch('products.async_search.get_async_es')
+    def test_es_connection_error(self, mock_get_es):
+        """ES 연결 실패는 503 (결과는 캐싱하지 않음)"""
+        from elasticsearch.exceptions import ConnectionError as ESConnectionError
+        self._mock_es(mock_get_es, ESConnectionError('N/A', 'Connection error', 'Connection refused'))
+
+        response = self.client.get(self.url, {'q': 'toner'})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['error'], 'Elasticsearch 서비스에 연결할 수 없습니다.')
+
+    @patch('products.async_search.get_async_es')
+    def test_breaker_redis_calls_off_event_loop(self, mock_get_es):
+        """ES 차단기의 상태 공유(동기 Redis 호출)는 이벤트 루프 밖 스레드에서 실행"""
+        import asyncio
+        from django.test import override_settings
+        from elasticsearch.exceptions import ConnectionError as ESConnectionError
+        from .resilience import get_breaker
+        breaker = get_breaker('elasticsearch')
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+        self._mock_es(mock_get_es, *[ESConnectionError('N/A', 'Connection error', 'Connection refused')] * 2)
+        on_loop = []
+
+        def connection(alias):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return get_redis_connection(alias)
+
+        with override_settings(SEARCH_RESILIENCE={**settings.SEARCH_RESILIENCE, 'BREAKER_ENABLED': True,
+                                                  'FAILURE_THRESHOLD': 2}), \
+                patch('products.resilience.get_redis_connection', side_effect=connection):
+            for _ in range(2):
+                self.assertEqual(self.client.get(self.url, {'q': 'toner'}).status_code, 503)
+            self.assertEqual(breaker.state, 'open')
+
+        self.assertTrue(on_loop)
+        self.assertNotIn(True, on_loop)
+
+    def test_validation(self):
+        """검증 규칙은 동기 검색과 같음"""
+        self.assertEqual(self.client.get(self.url, {'q': ''}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'a' * 101}).status_code, 400)
+        response = self.client.get(self.url, {'q': 'toner', 'max_ewg': '11'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('max_ewg', response.json()['error'])
+
+    @patch('products.async_search.get_async_es')
+    def test_server_timing_header(self, mock_get_es):
+        """비동기 뷰도 단계별 시간(스레드에서 실행한 db/serialize 포함)을 Server-Timing에 기록"""
+        self._mock_es(mock_get_es, es_raw_response([self.product1.id]))
+
+        response = self.client.get(self.url, {'q': 'toner'})
+
+        for name in ('validation', 'cache', 'es', 'db', 'serialize', 'total'):
+            self.assertIn(f'{name};dur=', response['Server-Timing'])
+
+
+class SearchResilienceTests(TestCase):
+    """의존 서비스 차단기, 요청 마감 시간, ES 차단 중 대체 응답 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정 (차단기는 임계치 2로 켬)"""
+        from django.test import override_settings
+        from .resilience import get_breaker
+        self.client = APIClient()
+        self.url = reverse('product-search')
+        cache.clear()
+        for name in ('elasticsearch', 'redis'):
+            get_breaker(name).reset()
+            self.addCleanup(get_breaker(name).reset)
+        self.breaker = get_breaker('elasticsearch')
+        enabled = override_settings(SEARCH_RESILIENCE={
+            **settings.SEARCH_RESILIENCE, 'BREAKER_ENABLED': True, 'FAILURE_THRESHOLD': 2,
+        })
+        enabled.enable()
+        self.addCleanup(enabled.disable)
+
+        brand = Brand.objects.create(name="Innisfree")
+        self.toner = Product.objects.create(name="Green Tea Toner", brand=brand, price=15000)
+        self.cream = Product.objects.create(name="Green Tea Cream", brand=brand, price=25000)
+        Product.objects.create(name="Aloe Gel", brand=brand, price=9000)
+
+    def _connection_error(self):
+        from elasticsearch.exceptions import ConnectionError as ESConnectionError
+        return ESConnectionError('N/A', 'Connection error', 'Connection refused')
+
+    @patch('products.views.ProductDocument.search')
+    def test_open_breaker_falls_back_to_mysql(self, mock_search):
+        """실패가 임계치에 닿으면 ES를 호출하지 않고 MySQL 상품명 검색(필터 적용)으로 응답"""
+        search = mock_es_response(mock_search, [])
+        search.execute.side_effect = self._connection_error()
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.url, {'q': 'green tea'}).status_code, 503)
+        self.assertEqual(self.breaker.state, 'open')
+        calls = search.execute.call_count
+
+        response = self.client.get(self.url, {'q': 'Green Tea', 'max_price': 20000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(search.execute.call_count, calls)
+        data = response.json()
+        self.assertEqual(data['degraded'], 'database')
+        self.assertEqual([item['id'] for item in data['results']], [self.toner.id])
+        self.assertEqual(data['count'], 1)
+        self.assertNotIn('facets', data)
+
+    @patch('products.views.ProductDocument.search')
+    def test_breaker_state_shared_between_workers(self, mock_search):
+        """다른 워커가 연 차단도 따르고, 이전 카탈로그 버전의 캐시가 있으면 그 결과로 응답"""
+        from .resilience import CircuitBreaker
+        from .search_cache import bump_catalog_version, make_cache_entry
+        stale = {'count': 1, 'next': None, 'previous': None, 'results': [{'id': self.cream.id}]}
+        cache.set(
+            build_search_cache_key('green tea', {'page': 1, 'page_size': 20}, version=get_catalog_version()),
+            make_cache_entry(stale, soft_ttl=60, delta=0.1), timeout=120
+        )
+        bump_catalog_version()
+        other_worker = CircuitBreaker('elasticsearch')
+        other_worker.record_failure()
+        other_worker.record_failure()
+
+        response = self.client.get(self.url, {'q': 'green tea'})
+
+        self.assertEqual(response.status_code, 200)
+        mock_search.assert_not_called()
+        self.assertEqual(response.json(), {**stale, 'degraded': 'stale'})
+
+    def test_half_open_allows_single_probe(self):
+        """차단 시간이 지나면 한 요청만 시험 호출, 성공하면 닫히고 실패하면 다시 차단"""
+        import time
+        from django.test import override_settings
+        from .resilience import CircuitBreaker
+        with override_settings(SEARCH_RESILIENCE={**settings.SEARCH_RESILIENCE, 'OPEN_SECONDS': 0.05}):
+            breaker = CircuitBreaker('probe-test')
+            self.addCleanup(breaker.reset)
+            breaker.record_failure()
+            breaker.record_failure()
+            self.assertFalse(breaker.allow())
+
+            time.sleep(0.06)
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'open')
+
+            time.sleep(0.06)
+            self.assertTrue(breaker.allow())
+            breaker.record_success()
+            self.assertEqual(breaker.state, 'closed')
+            self.assertTrue(breaker.allow())
+
+    @patch('products.views.ProductDocument.search')
+    def test_db_stage_timeout_hint(self, mock_search):
+        """MySQL이면 검색의 SELECT마다 db 단계 예산을 MAX_EXECUTION_TIME 힌트로 붙임"""
+        from django.db import connections
+        from django.db.backends.utils import CursorWrapper
+        hit = MagicMock()
+        hit.meta.id = self.toner.id
+        mock_es_response(mock_search, [hit])
+        executed = []
+        original = CursorWrapper._execute
+
+        def capture(cursor, sql, *args):
+            # execute_wrapper를 거친 뒤 실제로 실행되는 SQL
+            executed.append(sql)
+            return original(cursor, sql, *args)
+
+        with patch.object(connections['default'], 'vendor', 'mysql'), patch.object(CursorWrapper, '_execute', capture):
+            response = self.client.get(self.url, {'q': 'toner'})
+
+        self.assertEqual(response.status_code, 200)
+        selects = [sql for sql in executed if 'products_product' in sql]
+        self.assertTrue(selects)
+        for sql in selects:
+            # 예산 1500ms * db 비율 0.4 이하
+            limit = int(sql.split('MAX_EXECUTION_TIME(')[1].split(')')[0])
+            self.assertLessEqual(limit, 600)
+            self.assertGreater(limit, 0)
+
+    def test_background_refresh_has_own_deadline(self):
+        """백그라운드 갱신은 요청 컨텍스트를 복사해 실행하고, 자체 마감 시간 안에서 단계 타임아웃을 받음"""
+        import contextvars
+        import threading
+        from .refresh import refresh_in_background
+        from .resilience import remaining_budget, stage_timeout
+        marker = contextvars.ContextVar('refresh_marker', default=None)
+        marker.set('request')
+        done = threading.Event()
+        seen = {}
+
+        def compute():
+            seen.update(marker=marker.get(), budget=remaining_budget(), db=stage_timeout('db'))
+            done.set()
+
+        self.assertTrue(refresh_in_background('search:v0:deadline-test', compute))
+        self.assertTrue(done.wait(5))
+        self.assertEqual(seen['marker'], 'request')
+        self.assertIsNotNone(seen['budget'])
+        self.assertAlmostEqual(seen['db'], 0.6, places=2)
+
+    def test_background_refresh_not_timed_in_request(self):
+        """백그라운드 갱신의 단계 시간은 예약한 요청의 수집기에 기록되지 않음"""
+        import threading
+        from .refresh import refresh_in_background
+        from .timing import collect_stages, stage
+        get_redis_connection("default").delete('refresh:search:v0:timing-test')
+        done = threading.Event()
+
+        def compute():
+            with stage('es'):
+                pass
+            done.set()
+
+        with collect_stages() as timings:
+            with stage('cache'):
+                self.assertTrue(refresh_in_background('search:v0:timing-test', compute))
+            self.assertTrue(done.wait(5))
+        self.assertIn('cache', timings)
+        self.assertNotIn('es', timings)
+
+    def test_side_path_probe_closes_breaker(self):
+        """부가 경로(상품 조각 MGET)가 시험 호출을 가져가도 결과를 기록해 닫힘 (예외가 나도 시험 호출이 남지 않음)"""
+        import time
+        from django.test import override_settings
+        from .fragments import _fetch
+        from .resilience import get_breaker
+        redis_breaker = get_breaker('redis')
+        with override_settings(SEARCH_RESILIENCE={**settings.SEARCH_RESILIENCE, 'OPEN_SECONDS': 0.05}):
+            redis_breaker.record_failure()
+            redis_breaker.record_failure()
+            self.assertEqual(redis_breaker.state, 'open')
+            self.assertEqual(_fetch([[self.toner.id, 1]]), {})
+
+            time.sleep(0.06)
+            self.assertEqual(redis_breaker.state, 'half_open')
+            # Redis가 응답했지만 예상하지 못한 오류여도 시험 호출은 끝남
+            with patch('products.fragments.get_redis_connection', side_effect=ValueError('bad reply')):
+                self.assertEqual(_fetch([[self.toner.id, 1]]), {})
+            self.assertEqual(redis_breaker.state, 'closed')
+
+            redis_breaker.record_failure()
+            redis_breaker.record_failure()
+            time.sleep(0.06)
+            self.assertEqual(_fetch([[self.toner.id, 1]]), {})
+            self.assertEqual(redis_breaker.state, 'closed')
+            self.assertTrue(redis_breaker.allow())
+
+    @patch('products.views.ProductDocument.search')
+    def test_es_timeout_from_request_deadline(self, mock_search):
+        """ES 요청 타임아웃은 요청 예산 * ES 단계 비율 이하, 잘못된 쿼리(4xx)는 실패로 세지 않음"""
+        from elasticsearch.exceptions import RequestError
+        from django.test import override_settings
+        hit = MagicMock()
+        hit.meta.id = self.toner.id
+        search = mock_es_response(mock_search, [hit])
+
+        with override_settings(SEARCH_RESILIENCE={**settings.SEARCH_RESILIENCE, 'DEADLINE_MS': 1000}):
+            self.assertEqual(self.client.get(self.url, {'q': 'toner'}).status_code, 200)
+        timeout = search.params.call_args.kwargs['request_timeout']
+        self.assertGreater(timeout, 0)
+        self.assertLessEqual(timeout, 0.6)
+
+        search.execute.side_effect = RequestError(400, 'search_phase_execution_exception', {})
+        for page in (1, 2):
+            self.assertEqual(self.client.get(self.url, {'q': 'cream', 'page': page}).status_code, 500)
+        self.assertEqual(self.breaker.state, 'closed')
+
+    @patch('products.views.ProductDocument.search')
+    def test_open_redis_breaker_skips_cache_and_ranking(self, mock_search):
+        """Redis 차단 중에는 캐시 조회/랭킹 집계 없이 검색만 진행"""
+        from .ranking import ranking_key
+        from .resilience import get_breaker
+        hit = MagicMock()
+        hit.meta.id = self.toner.id
+        mock_es_response(mock_search, [hit])
+        get_redis_connection("default").delete(ranking_key())
+        redis_breaker = get_breaker('redis')
+        redis_breaker.record_failure()
+        redis_breaker.record_failure()
+
+        with patch('products.views.lookup_search_cache') as mock_lookup:
+            response = self.client.get(self.url, {'q': 'toner'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()['results']], [self.toner.id])
+        mock_lookup.assert_not_called()
+        self.assertIsNone(get_redis_connection("default").zscore(ranking_key(), 'toner'))
+
+    def test_async_search_falls_back(self):
+        """비동기 검색도 ES 차단 중에는 같은 대체 응답"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        with patch('products.async_search.get_async_es') as mock_get_es:
+            response = self.client.get(reverse('product-search-async'), {'q': 'aloe'})
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_es.assert_not_called()
+        data = response.json()
+        self.assertEqual(data['degraded'], 'database')
+        self.assertEqual(len(data['results']), 1)
+
+
+class SearchCacheCodecTests(TestCase):
+    """검색 캐시 엔트리 직렬화(SEARCH_CACHE_CODEC) 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정 (성분 여러 개인 상품으로 실제 크기의 페이지 구성)"""
+        self.client = APIClient()
+        self.url = reverse('product-search')
+        cache.clear()
+        brand = Brand.objects.create(name="이니스프리")
+        ingredients = [Ingredient.objects.create(name=f"녹차 추출물 {i}", ewg_score=i % 10 + 1) for i in range(8)]
+        self.products = []
+        for i in range(20):
+            product = Product.objects.create(name=f"그린티 토너 {i}", brand=brand, price=15000 + i)
+            product.ingredients.set(ingredients)
+            self.products.append(product)
+
+    def _hits(self, mock_search):
+        hits = []
+        for product in self.products:
+            hit = MagicMock()
+            hit.meta.id = product.id
+            hits.append(hit)
+        mock_es_response(mock_search, hits)
+
+    def _stored(self, keyword):
+        cache_key = build_search_cache_key(keyword, {'page': 1, 'page_size': 20}, version=get_catalog_version())
+        return get_redis_connection("default").get(cache.make_key(cache_key))
+
+    @patch('products.views.ProductDocument.search')
+    def test_hit_returns_prerendered_json(self, mock_search):
+        """히트는 저장된 JSON 본문을 그대로 응답 (미스 응답과 바이트 단위로 같음), 저장 크기는 pickle보다 작음"""
+        import pickle
+        from .cache_codec import MAGIC
+        self._hits(mock_search)
+
+        miss = self.client.get(self.url, {'q': '그린티'})
+        hit = self.client.get(self.url, {'q': '그린티'})
+
+        self.assertEqual(mock_search.call_count, 1)
+        self.assertEqual(hit['Content-Type'], 'application/json')
+        self.assertEqual(hit.content, miss.content)
+        stored = self._stored('그린티')
+        self.assertTrue(stored.startswith(MAGIC))
+        from .fragments import expand_page
+        entry = cache.get(build_search_cache_key('그린티', {'page': 1, 'page_size': 20},
+                                                 version=get_catalog_version()))
+        self.assertEqual(expand_page(entry['data']), miss.json())
+        pickled = pickle.dumps({**entry, 'data': miss.data}, pickle.DEFAULT_PROTOCOL)
+        self.assertLess(len(stored), len(pickled) / 2)
+
+    @patch('products.views.ProductDocument.search')
+    def test_hit_matches_miss_with_line_separator(self, mock_search):
+        """U+2028/U+2029가 든 상품명도 히트와 미스 응답이 같은 DRF Response, 같은 바이트 (동기/비동기)"""
+        from django.test import override_settings
+        from rest_framework.response import Response
+        Product.objects.filter(id=self.products[0].id).update(name="그린티 토너 ")
+        self._hits(mock_search)
+
+        for enabled in (False, True):
+            cache.clear()
+            with override_settings(SEARCH_FRAGMENT_CACHE={**settings.SEARCH_FRAGMENT_CACHE, 'ENABLED': enabled}):
+                miss = self.client.get(self.url, {'q': '그린티'})
+                hit = self.client.get(self.url, {'q': '그린티'})
+                async_hit = self.client.get(reverse('product-search-async'), {'q': '그린티'})
+
+            self.assertIsInstance(miss, Response)
+            self.assertIsInstance(hit, Response)
+            self.assertIn(b'\\u2028', miss.content)
+            self.assertNotIn(' '.encode(), hit.content)
+            self.assertEqual(hit.content, miss.content)
+            self.assertEqual(hit['Content-Type'], miss['Content-Type'])
+            self.assertEqual(async_hit.content, miss.content)
+            self.assertEqual(hit.data, miss.json())
+
+    def test_compression_threshold(self):
+        """본문이 COMPRESS_MIN_BYTES 미만이면 압축하지 않고, 디코딩 결과는 같은 데이터"""
+        from .cache_codec import decode_entry, encode_entry
+        from .search_cache import make_cache_entry
+        small = make_cache_entry({'count': 0, 'next': None, 'previous': None, 'results': []}, soft_ttl=60, delta=0.1)
+        large = make_cache_entry({'count': 1, 'results': [{'name': '녹차 ' * 500}]}, soft_ttl=60, delta=0.1)
+
+        small_frame, small_size = encode_entry(small, 'json', 'zlib', 1024)
+        large_frame, large_size = encode_entry(large, 'json', 'zlib', 1024)
+
+        self.assertGreater(len(small_frame), small_size)
+        self.assertLess(len(large_frame), large_size / 10)
+        for entry, frame in ((small, small_frame), (large, large_frame)):
+            decoded = decode_entry(frame)
+            self.assertEqual(decoded['data'], entry['data'])
+            self.assertEqual(decoded['soft_expires_at'], entry['soft_expires_at'])
+
+    @patch('products.views.ProductDocument.search')
+    def test_pickled_entries_still_readable(self, mock_search):
+        """FORMAT=pickle은 기존 방식으로 저장하고, 형식이 바뀌어도 이전 엔트리를 그대로 읽음"""
+        from django.test import override_settings
+        from .cache_codec import MAGIC
+        self._hits(mock_search)
+        with override_settings(SEARCH_CACHE_CODEC={**settings.SEARCH_CACHE_CODEC, 'FORMAT': 'pickle'}):
+            first = self.client.get(self.url, {'q': '토너'})
+        self.assertFalse(self._stored('토너').startswith(MAGIC))
+
+        second = self.client.get(self.url, {'q': '토너'})
+
+        self.assertEqual(mock_search.call_count, 1)
+        self.assertEqual(second.json(), first.json())
+
+    @patch('products.views.ProductDocument.search')
+    def test_codec_metrics(self, mock_search):
+        """인코딩/디코딩 시간과 압축 전/저장 크기를 /metrics에 노출"""
+        from django.test import override_settings
+        from .metrics import codec_durations, payload_sizes
+        for histogram in (*codec_durations.values(), *payload_sizes.values()):
+            histogram.reset()
+        self._hits(mock_search)
+
+        # 압축 대상이 되도록 페이지 전체를 저장 (조각 캐시면 ID 목록만 저장)
+        with override_settings(SEARCH_FRAGMENT_CACHE={**settings.SEARCH_FRAGMENT_CACHE, 'ENABLED': False}):
+            self.client.get(self.url, {'q': '그린티'})
+            self.client.get(self.url, {'q': '그린티'})
+        body = self.client.get('/metrics').content.decode()
+
+        self.assertIn('purepick_cache_codec_duration_seconds_count{op="encode"} 1', body)
+        self.assertIn('purepick_cache_codec_duration_seconds_count{op="decode"} 1', body)
+        self.assertIn('purepick_cache_payload_bytes_count{size="stored"} 1', body)
+        self.assertGreater(payload_sizes['rendered'].snapshot()[1], payload_sizes['stored'].snapshot()[1])
+
+    def test_benchmark_command_reports_sizes(self):
+        """형식/압축별 평균 크기와 인코딩/디코딩 시간 비교"""
+        import json
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            out = StringIO()
+            call_command('benchmark_cache_codec', pages=2, page_size=10, output=output.name, stdout=out)
+            with open(output.name, encoding='utf-8') as f:
+                result = json.load(f)
+
+        self.assertEqual(result['pages'], 2)
+        self.assertIn('pickle 대비', out.getvalue())
+        for name in ('pickle', 'json', 'json+zlib'):
+            self.assertGreater(result['results'][name]['bytes']['mean'], 0)
+            self.assertEqual(result['results'][name]['encode_ms']['count'], 2)
+        self.assertLess(result['results']['json+zlib']['bytes']['mean'], result['results']['pickle']['bytes']['mean'])
+
+
+class SearchFragmentCacheTests(TestCase):
+    """검색 결과 ID 목록 + 상품 조각 캐시(SEARCH_FRAGMENT_CACHE) 테스트"""
+
+    def setUp(self):
+        """테스트 환경 설정"""
+        self.client = APIClient()
+        self.url = reverse('product-search')
+        cache.clear()
+        self.redis_conn = get_redis_connection("default")
+        self.brand = Brand.objects.create(name="이니스프리")
+        ingredient = Ingredient.objects.create(name="녹차 추출물", ewg_score=1)
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(name=f"그린티 토너 {i}", brand=self.brand, price=15000 + i)
+            product.ingredients.set([ingredient])
+            # 성분 연결 변경이 updated_at을 갱신하므로 다시 읽음
+            product.refresh_from_db()
+            self.products.append(product)
+
+    def _hits(self, mock_search, products=None):
+        hits = []
+        for product in products or self.products:
+            hit = MagicMock()
+            hit.meta.id = str(product.id)
+            hits.append(hit)
+        mock_es_response(mock_search, hits)
+
+    def _fragment_keys(self):
+        return sorted(key.decode() for key in self.redis_conn.keys("product:*"))
+
+    @patch('products.views.ProductDocument.search')
+    def test_query_key_stores_ordered_ids(self, mock_search):
+        """검색 캐시에는 ID 목록만, 상품별 조각은 product:{id}:v{updated_at} 키에 저장 (히트 응답은 미스와 같은 bytes)"""
+        from .fragments import fragment_key, fragment_version
+        products = list(reversed(self.products))
+        self._hits(mock_search, products)
+
+        miss = self.client.get(self.url, {'q': '그린티'})
+        hit = self.client.get(self.url, {'q': '그린티'})
+
+        self.assertEqual(mock_search.call_count, 1)
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual([item['id'] for item in miss.json()['results']], [p.id for p in products])
+        entry = cache.get(build_search_cache_key('그린티', {'page': 1, 'page_size': 20},
+                                                 version=get_catalog_version()))
+        self.assertNotIn('results', entry['data'])
+        self.assertEqual(entry['data']['result_ids'], [p.id for p in products])
+        self.assertEqual(self._fragment_keys(),
+                         sorted(fragment_key(p.id, fragment_version(p.updated_at)) for p in products))
+
+    @patch('products.views.ProductDocument.search')
+    def test_fragments_shared_across_queries(self, mock_search):
+        """다른 검색어도 같은 상품이면 조각 재사용 (MySQL은 updated_at 조회 한 번)"""
+        self._hits(mock_search)
+        first = self.client.get(self.url, {'q': '그린티'})
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, {'q': '토너'})
+
+        self.assertEqual(second.json()['results'], first.json()['results'])
+
+    @patch('products.views.ProductDocument.search')
+    def test_missing_fragments_hydrated_in_one_query(self, mock_search):
+        """히트에서 만료/축출된 조각만 한 번에 다시 조회 (updated_at 조회 + 상품 조회 + 성분 prefetch)"""
+        from .fragments import fragment_key, fragment_version
+        self._hits(mock_search)
+        miss = self.client.get(self.url, {'q': '그린티'})
+        evicted = self.products[1]
+        self.redis_conn.delete(fragment_key(evicted.id, fragment_version(evicted.updated_at)))
+
+        with self.assertNumQueries(3):
+            hit = self.client.get(self.url, {'q': '그린티'})
+
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(len(self._fragment_keys()), 3)
+
+    @patch('products.views.ProductDocument.search')
+    def test_product_edit_invalidates_one_fragment(self, mock_search):
+        """상품 하나를 수정하면 그 상품의 조각 키만 바뀌고, 다시 만드는 조각도 그 상품뿐"""
+        self._hits(mock_search)
+        self.client.get(self.url, {'q': '그린티'})
+        before = set(self._fragment_keys())
+
+        edited = self.products[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            edited.name = "그린티 토너 리뉴얼"
+            edited.save()
+        # updated_at 조회 + 수정된 상품 조회 + 성분 prefetch
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'q': '그린티'})
+
+        after = set(self._fragment_keys())
+        self.assertEqual(response.json()['results'][0]['name'], "그린티 토너 리뉴얼")
+        self.assertEqual(len(after - before), 1)
+        self.assertTrue(next(iter(after - before)).startswith(f"product:{edited.id}:v"))
+
+    @patch('products.views.ProductDocument.search')
+    def test_display_field_edit_keeps_search_cache(self, mock_search):
+        """검색 결과에 영향이 없는 필드 수정은 카탈로그 버전을 그대로 두고, 히트에서 그 상품의 조각만 새로 만듦"""
+        from django.test import override_settings
+        self._hits(mock_search)
+        with override_settings(SEARCH_LOCAL_CACHE={**settings.SEARCH_LOCAL_CACHE, 'ENABLED': False}):
+            self.client.get(self.url, {'q': '그린티'})
+            version = get_catalog_version()
+            before = set(self._fragment_keys())
+
+            edited = self.products[1]
+            with self.captureOnCommitCallbacks(execute=True):
+                edited.image_url = "https://example.com/renewal.jpg"
+                edited.save()
+            # updated_at 조회 + 수정된 상품 조회 + 성분 prefetch
+            with self.assertNumQueries(3):
+                response = self.client.get(self.url, {'q': '그린티'})
+
+        self.assertEqual(get_catalog_version(), version)
+        self.assertEqual(mock_search.call_count, 1)
+        self.assertEqual(response.json()['results'][1]['image_url'], "https://example.com/renewal.jpg")
+        after = set(self._fragment_keys())
+        self.assertEqual(len(after - before), 1)
+        self.assertTrue(next(iter(after - before)).startswith(f"product:{edited.id}:v"))
+
+        # 검색 필드(가격) 수정은 카탈로그 버전을 올림
+        with self.captureOnCommitCallbacks(execute=True):
+            edited.price += 1000
+            edited.save()
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    @patch('products.views.ProductDocument.search')
+    def test_brand_edit_changes_product_fragments(self, mock_search):
+        """브랜드/성분 변경은 상품 updated_at을 갱신해 조각에 반영"""
+        self._hits(mock_search)
+        self.client.get(self.url, {'q': '그린티'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.brand.name = "이니스프리 코리아"
+            self.brand.save()
+        response = self.client.get(self.url, {'q': '그린티'})
+
+        self.assertEqual({item['brand']['name'] for item in response.json()['results']}, {"이니스프리 코리아"})
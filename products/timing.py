@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# 검색 요청 단계 이름 (벤치마크/메트릭 공통)
+# ranking은 랭킹 버퍼/근사 랭킹일 때만 따로 측정됨 (그 외에는 캐시 조회 스크립트에서 함께 처리되어 cache에 포함)
+STAGES = ('validation', 'cache', 'es', 'db', 'serialize', 'ranking')
+
+# 현재 요청의 단계별 소요 시간 (ms), 수집 중이 아니면 None
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('stage_timings', default=None)
+
+
+@contextmanager
+def collect_stages() -> Iterator[Dict[str, float]]:
+    """
+    블록 안에서 실행된 stage()의 소요 시간을 모음
+
+    이미 수집 중이면 바깥 수집기를 그대로 사용합니다. (벤치마크가 뷰를 감싸는 경우)
+
+    Yields:
+        {단계 이름: 누적 소요 시간(ms)}
+    """
+    timings = _stage_timings.get()
+    if timings is not None:
+        yield timings
+        return
+
+    timings = {}
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    단계 소요 시간 측정 (수집 중이 아니면 아무것도 하지 않음)
+
+    같은 단계가 여러 번 실행되면 합산합니다.
+    백그라운드 갱신 스레드처럼 수집기가 없는 곳에서는 비용이 거의 없습니다.
+    """
+    timings = _stage_timings.get()
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - started) * 1000
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .async_views import search_async
 from .views import ProductViewSet
 
 router = DefaultRouter()
 router.register(r'items', ProductViewSet) # /api/products/items/ 주소 생성
 
 urlpatterns = [
+    # 비동기(ASGI) 검색: 라우터의 items/<pk>/보다 먼저 매칭되어야 함
+    path('items/search-async/', search_async, name='product-search-async'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,9 +1,11 @@
 import logging
-from typing import Dict, List, Any, Optional
+import time
+from typing import Dict, List, Any, Optional, Tuple
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
+from django.conf import settings
 from django.core.cache import cache             # Django 캐시 모듈
 from django_redis import get_redis_connection   # Redis 직접 제어 (랭킹용)
 from django.db.models import Case, When, Value, IntegerField
@@ -14,6 +16,27 @@ from redis.exceptions import ConnectionError as RedisConnectionError
 from .models import Product
 from .serializers import ProductSerializer
 from .documents import ProductDocument
+from .analysis import FUZZY_CURSOR_MARK, build_fuzzy_query, build_search_query
+from .cache_codec import PrerenderedResponse, response_body
+from .exceptions import CircuitOpenError, SearchError
+from .fragments import compose_entry, expand_page, load_page_results, page_skeleton
+from .filters import InvalidFilterError, SearchFilters, add_facet_aggregations, parse_facets, parse_search_filters
+from .local_cache import get_cache_stats, get_ranking_l1, get_search_l1, search_l2
+from .metrics import instrument_search, suggest_duration
+from .pagination import InvalidPageError, PageRequest, SearchPagination
+from .ranking import (
+    WINDOWS as RANKING_WINDOWS, get_ranking_buffer, increments_in_lookup, ranking_key, record_searches,
+    top_keywords,
+)
+from .refresh import refresh_in_background
+from .resilience import budget_exhausted, db_stage_timeout, get_breaker, request_deadline, stage_timeout
+from .search_cache import (
+    SearchCacheLookup, build_search_cache_key, hard_ttl, lookup_search_cache,
+    make_cache_entry, needs_refresh, normalize_query, read_cached_data, read_stale_data
+)
+from .singleflight import redis_single_flight, search_flight
+from .suggest import get_suggestions
+from .timing import stage
 
 # --- Swagger용 임포트 추가 ---
 from drf_yasg.utils import swagger_auto_schema
@@ -33,7 +56,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     # [1] 검색 API 꾸미기
     @swagger_auto_schema(
         operation_summary="통합 상품 검색 (MySQL + ES)",
-        operation_description="상품명, 브랜드명, 성분명을 통합 검색합니다. (Redis 캐싱 적용, 페이지네이션 지원)",
+        operation_description="상품명, 브랜드명, 성분명을 통합 검색합니다. (Redis 캐싱 적용, 페이지네이션/필터/패싯 지원)",
         manual_parameters=[
             openapi.Parameter(
                 'q',
@@ -52,174 +75,569 @@ class ProductViewSet(viewsets.ModelViewSet):
             openapi.Parameter(
                 'page_size',
                 openapi.IN_QUERY,
-                description='페이지당 결과 수 (기본값: 20)',
+                description='페이지당 결과 수 (기본값: 20, 최대: 100)',
                 type=openapi.TYPE_INTEGER,
                 required=False
             ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description='커서 페이지네이션 (search_after). 빈 값으로 시작하고 응답의 next 링크를 따라가세요.',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'min_price',
+                openapi.IN_QUERY,
+                description='최소 가격',
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'max_price',
+                openapi.IN_QUERY,
+                description='최대 가격',
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'brand',
+                openapi.IN_QUERY,
+                description='브랜드 ID (쉼표로 여러 개, 예: 1,3)',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'max_ewg',
+                openapi.IN_QUERY,
+                description='모든 성분의 EWG 등급 상한 (1~10)',
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'exclude_ingredient',
+                openapi.IN_QUERY,
+                description='제외할 성분 ID (쉼표로 여러 개)',
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'sort',
+                openapi.IN_QUERY,
+                description='정렬 (relevance: 검색 점수순, safety: 최대/평균 EWG 등급 낮은 순)',
+                type=openapi.TYPE_STRING,
+                enum=['relevance', 'safety'],
+                required=False
+            ),
         ]
     )
     @action(detail=False, methods=['get'])
+    @instrument_search
     def search(self, request: Request) -> Response:
         """
         상품 검색 API
 
         쿼리 파라미터:
         - q: 검색어 (필수, 최소 1자, 최대 100자)
+        - page, page_size: 페이지 번호/크기 (ES from/size로 변환)
+        - cursor: 커서 모드 (search_after 기반 깊은 페이지네이션)
+        - min_price, max_price: 가격 범위
+        - brand: 브랜드 ID (쉼표로 여러 개, OR)
+        - max_ewg: 모든 성분의 EWG 등급 상한 (1~10)
+        - exclude_ingredient: 제외할 성분 ID (쉼표로 여러 개)
+        - sort: relevance(기본, 점수순) 또는 safety(최대/평균 EWG 등급 오름차순)
 
         반환:
         - 검색 결과 상품 리스트 (배열)
+        - 첫 페이지에는 패싯(facets: 브랜드별 수, 가격 히스토그램, EWG 등급 분포) 포함
         - 캐시 히트 시 빠른 응답, 미스 시 Elasticsearch에서 검색
 
         에러 코드:
         - 400: 검색어 미입력 또는 유효하지 않음
         - 503: Elasticsearch 또는 Redis 연결 불가
         - 500: 예상치 못한 서버 오류
-        """
-        try:
-            # [Step 0] 입력값 검증
-            query = request.query_params.get('q', '').strip()
 
-            # 검색어 유효성 검사
-            if not query:
-                logger.warning("검색 요청: 빈 검색어")
-                return Response(
-                    {'error': '검색어를 입력해주세요.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        장애 대응:
+        - ES 차단기가 열려 있으면 ES를 기다리지 않고 이전 카탈로그 버전의 캐시 또는
+          MySQL 상품명 검색으로 응답 (degraded: 'stale' | 'database', 대체 응답도 없으면 503)
+        - Redis 차단기가 열려 있으면 캐시 조회/랭킹 집계를 생략하고 검색만 진행
+        """
+        # 요청 전체 마감 시간 (단계별 타임아웃은 남은 예산 안에서 결정)
+        with request_deadline():
+            try:
+                # [Step 0] 입력값 검증
+                with stage('validation'):
+                    try:
+                        query, paginator, page_request, filters = self._parse_search_request(request)
+                    except SearchError as e:
+                        return Response(e.to_dict(), status=e.status_code)
+
+                # [Step 1] Redis 캐시 확인 + 랭킹 증가 (Lua 스크립트로 한 번에)
+                # Key: search:v{카탈로그 버전}:{정규화된 검색어}:{페이지/필터 파라미터}
+                search_query = normalize_query(query)
+                cache_params = {**page_request.cache_params(), **filters.cache_params()}
+
+                # 워커 메모리(L1) 캐시: 인기 검색어는 Redis 왕복/역직렬화 없이 응답
+                # 키에 카탈로그 버전이 없는 대신 버전이 오르면 pub/sub 알림으로 비워짐
+                local_key = build_search_cache_key(search_query, cache_params)
+                if settings.SEARCH_LOCAL_CACHE['ENABLED']:
+                    with stage('cache'):
+                        entry = get_search_l1().get(local_key)
+                    if entry is not None:
+                        logger.info(f"L1 캐시 히트: {query}")
+                        self._add_ranking(query)
+                        return self._cached_response(entry)
+
+                # 랭킹 버퍼/근사 랭킹을 쓰면 랭킹 증가는 _add_ranking이 처리 (조회 스크립트는 점수만 읽음)
+                inline_ranking = increments_in_lookup()
+                lookup = None
+                redis_breaker = get_breaker('redis')
+                if redis_breaker.allow():
+                    try:
+                        with redis_breaker.calling(), stage('cache'):
+                            lookup = lookup_search_cache(search_query, cache_params, keyword=query,
+                                                         increment=inline_ranking)
+                    except Exception as e:
+                        logger.warning(f"캐시 조회 실패: {str(e)}")
+                        # 캐시 실패해도 계속 진행 (버전을 모르므로 결과 캐싱은 생략)
+                if lookup is not None:
+                    search_l2.record(hit=bool(lookup.payload))
 
-            if len(query) > 100:
-                logger.warning(f"검색 요청: 검색어 길이 초과 ({len(query)}자)")
-                return Response(
-                    {'error': '검색어는 100자 이하여야 합니다.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+                if lookup is None or not inline_ranking:
+                    # 조회 스크립트가 랭킹을 올리지 않은 경우 별도 집계
+                    self._add_ranking(query)
 
-            # [Step 1] Redis 캐시 확인 (Key: search:검색어)
-            cache_key = f"search:{query}"
+                def compute() -> Dict[str, Any]:
+                    return self._compute_search(query, search_query, paginator, page_request, filters,
+                                                lookup, local_key)
 
-            try:
-                cached_result = cache.get(cache_key)
-                if cached_result:
+                if lookup is not None and lookup.payload:
+                    # 랭킹 점수는 조회 스크립트에서 이미 올라감
                     logger.info(f"캐시 히트: {query}")
-                    # 캐시가 있어도 랭킹 점수는 올려야 함!
-                    self._add_ranking(query)
-                    return Response(cached_result)
-            except Exception as e:
-                logger.warning(f"캐시 조회 실패: {str(e)}")
-                # 캐시 실패해도 계속 진행
-
-            # [Step 2] 캐시 없으면 Elasticsearch 검색
-            logger.info(f"캐시 미스, Elasticsearch 검색 시작: {query}")
+                    # ID 목록 페이지면 상품 조각(MGET)으로 응답 본문 조합
+                    try:
+                        entry = compose_entry(lookup.payload)
+                    except SearchError as e:
+                        return Response(e.to_dict(), status=e.status_code)
+                    # soft TTL이 지났거나 XFetch 조기 갱신 대상이면 stale 값으로 응답하고 백그라운드 갱신
+                    if needs_refresh(entry, lookup.ranking_score):
+                        if refresh_in_background(lookup.cache_key, compute):
+                            logger.info(f"백그라운드 캐시 갱신 예약: {query}")
+                    else:
+                        self._remember_locally(local_key, lookup, entry)
+                    return self._cached_response(entry)
+
+                # [Step 2~4] 캐시 미스: 같은 키의 동시 요청은 하나만 ES/MySQL 조회 (single-flight)
+                try:
+                    if lookup is not None:
+                        flight_key = lookup.cache_key
+                        data = search_flight.do(
+                            flight_key,
+                            lambda: redis_single_flight(
+                                flight_key, compute, lambda: expand_page(read_cached_data(flight_key))
+                            )
+                        )
+                    else:
+                        flight_key = build_search_cache_key(search_query, cache_params)
+                        data = search_flight.do(flight_key, compute)
+                except CircuitOpenError as e:
+                    data = self._degraded_search(query, search_query, paginator, page_request, filters,
+                                                 lookup, cache_params)
+                    if data is None:
+                        return Response(e.to_dict(), status=e.status_code)
+                except SearchError as e:
+                    return Response(e.to_dict(), status=e.status_code)
+
+                return Response(data)
 
-            try:
-                # Elasticsearch Query (DSL)
-                # 상품명(name), 브랜드명(brand.name), 성분명(ingredients.name)에서 다 찾음!
-                # fuzzy: 오타가 있어도 찾아줌 (ex: '토너' -> '투너')
-                q = Q('multi_match',
-                      query=query,
-                      fields=['name', 'brand.name', 'ingredients.name'],
-                      fuzziness='AUTO')
-
-                # 검색 실행
-                search_result = ProductDocument.search().query(q)
-                response = search_result.execute()
-
-            except ESConnectionError as e:
-                logger.error(f"Elasticsearch 연결 실패: {e.__class__.__name__}")
-                return Response(
-                    {
-                        'error': 'Elasticsearch 서비스에 연결할 수 없습니다.',
-                        'detail': '검색 기능을 일시적으로 사용할 수 없습니다.'
-                    },
-                    status=status.HTTP_503_SERVICE_UNAVAILABLE
-                )
             except Exception as e:
-                logger.error(f"Elasticsearch 검색 오류: {e.__class__.__name__}: {str(e)}")
+                logger.exception(f"검색 API 예상치 못한 오류: {str(e)}")
                 return Response(
                     {
-                        'error': '검색 중 오류가 발생했습니다.',
+                        'error': '예상치 못한 오류가 발생했습니다.',
                         'detail': str(e)
                     },
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
 
-            # [Step 3] DB에서 상세 정보 조회
-            try:
-                product_ids = [hit.meta.id for hit in response]
-
-                if not product_ids:
-                    # 결과가 없어도 에러가 아님
-                    logger.info(f"검색 결과 없음: {query}")
-                    empty_response = {
-                        'count': 0,
-                        'next': None,
-                        'previous': None,
-                        'results': []
-                    }
-                    try:
-                        cache.set(cache_key, empty_response, timeout=60*60)
-                    except Exception as e:
-                        logger.warning(f"빈 결과 캐싱 실패: {str(e)}")
-                    return Response(empty_response)
+    def _cached_response(self, entry: Dict[str, Any]) -> Response:
+        """캐시 엔트리 응답 (json 형식 엔트리는 저장된 렌더링 결과를 그대로 전송, 역직렬화/렌더링 없음)"""
+        body = response_body(entry)
+        if body is not None:
+            return PrerenderedResponse(body)
+        return Response(entry['data'])
+
+    def _parse_search_request(self, request: Request
+                              ) -> Tuple[str, SearchPagination, PageRequest, SearchFilters]:
+        """
+        검색 요청 파라미터 검증 (동기/비동기 검색 공통)
+
+        Returns:
+            (원본 검색어, SearchPagination, 검증된 페이지 요청, 검증된 필터)
+
+        Raises:
+            SearchError: 400 (검색어 미입력/길이 초과, 잘못된 페이지/필터 파라미터)
+        """
+        query = request.query_params.get('q', '').strip()
+
+        # 검색어 유효성 검사
+        if not normalize_query(query):
+            logger.warning("검색 요청: 빈 검색어")
+            raise SearchError('검색어를 입력해주세요.', status_code=status.HTTP_400_BAD_REQUEST)
 
+        if len(query) > 100:
+            logger.warning(f"검색 요청: 검색어 길이 초과 ({len(query)}자)")
+            raise SearchError('검색어는 100자 이하여야 합니다.', status_code=status.HTTP_400_BAD_REQUEST)
+
+        # 필터 파라미터 검증 (ES filter context로 실행)
+        try:
+            filters = parse_search_filters(request.query_params)
+        except InvalidFilterError as e:
+            logger.warning(f"검색 요청: 잘못된 필터 파라미터 ({str(e)})")
+            raise SearchError(str(e), status_code=status.HTTP_400_BAD_REQUEST)
+
+        # 페이지네이션 파라미터 검증 (ES from/size 또는 search_after로 변환, 커서는 정렬 값 개수까지 확인)
+        paginator = SearchPagination(request)
+        try:
+            page_request = paginator.get_page_request(sort_size=len(filters.sort_fields()) + 2)
+        except InvalidPageError as e:
+            logger.warning(f"검색 요청: 잘못된 페이지 파라미터 ({str(e)})")
+            raise SearchError(str(e), status_code=status.HTTP_400_BAD_REQUEST)
+
+        return query, paginator, page_request, filters
+
+    def _compute_search(self, query: str, search_query: str, paginator: SearchPagination,
+                        page_request: PageRequest, filters: SearchFilters,
+                        lookup: Optional[SearchCacheLookup], local_key: str) -> Dict[str, Any]:
+        """캐시 미스/백그라운드 갱신: 검색 결과를 계산하고 Redis(+L1)에 저장"""
+        started = time.monotonic()
+        data = self._execute_search(query, search_query, paginator, page_request, filters)
+        self._store_search_result(query, lookup, local_key, data, time.monotonic() - started)
+        return data
+
+    def _store_search_result(self, query: str, lookup: Optional[SearchCacheLookup], local_key: str,
+                             data: Dict[str, Any], delta: float) -> None:
+        """계산한 결과를 Redis에 저장하고 인기 검색어면 L1에도 보관 (버전을 모르면 저장 생략)"""
+        if lookup is None:
+            return
+        entry = self._cache_search_result(query, lookup, data, delta)
+        if entry is not None:
+            self._remember_locally(local_key, lookup, entry)
+
+    def _execute_search(self, query: str, search_query: str, paginator: SearchPagination,
+                        page_request: PageRequest, filters: SearchFilters = SearchFilters()) -> Dict[str, Any]:
+        """
+        Elasticsearch 검색 + 상세 정보 조회로 검색 결과 페이지 생성
+
+        Args:
+            query: 원본 검색어 (로그용)
+            search_query: 정규화된 검색어 (ES 쿼리용)
+            paginator: 응답 형식을 만드는 SearchPagination
+            page_request: 검증된 페이지 요청
+            filters: 검증된 필터 (점수에 영향 없는 filter context)
+
+        Returns:
+            페이지네이션 응답 데이터 (count/next/previous/results, 첫 페이지는 facets 포함)
+
+        Raises:
+            CircuitOpenError: ES 차단기가 열려 호출하지 않음
+            SearchError: Elasticsearch 또는 DB 조회 실패
+        """
+        # [Step 2] Elasticsearch 검색
+        logger.info(f"캐시 미스, Elasticsearch 검색 시작: {query}")
+        include_facets, search_after, fuzzy = self._search_plan(page_request)
+        breaker = self._es_breaker(query)
+
+        try:
+            with breaker.calling(), stage('es'):
+                # 상품명/브랜드명(nori 형태소, 동의어), 성분명(nested), 상품명 ngram에서 정확/구문 일치 우선 검색
+                if not fuzzy:
+                    response = self._build_search(build_search_query(search_query), filters, page_request,
+                                                  search_after, include_facets).execute()
+                    fuzzy = self._needs_fuzzy(query, response, page_request, search_after)
+                if fuzzy:
+                    response = self._build_search(build_fuzzy_query(search_query), filters, page_request,
+                                                  search_after, include_facets).execute()
+            facets = parse_facets(response.aggregations) if include_facets else None
+
+        except Exception as e:
+            raise self._es_error(e)
+
+        # [Step 3] DB에서 상세 정보 조회
+        return self._build_page(query, response, fuzzy, facets, paginator, page_request)
+
+    def _search_plan(self, page_request: PageRequest) -> Tuple[bool, Optional[List[Any]], bool]:
+        """
+        Returns:
+            (패싯 포함 여부, 표시를 뗀 search_after, 커서가 오타 허용 검색을 이어가는지 여부)
+        """
+        # 패싯은 페이지와 무관하므로 첫 페이지에서만 같은 요청으로 집계
+        include_facets = page_request.page == 1 and page_request.search_after is None
+
+        # 커서에 오타 허용 검색 표시가 있으면 다음 페이지도 같은 쿼리로 이어서 조회
+        search_after = page_request.search_after
+        fuzzy = bool(search_after) and search_after[-1] == FUZZY_CURSOR_MARK
+        if fuzzy:
+            search_after = search_after[:-1]
+        return include_facets, search_after, fuzzy
+
+    def _needs_fuzzy(self, query: str, response: Any, page_request: PageRequest,
+                     search_after: Optional[List[Any]]) -> bool:
+        """정확 검색 결과가 하나도 없을 때만 오타 허용 검색 (fuzzy는 비용이 커서 폴백으로만 사용)"""
+        # 커서 모드는 전체 수를 세지 않으므로 첫 페이지가 비었을 때만 판단
+        if page_request.cursor_mode:
+            fuzzy = search_after is None and not list(response)
+        else:
+            fuzzy = response.hits.total.value == 0
+        if fuzzy:
+            logger.info(f"정확 검색 결과 없음, 오타 허용 검색: {query}")
+        return fuzzy
+
+    def _es_breaker(self, query: str) -> Any:
+        """
+        ES 호출 전 차단기 확인
+
+        Returns:
+            ES 차단기 (호출은 breaker.calling() 안에서, 결과는 나가는 모든 경로에서 기록)
+
+        Raises:
+            CircuitOpenError: 차단 중 (ES 타임아웃을 기다리지 않고 바로 대체 응답)
+        """
+        breaker = get_breaker('elasticsearch')
+        if not breaker.allow():
+            logger.warning(f"Elasticsearch 차단 중, 검색 생략: {query}")
+            raise CircuitOpenError('Elasticsearch')
+        return breaker
+
+    def _es_error(self, e: Exception) -> SearchError:
+        """ES 예외를 응답용 SearchError로 변환 (연결 실패는 503, 차단기 기록은 breaker.calling()이 함)"""
+        if isinstance(e, ESConnectionError):
+            logger.error(f"Elasticsearch 연결 실패: {e.__class__.__name__}")
+            return SearchError(
+                'Elasticsearch 서비스에 연결할 수 없습니다.',
+                '검색 기능을 일시적으로 사용할 수 없습니다.',
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        logger.error(f"Elasticsearch 검색 오류: {e.__class__.__name__}: {str(e)}")
+        return SearchError('검색 중 오류가 발생했습니다.', str(e))
+
+    def _build_page(self, query: str, response: Any, fuzzy: bool, facets: Optional[Dict[str, Any]],
+                    paginator: SearchPagination, page_request: PageRequest) -> Dict[str, Any]:
+        """
+        ES 응답의 hit으로 상세 정보를 조회해 응답 데이터 생성 (MySQL 조회 + 직렬화)
+
+        Raises:
+            SearchError: DB 조회 실패
+        """
+        try:
+            hits = list(response)
+            product_ids = [hit.meta.id for hit in hits]
+            total = 0 if page_request.cursor_mode else response.hits.total.value
+
+            if not product_ids:
+                # 결과가 없어도 에러가 아님
+                logger.info(f"검색 결과 없음: {query}")
+                results = []
+            elif settings.SEARCH_RESULT_SOURCE == 'document':
+                # ES _source만으로 응답 생성 (MySQL 조회 없음)
+                with stage('serialize'):
+                    results = self.get_serializer(self._documents_from_hits(hits), many=True).data
+            elif settings.SEARCH_FRAGMENT_CACHE['ENABLED']:
+                # 상품 조각 캐시: 조각이 없는 상품만 MySQL에서 조회 (검색 캐시에는 ID 목록만 저장)
+                results = load_page_results(product_ids)
+            else:
                 # MySQL에서 순서대로 가져오기 (Elasticsearch 순서 보존)
-                # Case/When을 사용하여 원래 검색 순서 유지
+                # Case/When을 사용하여 원래 검색 순서 유지 (현재 페이지 ID만)
                 preserved_order = Case(
                     *[When(pk=pk, then=Value(i)) for i, pk in enumerate(product_ids)],
                     output_field=IntegerField()
                 )
-                products = Product.objects.filter(id__in=product_ids).annotate(
-                    _order=preserved_order
-                ).order_by('_order').select_related('brand').prefetch_related('ingredients')
-
-                # 페이지네이션 적용
-                page = self.paginate_queryset(products)
-                if page is not None:
-                    serializer = self.get_serializer(page, many=True)
-                    data = self.get_paginated_response(serializer.data).data
-                else:
-                    serializer = self.get_serializer(products, many=True)
-                    data = serializer.data
+                with stage('db'), db_stage_timeout():
+                    products = list(Product.objects.filter(id__in=product_ids).annotate(
+                        _order=preserved_order
+                    ).order_by('_order').select_related('brand').prefetch_related('ingredients'))
+                with stage('serialize'):
+                    results = self.get_serializer(products, many=True).data
+
+            if page_request.cursor_mode:
+                last_sort = list(hits[-1].meta.sort) if hits else None
+                if last_sort is not None and fuzzy:
+                    last_sort.append(FUZZY_CURSOR_MARK)
+                data = paginator.get_cursor_data(results, last_sort, page_request.page_size)
+            else:
+                data = paginator.get_paginated_data(results, total, page_request.page, page_request.page_size)
+            if facets is not None:
+                data['facets'] = facets
+            return data
 
-            except Exception as e:
-                logger.error(f"데이터베이스 조회 오류: {str(e)}")
-                return Response(
-                    {
-                        'error': '데이터를 조회할 수 없습니다.',
-                        'detail': str(e)
-                    },
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+        except SearchError:
+            raise
+        except Exception as e:
+            logger.error(f"데이터베이스 조회 오류: {str(e)}")
+            raise SearchError('데이터를 조회할 수 없습니다.', str(e))
+
+    def _build_search(self, q: Q, filters: SearchFilters, page_request: PageRequest,
+                      search_after: Optional[List[Any]], include_facets: bool) -> Any:
+        """
+        검색 쿼리에 필터/정렬/페이지/패싯을 붙인 ES 요청 생성
+
+        Args:
+            q: 점수 계산용 쿼리 (정확 검색 또는 오타 허용 검색)
+            filters: 검증된 필터 (filter context)
+            page_request: 검증된 페이지 요청
+            search_after: 커서 모드의 search_after 값 (표시 제거 후)
+            include_facets: 패싯 집계 포함 여부
+        """
+        # 현재 페이지에 필요한 hit만 가져옴
+        search_result = ProductDocument.search().query(q)
+        if settings.SEARCH_RESULT_SOURCE == 'document':
+            # 자동완성 입력(suggest)은 응답에 쓰지 않으므로 _source에서 제외
+            search_result = search_result.source(excludes=['suggest'])
+        filter_query = filters.to_query()
+        if filter_query is not None:
+            search_result = search_result.filter(filter_query)
+        if page_request.cursor_mode:
+            # search_after는 정렬 값이 유일해야 하므로 id를 tie-breaker로 사용
+            search_result = search_result.sort(*filters.sort_fields(), '_score', {'id': 'desc'}).extra(
+                size=page_request.page_size, track_total_hits=False
+            )
+            if search_after is not None:
+                search_result = search_result.extra(search_after=search_after)
+        else:
+            if filters.sort_fields():
+                search_result = search_result.sort(*filters.sort_fields(), '_score')
+            offset = page_request.offset
+            search_result = search_result[offset:offset + page_request.page_size].extra(
+                track_total_hits=True
+            )
+        if include_facets:
+            add_facet_aggregations(search_result)
+        # 요청 마감 시간 안에서 ES 단계 타임아웃 (클라이언트 기본 타임아웃까지 기다리지 않음)
+        timeout = stage_timeout('es')
+        if timeout is not None:
+            search_result = search_result.params(request_timeout=timeout)
+        return search_result
+
+    def _degraded_search(self, query: str, search_query: str, paginator: SearchPagination,
+                         page_request: PageRequest, filters: SearchFilters,
+                         lookup: Optional[SearchCacheLookup], cache_params: Dict[str, Any]
+                         ) -> Optional[Dict[str, Any]]:
+        """
+        ES 차단 중 대체 응답 (캐싱하지 않음, 응답에 degraded 표시)
+
+        1. 이전 카탈로그 버전에 남은 같은 검색의 캐시 (degraded: 'stale')
+        2. MySQL 상품명 부분 일치 검색, 필터/안전도 정렬 적용 (degraded: 'database')
+           전체 수를 세지 않으므로 count는 다음 페이지 존재 여부만 반영한 근사값, 패싯 없음
 
-            # [Step 4] 결과 Redis에 저장 (동적 TTL: 인기도 기반)
+        Returns:
+            응답 데이터 (대체 응답도 실패하면 None -> 503)
+        """
+        if lookup is not None:
             try:
-                cache_ttl = self._get_cache_ttl(query)
-                cache.set(cache_key, data, timeout=cache_ttl)
-                logger.debug(f"검색 결과 캐싱 완료: {query} (TTL: {cache_ttl}초)")
+                with stage('cache'):
+                    stale = read_stale_data(search_query, cache_params, lookup.version,
+                                            settings.SEARCH_RESILIENCE['STALE_VERSIONS'])
+                if stale is not None:
+                    logger.warning(f"ES 차단 중, 이전 버전 캐시로 응답: {query}")
+                    return {**expand_page(stale), 'degraded': 'stale'}
             except Exception as e:
-                logger.warning(f"검색 결과 캐싱 실패 (계속 진행): {str(e)}")
+                logger.warning(f"이전 버전 캐시 조회 실패: {str(e)}")
 
-            # [Step 5] 랭킹 집계
-            self._add_ranking(query)
+        try:
+            size = page_request.page_size
+            offset = 0 if page_request.cursor_mode else page_request.offset
+            queryset = filters.apply_to_queryset(Product.objects.filter(name__icontains=search_query))
+            with stage('db'), db_stage_timeout():
+                # 한 건 더 가져와 다음 페이지 존재 여부 판단
+                products = list(
+                    queryset.select_related('brand').prefetch_related('ingredients')[offset:offset + size + 1]
+                )
+            has_next = len(products) > size
+            with stage('serialize'):
+                results = self.get_serializer(products[:size], many=True).data
 
-            return Response(data)
+            if page_request.cursor_mode:
+                # 대체 검색은 ES 정렬 값이 없으므로 첫 페이지만
+                data = paginator.get_cursor_data(results, None, size)
+            else:
+                count = offset + len(results) + (1 if has_next else 0)
+                data = paginator.get_paginated_data(results, count, page_request.page, size)
+            logger.warning(f"ES 차단 중, MySQL 대체 검색으로 응답: {query} (결과 수: {len(results)})")
+            data['degraded'] = 'database'
+            return data
+        except Exception as e:
+            logger.error(f"MySQL 대체 검색 실패: {str(e)}")
+            return None
 
+    def _cache_search_result(self, query: str, lookup: SearchCacheLookup, data: Dict[str, Any],
+                             delta: float) -> Optional[Dict[str, Any]]:
+        """
+        [Step 4] 검색 결과 Redis에 저장
+
+        동적 TTL: 조회 스크립트가 돌려준 랭킹 점수 기반 (빈 결과는 1시간)
+        이 TTL은 soft TTL이고, 실제 키는 hard TTL까지 stale 값으로 남아 백그라운드 갱신에 쓰임
+        상품 조각 캐시를 쓴 결과는 상품 목록 대신 ID 목록 페이지만 저장
+        캐시 실패는 로그만 남기고 계속 진행
+
+        Returns:
+            저장한 캐시 엔트리 (실패 시 None, ID 목록이 아닌 전체 응답 데이터를 가짐 -> L1 보관용)
+        """
+        try:
+            if data['results']:
+                cache_ttl = self._get_cache_ttl(query, lookup.ranking_score)
+            else:
+                cache_ttl = 60*60
+            entry = make_cache_entry(data, soft_ttl=cache_ttl, delta=delta)
+            skeleton = page_skeleton(data)
+            stored = entry if skeleton is None else {**entry, 'data': skeleton}
+            with stage('cache'):
+                cache.set(lookup.cache_key, stored, timeout=hard_ttl(cache_ttl))
+            logger.debug(f"검색 결과 캐싱 완료: {query} (TTL: {cache_ttl}초, 계산: {delta:.3f}초)")
+            return entry
         except Exception as e:
-            logger.exception(f"검색 API 예상치 못한 오류: {str(e)}")
-            return Response(
-                {
-                    'error': '예상치 못한 오류가 발생했습니다.',
-                    'detail': str(e)
-                },
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            logger.warning(f"검색 결과 캐싱 실패 (계속 진행): {str(e)}")
+            return None
+
+    def _remember_locally(self, local_key: str, lookup: SearchCacheLookup, entry: Dict[str, Any]) -> None:
+        """
+        인기 검색어 결과를 워커 메모리(L1)에도 저장
+
+        Args:
+            local_key: 버전 없는 L1 캐시 키
+            lookup: 캐시 조회 결과 (카탈로그 버전, 랭킹 점수)
+            entry: 캐시 엔트리
+
+        Note:
+            soft TTL 이후에는 Redis 쪽 stale-while-revalidate가 갱신하도록 그 전까지만 보관
+        """
+        config = settings.SEARCH_LOCAL_CACHE
+        if not config['ENABLED'] or lookup.ranking_score < config['MIN_SCORE']:
+            return
+        get_search_l1().set(local_key, entry, ttl=entry['soft_expires_at'] - time.time(), version=lookup.version)
+
+    def _documents_from_hits(self, hits: Any) -> List[Dict[str, Any]]:
+        """
+        Elasticsearch 검색 결과(_source)를 ProductSerializer 입력용 dict로 변환
 
-    def _get_cache_ttl(self, keyword: str) -> int:
+        Args:
+            hits: ProductDocument 검색 결과
+
+        Returns:
+            검색 순서가 유지된 상품 dict 리스트
+
+        Note:
+            skip_empty=False: 빈 성분 리스트, null 필드도 키를 유지해야
+            MySQL 경로와 동일한 JSON이 나옴
+        """
+        return [hit.to_dict(skip_empty=False) for hit in hits]
+
+    def _get_cache_ttl(self, keyword: str, ranking_score: Optional[float] = None) -> int:
         """
         검색어 인기도를 기반으로 동적 캐시 TTL 결정
 
         Args:
             keyword: 검색 키워드
+            ranking_score: 이미 알고 있는 랭킹 점수 (None이면 Redis ZSCORE 조회)
 
         Returns:
             캐시 유효시간 (초 단위)
@@ -227,9 +645,15 @@ class ProductViewSet(viewsets.ModelViewSet):
             - 일반 검색어 (2 <= 점수 <= 10): 1시간 (3600초)
             - 저인기 검색어 (점수 < 2): 30분 (1800초)
         """
+        redis_breaker = get_breaker('redis')
         try:
-            con = get_redis_connection("default")
-            ranking_score = con.zscore("search_ranking", keyword)
+            if ranking_score is None:
+                # Redis 차단 중이거나 마감 시간이 지났으면 조회 생략 (TTL은 부가 정보)
+                if budget_exhausted() or not redis_breaker.allow():
+                    return 3600
+                with redis_breaker.calling():
+                    con = get_redis_connection("default")
+                    ranking_score = con.zscore(ranking_key(), keyword)
 
             if ranking_score is None:
                 ranking_score = 0
@@ -255,13 +679,25 @@ class ProductViewSet(viewsets.ModelViewSet):
             keyword: 증가시킬 검색어
 
         Note:
+            SEARCH_RANKING_BUFFER 사용 시 워커 메모리에 적재 후 주기적으로 일괄 반영
             Redis 연결 실패 시 로그만 기록하고 계속 진행
-            (랭킹은 부가 기능이므로 실패해도 검색은 진행)
+            (랭킹은 부가 기능이므로 실패해도 검색은 진행, Redis 차단 중이거나 마감 시간이 지났으면 생략)
         """
+        if settings.SEARCH_RANKING_BUFFER['ENABLED']:
+            with stage('ranking'):
+                get_ranking_buffer().add(keyword)
+            return
+
+        redis_breaker = get_breaker('redis')
+        if budget_exhausted() or not redis_breaker.allow():
+            logger.debug(f"랭킹 업데이트 생략 (Redis 차단 또는 마감 시간 초과): {keyword}")
+            return
         try:
-            con = get_redis_connection("default")
-            # Sorted Set(ZSET) 자료구조 사용: 점수 1점 증가 (ZINCRBY)
-            con.zincrby("search_ranking", 1, keyword)
+            with redis_breaker.calling():
+                con = get_redis_connection("default")
+                # 누적 랭킹 + 시간 버킷 랭킹 1점 증가 (ZINCRBY, 파이프라인 한 번)
+                with stage('ranking'):
+                    record_searches(con, {keyword: 1})
             logger.debug(f"랭킹 업데이트: {keyword}")
         except RedisConnectionError as e:
             logger.error(f"Redis 연결 실패 (랭킹 업데이트 스킵): {str(e)}")
@@ -270,32 +706,63 @@ class ProductViewSet(viewsets.ModelViewSet):
 
     @swagger_auto_schema(
         operation_summary="실시간 인기 검색어 순위",
-        operation_description="Redis에 집계된 실시간 검색어 Top 10을 반환합니다."
+        operation_description="Redis에 집계된 실시간 검색어 Top 10을 반환합니다.",
+        manual_parameters=[
+            openapi.Parameter(
+                'window',
+                openapi.IN_QUERY,
+                description='집계 기간 (1h, 24h, 7d). 생략하면 누적 순위. 최근 검색일수록 가중치가 큼',
+                type=openapi.TYPE_STRING,
+                enum=list(RANKING_WINDOWS),
+                required=False
+            ),
+        ]
     )
     @action(detail=False, methods=['get'])
     def ranking(self, request: Request) -> Response:
         """
         실시간 인기 검색어 순위 조회
 
+        쿼리 파라미터:
+        - window: 집계 기간 (1h | 24h | 7d, 생략 시 누적)
+
         반환:
         - 상위 10개의 인기 검색어 (rank, keyword, score)
-        - 점수 높은 순으로 정렬
+        - 점수 높은 순으로 정렬 (윈도우 랭킹은 지수 감쇠 적용 점수)
 
         에러 코드:
+        - 400: 지원하지 않는 window
         - 503: Redis 연결 불가
         - 500: 예상치 못한 서버 오류
         """
+        window = request.query_params.get('window') or None
+        if window is not None and window not in RANKING_WINDOWS:
+            logger.warning(f"랭킹 요청: 지원하지 않는 window ({window})")
+            return Response(
+                {'error': f"window는 {', '.join(RANKING_WINDOWS)} 중 하나여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 순위는 초 단위로 거의 바뀌지 않으므로 워커 메모리(L1)에서 잠깐 재사용
+        local_enabled = settings.SEARCH_LOCAL_CACHE['ENABLED']
+        local_key = f"ranking:{window or 'all'}"
+        if local_enabled:
+            result = get_ranking_l1().get(local_key)
+            if result is not None:
+                return Response(result)
+
         try:
             con = get_redis_connection("default")
-            # 점수 높은 순으로 상위 10개 가져오기 (ZREVRANGE 0 -1)
-            # withscores=True: 점수도 같이 반환
-            ranks = con.zrevrange("search_ranking", 0, 9, withscores=True)
+            # 점수 높은 순으로 상위 10개 가져오기 (누적: ZREVRANGE, 윈도우: ZUNIONSTORE 병합 후 ZREVRANGE)
+            ranks = top_keywords(con, window, limit=10)
 
             # 보기 좋게 JSON 변환
             result = [
-                {"rank": i+1, "keyword": keyword.decode('utf-8'), "score": int(score)}
+                {"rank": i+1, "keyword": keyword, "score": round(score)}
                 for i, (keyword, score) in enumerate(ranks)
             ]
+            if local_enabled:
+                get_ranking_l1().set(local_key, result)
 
             logger.info(f"랭킹 조회 완료 (결과 수: {len(result)})")
             return Response(result)
@@ -317,4 +784,78 @@ class ProductViewSet(viewsets.ModelViewSet):
                     'detail': str(e)
                 },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+    @swagger_auto_schema(
+        operation_summary="검색어 자동완성",
+        operation_description="입력 중인 접두어로 인기 검색어와 상품명/브랜드명/성분명 후보를 반환합니다. (fuzzy 검색 없음)",
+        manual_parameters=[
+            openapi.Parameter(
+                'q',
+                openapi.IN_QUERY,
+                description='입력 중인 검색어 접두어 (예: 그린, inni)',
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+        ]
+    )
+    @action(detail=False, methods=['get'])
+    def suggest(self, request: Request) -> Response:
+        """
+        검색어 자동완성 (search-as-you-type)
+
+        쿼리 파라미터:
+        - q: 입력 중인 접두어 (필수, 최대 SEARCH_SUGGEST['MAX_LENGTH']자)
+
+        반환:
+        - query: 정규화된 접두어
+        - suggestions: [{text, source}] 인기 검색어(source=ranking)가 먼저, 나머지는 카탈로그(source=catalog)
+
+        에러 코드:
+        - 400: 접두어 미입력 또는 길이 초과
+        - 500: 예상치 못한 서버 오류
+
+        Note:
+            키 입력마다 호출되므로 랭킹에 반영하지 않고, Redis/ES 장애 시에도 가능한 후보만으로 200 응답
+        """
+        started = time.perf_counter()
+        prefix = normalize_query(request.query_params.get('q', ''))
+        if not prefix:
+            return Response({'error': '검색어를 입력해주세요.'}, status=status.HTTP_400_BAD_REQUEST)
+        max_length = settings.SEARCH_SUGGEST['MAX_LENGTH']
+        if len(prefix) > max_length:
+            return Response(
+                {'error': f'검색어는 {max_length}자 이하여야 합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            suggestions = get_suggestions(prefix)
+        except Exception as e:
+            logger.exception(f"자동완성 예상치 못한 오류: {str(e)}")
+            return Response(
+                {
+                    'error': '예상치 못한 오류가 발생했습니다.',
+                    'detail': str(e)
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        suggest_duration.observe(time.perf_counter() - started)
+        return Response({'query': prefix, 'suggestions': suggestions})
+
+    @swagger_auto_schema(
+        operation_summary="캐시 계층별 히트/미스 통계",
+        operation_description="요청을 처리한 워커의 L1(메모리), L2(Redis) 캐시 히트/미스 카운터를 반환합니다.",
+    )
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request: Request) -> Response:
+        """
+        캐시 계층별 히트/미스 통계 (워커 단위)
+
+        반환:
+        - pid: 응답한 워커 프로세스
+        - search.l1 / search.l2: 검색 결과 L1(메모리), L2(Redis) 캐시
+        - ranking.l1: 랭킹 목록 L1 캐시
+        - suggest.l1: 자동완성 L1 캐시 (짧은 접두어 결과, 인기 검색어 후보)
+        """
+        return Response(get_cache_stats())